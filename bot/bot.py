@@ -1,4 +1,11 @@
-from typing import Dict, Union
+import asyncio
+import copy
+import dataclasses
+import logging
+import subprocess
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
 
 import discord
 import yaml
@@ -7,59 +14,120 @@ from discord.abc import User
 from discord.ext import commands
 
 from .cog import Cog
+from .config import Config, GuildConfig, compile_config
+from .utils.imports import importtime_summary, measure_imports
+from .utils.logs import setup_logging
 
+log = logging.getLogger(__name__)
 
-def _merge(a, b, path=None, update=True):
+
+def _merge(a, b, path: tuple = (), update=True):
     """merges b into a
     http://stackoverflow.com/questions/7204805/python-dictionaries-of-dictionaries-merge
-    https://stackoverflow.com/a/25270947/3005969"""
-    if path is None:
-        path = []
+    https://stackoverflow.com/a/25270947/3005969
+
+    Lists are merged item by item. The path is only joined into a string
+    when reporting a conflict."""
     for key in b:
         if key in a:
-            if isinstance(a[key], dict) and isinstance(b[key], dict):
-                _merge(a[key], b[key], path + [str(key)])
-            elif a[key] == b[key]:
-                pass  # same leaf value
-            elif isinstance(a[key], list) and isinstance(b[key], list):
-                for idx, _ in enumerate(b[key]):
-                    a[key][idx] = _merge(a[key][idx], b[key][idx],
-                                         path + [str(key), str(idx)],
-                                         update=update)
-            elif update:
-                a[key] = b[key]
-            else:
-                raise Exception('Conflict at %s' % '.'.join(path + [str(key)]))
+            a[key] = _merge_item(a[key], b[key], (*path, key), update)
         else:
             a[key] = b[key]
     return a
 
 
+def _merge_item(a, b, path: tuple, update: bool):
+    if isinstance(a, dict) and isinstance(b, dict):
+        return _merge(a, b, path, update)
+    if isinstance(a, list) and isinstance(b, list):
+        for idx, item in enumerate(b):
+            if idx < len(a):
+                a[idx] = _merge_item(a[idx], item, (*path, idx), update)
+            else:
+                a.append(item)
+        return a
+    if a == b or update:
+        return b
+    raise Exception('Conflict at %s' % '.'.join(map(str, path)))
+
+
+def _override(base: Dict, override: Dict) -> Dict:
+    """Return a copy of base with the values of override replacing the ones
+    in base. Nested dicts are merged, everything else is replaced."""
+    result = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _override(result[key], value)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+def _compile(config: Dict
+             ) -> Tuple[Config, Dict[Optional[int], GuildConfig]]:
+    """Validate the merged YAML config and compile it into typed objects
+
+    Returns:
+        Config: The whole config
+        Dict[Optional[int], GuildConfig]: Config of each guild that has
+            overrides, and the global config under the key None
+
+    Raises:
+        ConfigError: The config is invalid, the message contains the path
+            of the invalid value
+    """
+    compiled: Config = compile_config(Config, config)
+    base = {'roles': config['guild']['roles'],
+            'cogs': config.get('cogs') or {}}
+    guilds = {None: compile_config(GuildConfig, base)}
+    for guild_id, override in compiled.guilds.items():
+        guilds[guild_id] = compile_config(GuildConfig,
+                                          _override(base, override),
+                                          f"guilds.{guild_id}")
+    return compiled, guilds
+
+
 class ZeusBot(commands.Bot):
     def __init__(self, *args, config: Dict, **kwargs):
         intents = discord.Intents.default()
         intents.messages = True
         super().__init__(*args, **kwargs, intents=intents)
 
-        self.config = config
+        # The merged YAML, as shown by `configdump`
+        self.raw_config = config
+        self.config, self._guild_configs = _compile(config)
         self.channels: Dict[str, TextChannel] = {}
-        self.staff_role = self.config['guild']['roles']['staff']
+        self.staff_role = self.config.guild.roles.staff
+        # Gateway events received by each shard, keyed by event name
+        self.event_counts: Dict[int, Counter] = {}
+        # Dispatched library events, e.g. `message`, keyed by event name
+        self.dispatch_counts: Counter = Counter()
+        # Latest `-X importtime` summary, see `bot.diagnostics`
+        self.import_report: List[str] = []
+
+    def guild_config(self, guild_id: Optional[int]) -> GuildConfig:
+        """Return the `guild` and `cogs` config sections with the overrides
+        of the guild applied
+
+        Guilds without an entry in the `guilds` section use the global
+        config."""
+        return self._guild_configs.get(guild_id) or self._guild_configs[None]
 
     def is_admin(self, user: Union[User, Member]):
-        return user.id in self.config['bot']['admins']
+        return user.id in self.config.bot.admins
 
     def is_staff(self, user: Union[User, Member]) -> bool:
-        """Returns true if the member has a staff role defined in the config
-
-        Currently this only checks a single role, doesn't take multiple guilds
-        into account."""
+        """Returns true if the member has the staff role of their guild defined
+        in the config"""
 
         if self.is_admin(user):
             # Admin is considered staff across all guilds
             return True
         try:
+            guild_id = user.guild.id  # type: ignore
+            staff_role = self.guild_config(guild_id).roles.staff
             for role in user.roles:  # type: ignore
-                if role.id == self.staff_role or role.name == self.staff_role:
+                if role.id == staff_role or role.name == staff_role:
                     return True
         except AttributeError:
             # Most likely got passed a User from a DM -> never staff
@@ -84,29 +152,92 @@ class ZeusBot(commands.Bot):
 
     @classmethod
     def create(cls) -> "ZeusBot":
-        config = cls._load_config()
+        raw_config = cls._load_config()
+        # Rejects a broken config before anything is started
+        config, _ = _compile(raw_config)
+        setup_logging(dataclasses.asdict(config.bot.logging))
+        if config.bot.shards.enable:
+            return ShardedZeusBot(
+                command_prefix=config.bot.prefix,
+                config=raw_config,
+                shard_count=config.bot.shards.count,
+            )
         return cls(
-            command_prefix=config['bot']['prefix'],
-            config=config,
+            command_prefix=config.bot.prefix,
+            config=raw_config,
         )
 
     def run(self, *args, **kwargs) -> None:
-        super().run(self.config['bot']['token'], *args, **kwargs)
+        super().run(self.config.bot.token, *args, **kwargs)
 
     def reload_config(self):
-        self.config = self._load_config()
+        raw_config = self._load_config()
+        # A broken config raises here and the running config stays in use
+        self.config, self._guild_configs = _compile(raw_config)
+        self.raw_config = raw_config
+        setup_logging(dataclasses.asdict(self.config.bot.logging))
+
+    def shard_for(self, guild_id: Optional[int]) -> int:
+        """Return the shard that receives the events of a guild"""
+        if guild_id is None or not self.shard_count:
+            return 0
+        return (int(guild_id) >> 22) % self.shard_count
+
+    def dispatch(self, event_name, *args, **kwargs):
+        if event_name == 'socket_response':
+            # Counted synchronously, a listener would spawn a task for every
+            # gateway message
+            self._count_event(args[0])
+        self.dispatch_counts[event_name] += 1
+        super().dispatch(event_name, *args, **kwargs)
+
+    def _count_event(self, msg: Dict):
+        if msg.get('op') != 0:
+            # Not a dispatched event
+            return
+        data = msg.get('d')
+        guild_id = data.get('guild_id') if isinstance(data, dict) else None
+        shard = self.shard_for(guild_id)
+        self.event_counts.setdefault(shard, Counter())[msg['t']] += 1
+
+    def shard_latencies(self) -> Dict[int, float]:
+        return {0: self.latency}
 
     async def on_ready(self):
-        print("Waiting until ready")
+        log.info("Waiting until ready")
         await self.wait_until_ready()
-        print(f"Logged in as {self.user.name}#{self.user.discriminator}")
-        print("Connected")
+        log.info("Logged in as %s#%s", self.user.name,
+                 self.user.discriminator)
         await self.load_extensions()
-        print("Extensions loaded")
+        log.info("Extensions loaded")
 
     async def load_extensions(self) -> None:
-        for extension in self.config['bot']['extensions']:
+        for extension in self.config.bot.extensions:
+            start = time.perf_counter()
             self.load_extension(extension)
+            log.info("Loaded %s in %.1f ms", extension,
+                     (time.perf_counter() - start) * 1000)
         for cog in self.cogs.values():
             if isinstance(cog, Cog):
                 await cog.init()
+        if self.config.bot.diagnostics.importtime:
+            await self._report_import_times()
+
+    async def _report_import_times(self):
+        """Log the `-X importtime` summary of the configured extensions"""
+        extensions = self.config.bot.extensions
+        try:
+            entries = await asyncio.to_thread(measure_imports, extensions)
+        except subprocess.CalledProcessError as e:
+            log.warning("Measuring import times failed: %s", e.stderr)
+            return
+        self.import_report = importtime_summary(
+            entries, extensions, self.config.bot.diagnostics.importtime_top)
+        log.info("Import times:\n%s", "\n".join(self.import_report))
+
+
+class ShardedZeusBot(ZeusBot, commands.AutoShardedBot):
+    """ZeusBot with one gateway connection per shard, so that a busy guild
+    only delays the events of the guilds on the same shard"""
+    def shard_latencies(self) -> Dict[int, float]:
+        return dict(self.latencies)
@@ -1,4 +1,5 @@
-from typing import Callable, Union, TYPE_CHECKING
+import logging
+from typing import Any, Callable, Optional, Union, TYPE_CHECKING
 
 from discord.ext import commands
 
@@ -8,14 +9,33 @@ if TYPE_CHECKING:
 
 class Cog(commands.Cog):
     def __init__(self, bot: 'ZeusBot') -> None:
-        print("Loading cog {}".format(self.qualified_name))
-        self.bot = bot
         name = self.__class__.__name__.lower()
-        self.config: dict = self.bot.config.get('cogs', {}).get(name, {})
+        # Levels can be set per cog in the `bot.logging.cogs` config section
+        self.log = logging.getLogger(f"bot.cogs.{name}")
+        self.log.debug("Loading cog %s", self.qualified_name)
+        self.bot = bot
+        self.config_name = name
+        # Typed config of the cog from bot.config, None if the cog has no
+        # config section
+        self.config: Any = getattr(self.bot.config.cogs, name, None)
         self.checks: dict[str, Union[Callable, list[Callable]]] = {}
 
+    def guild_config(self, guild_id: Optional[int]) -> Any:
+        """Config of this cog with the overrides of the guild applied
+
+        Cogs that don't call this, such as Log and Suggestions, ignore the
+        per-guild overrides of their section."""
+        return getattr(self.bot.guild_config(guild_id).cogs,
+                       self.config_name, None)
+
+    def guild_configs(self) -> list[Any]:
+        """The global config of this cog followed by the config of every
+        guild that has overrides"""
+        return [self.config] + [self.guild_config(guild_id) for guild_id
+                                in self.bot.config.guilds]
+
     def _add_checks(self):
-        print("Adding checks for {}".format(self.qualified_name))
+        self.log.debug("Adding checks for %s", self.qualified_name)
         for command in self.walk_commands():
             if command.name in self.checks:
                 command_checks = self.checks[command.name]
@@ -23,11 +43,11 @@ class Cog(commands.Cog):
                     command_checks = [command_checks]
                 for check in command_checks:
                     command.add_check(check)
-                    print("{}: Adding check {} for command {}"
-                          .format(self.qualified_name, check.__name__,
-                                  command.qualified_name))
+                    self.log.debug("%s: Adding check %s for command %s",
+                                   self.qualified_name, check.__name__,
+                                   command.qualified_name)
 
     async def init(self):
         """This method gets called at the end of the bot's `on_ready` block"""
-        print("Cog {} init".format(self.qualified_name))
+        self.log.debug("Cog %s init", self.qualified_name)
         self._add_checks()
@@ -12,26 +12,51 @@ class Debug(Cog):
         self.checks = {
             'configdump': self._is_staff,
             'configreload': self._is_staff,
+            'shards': self._is_staff,
+            'importtime': self._is_staff,
         }
 
     async def _dump_config(self, ctx: Context):
         # Replace backticks with \` in order to prevent discord code blocks
         # from breaking
-        config = yaml.dump(self.bot.config).replace('`', '\\`')
-        config = config.replace(self.bot.config['bot']['token'], "REDACTED")
+        config = yaml.dump(self.bot.raw_config).replace('`', '\\`')
+        config = config.replace(self.bot.config.bot.token, "REDACTED")
         await ctx.send("```yaml\n{}```".format(config))
 
     @commands.command(aliases=['cfgd'])
     async def configdump(self, ctx: Context):
-        print("Dumping config")
+        self.log.info("Dumping config")
         await self._dump_config(ctx)
 
     @commands.command(aliases=['cfgr'])
     async def configreload(self, ctx: Context):
-        print("Reloading config")
+        self.log.info("Reloading config")
         self.bot.reload_config()
         await self._dump_config(ctx)
 
+    @commands.command()
+    async def shards(self, ctx: Context):
+        """Show the latency and received gateway events of each shard"""
+        lines = []
+        for shard_id, latency in sorted(self.bot.shard_latencies().items()):
+            counts = self.bot.event_counts.get(shard_id)
+            total = sum(counts.values()) if counts else 0
+            top = ", ".join(f"{name}: {count}" for name, count
+                            in counts.most_common(5)) if counts else "-"
+            lines.append(f"Shard {shard_id}: {latency * 1000:.0f} ms, "
+                         f"{total} events ({top})")
+        await ctx.send("\n".join(lines))
+
+    @commands.command()
+    async def importtime(self, ctx: Context):
+        """Show the import times measured at startup"""
+        if not self.bot.import_report:
+            await ctx.send("No import times measured, enable "
+                           "`bot.diagnostics.importtime`")
+            return
+        await ctx.send("```\n{}\n```".format(
+            "\n".join(self.bot.import_report)))
+
     def _is_staff(self, ctx: Context):
         if not self.bot.is_staff(ctx.author):
             raise CheckFailure("Not staff")
@@ -39,6 +64,8 @@ class Debug(Cog):
 
     @configdump.error
     @configreload.error
+    @shards.error
+    @importtime.error
     async def _command_error(self, ctx: Context, error: CommandError):
         await ctx.send("An error occured: {}".format(error))
 
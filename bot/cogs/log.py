@@ -1,25 +1,66 @@
-import pprint
-from typing import Dict, List
+import io
+import time
+from typing import Dict, List, NamedTuple
 
 from bot import ZeusBot
 from bot.cog import Cog
-from discord import (AuditLogAction, AuditLogEntry, Guild, Message,
-                     RawMessageDeleteEvent)
+from bot.utils.digest import Digest
+from bot.utils.message_buffer import MessageBuffer, MessageRecord
+from discord import (AuditLogAction, AuditLogEntry, Embed, File, Guild,
+                     HTTPException, Message, RawMessageDeleteEvent,
+                     RawMessageUpdateEvent, TextChannel)
 from discord.ext import commands, tasks
 
+# Longest embed description Discord accepts
+EMBED_DESCRIPTION_LIMIT = 4096
+# Characters of each deleted message shown in the embed
+PREVIEW_LENGTH = 200
+
+
+class Deletion(NamedTuple):
+    record: MessageRecord
+    author: str
+    channel: str
+    deleted_by: str
+    # Time the deletion was matched to the audit log, the record's own
+    # timestamp is when the message was sent
+    deleted_at: float
+
+    def format(self, length: int = 0) -> str:
+        content = self.record.content
+        if length and len(content) > length:
+            content = content[:length] + "…"
+        content = content.replace("\n", "\n> ")
+        return (f"**{self.author}** in {self.channel}, deleted by "
+                f"{self.deleted_by} <t:{int(self.deleted_at)}:f>\n"
+                f"> {content}")
+
 
 class Log(Cog):
     def __init__(self, bot: ZeusBot) -> None:
-        self.bot = bot
-        print("log init")
+        super().__init__(bot)
+        self.channels: Dict[str, TextChannel] = {}
         self.log_entries: Dict[int, AuditLogEntry] = {}
-        # self.messages: Dict = {}
-        self.deleted: List[Message] = []
+        # Compact history of the watched channels, used to recover the
+        # content of messages that are no longer in the library cache
+        self.buffer = MessageBuffer(self.config.watch,
+                                    self.config.buffer_bytes)
+        self.deleted: List[MessageRecord] = []
+        # Matched deletions waiting to be posted to the delete log
+        self.digest: Digest[Deletion] = Digest(self.config.digest_size,
+                                               self.config.digest_interval,
+                                               self.config.digest_limit)
         self.check_audit_log.start()  # pylint: disable=E1101
+        self.post_digest.start()  # pylint: disable=E1101
         # self.show_message_cache.start()
 
+    def cog_unload(self):
+        self.check_audit_log.cancel()  # pylint: disable=E1101
+        self.post_digest.cancel()  # pylint: disable=E1101
+
     async def init(self):
-        for name, id in self.config['channels'].values():
+        await super().init()
+        for name, id in self.config.channels.items():
             channel = await self.bot.fetch_channel(id)
             self.channels[name] = channel
 
@@ -30,28 +71,38 @@ class Log(Cog):
     #     time.sleep(5)
 
     @commands.Cog.listener()
-    async def on_message_delete(self, message: Message):
-        print("on_message_delete", message, message.content)
-        self.deleted.append(message)
+    async def on_message(self, message: Message):
+        self.buffer.add(message)
 
-    # @commands.Cog.listener()
-    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent):
-        print("on_raw_message_delete", payload)
-        # channel = await self.bot.fetch_channel(payload.channel_id)
-        # message = await channel.fetch_message(payload.message_id)
-        # print(message)
-        # self.deleted.append(payload.message_id)
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: RawMessageUpdateEvent):
+        content = payload.data.get('content')
+        if content is not None:
+            self.buffer.update(payload.channel_id, payload.message_id,
+                               content)
 
-    # @commands.Cog.listener()
-    # async def on_message(self, message: Message):
-    #     print("on_message", message, message.content)
-    #     self.messages[message.id] = message.content
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent):
+        # Prefer our own buffer, the library cache might have evicted the
+        # message already
+        record = self.buffer.pop(payload.channel_id, payload.message_id)
+        if record is None and payload.cached_message is not None:
+            record = MessageRecord.from_message(payload.cached_message)
+        if record is None:
+            self.log.debug("Deleted message %d not found", payload.message_id)
+            return
+        self.log.debug("Message %d by %d deleted in %d", record.id,
+                       record.author_id, record.channel_id)
+        self.deleted.append(record)
 
     # @commands.Cog.listener()
     # async def on_audi
     @tasks.loop(seconds=5.0)
     async def check_audit_log(self):
-        print("task")
+        self.log.debug("Checking audit log")
+        if 'delete_log' not in self.channels:
+            # Channels haven't been fetched yet
+            return
         # print("log channels", self.channels)
         guild: Guild = self.channels['delete_log'].guild
         entry: AuditLogEntry
@@ -61,38 +112,87 @@ class Log(Cog):
                     entry.extra.count != self.log_entries[entry.id]['count']:
                 # a completely new entry has been added
                 if entry.id not in self.log_entries:
-                    print("entry not in list")
+                    self.log.debug("New audit log entry %d", entry.id)
                     self.log_entries[entry.id] = {'count': 0}
                 else:
-                    print("counter increased")
-                print(entry, entry.extra.count)
+                    self.log.debug("Audit log entry %d count increased",
+                                   entry.id)
+                self.log.debug("%s count %d", entry, entry.extra.count)
                 channel = entry.extra.channel
                 entry_count = entry.extra.count - \
                     self.log_entries[entry.id]['count']
                 if self.deleted:
                     for i in range(entry_count):
                         remove = []
-                        for message in reversed(self.deleted):
-                            if message.channel == channel and \
-                                    message.author == entry.target:
-                                print("message by {} deleted in {} by {}: {}"
-                                      .format(message.author, message.channel,
-                                              entry.user, message.content))
-                                remove.append(message)
+                        for record in reversed(self.deleted):
+                            if record.channel_id == channel.id and \
+                                    record.author_id == entry.target.id:
+                                self.log.info(
+                                    "Message by %s deleted in %s by %s: %s",
+                                    entry.target, channel, entry.user,
+                                    record.content)
+                                self.digest.add(Deletion(
+                                    record, str(entry.target),
+                                    getattr(channel, 'mention',
+                                            str(channel)),
+                                    str(entry.user), time.time()))
+                                remove.append(record)
                             else:
-                                print("no match", message)
-                        self.deleted = [m for m in self.deleted
-                                        if m not in remove]
+                                self.log.debug("No match for message %d",
+                                               record.id)
+                        self.deleted = [r for r in self.deleted
+                                        if r not in remove]
                 self.log_entries[entry.id] = {'entry': entry,
                                               'count': entry.extra.count}
         self.deleted = []
 
+    @tasks.loop(seconds=1.0)
+    async def post_digest(self):
+        """Post the waiting deletions to the delete log, a batch per
+        message"""
+        channel = self.channels.get('delete_log')
+        if channel is None:
+            return
+        while self.digest.due():
+            deletions, dropped = self.digest.take()
+            try:
+                await self._post_deletions(channel, deletions, dropped)
+            except HTTPException as e:
+                if e.status != 429:
+                    self.log.error("Posting %d deletions failed",
+                                   len(deletions), exc_info=e)
+                    continue
+                # The library has retried already, back off for longer and
+                # let the deletions pile up into bigger batches meanwhile
+                retry_after = float(e.response.headers.get('Retry-After', 5))
+                self.log.warning("Delete log rate limited, retrying in "
+                                 "%.1f s", retry_after)
+                self.digest.retry(retry_after, deletions, dropped)
+                return
+
+    async def _post_deletions(self, channel: TextChannel,
+                              deletions: List[Deletion], dropped: int):
+        embed = Embed(title=f"{len(deletions)} deleted message"
+                            f"{'s' if len(deletions) != 1 else ''}")
+        if dropped:
+            embed.set_footer(text=f"{dropped} earlier deletions were "
+                                  "dropped while the log was rate limited")
+        text = "\n".join(d.format(PREVIEW_LENGTH) for d in deletions)
+        if len(text) <= EMBED_DESCRIPTION_LIMIT:
+            embed.description = text
+            await channel.send(embed=embed)
+            return
+        embed.description = "Too long for an embed, see the attached file"
+        full_text = "\n\n".join(d.format() for d in deletions)
+        await channel.send(embed=embed, file=File(
+            io.BytesIO(full_text.encode()), filename="deletions.txt"))
+
     @tasks.loop(seconds=3.0)
     async def show_message_cache(self):
-        print("cache")
         for message in self.bot.cached_messages:
-            pprint.pprint({attr: getattr(message, attr, None)
-                           for attr in message.__slots__})
+            self.log.debug("Cached message %s", {
+                attr: getattr(message, attr, None)
+                for attr in message.__slots__})
 
 
 def setup(bot: ZeusBot):
@@ -1,156 +1,141 @@
+import asyncio
 import calendar
+import dataclasses
+import datetime
 import io
 import json
+import os
 import re
-import traceback
 import typing
-from enum import IntEnum
-from typing import Any, Callable, List, Optional, cast
+from collections import defaultdict
+from typing import Any, Callable, Iterable, List, Optional, cast
 
-from discord import Message, NotFound
+from discord import (Embed, File, Message, NotFound, Object,
+                     RawMessageDeleteEvent)
 from discord.channel import TextChannel
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ext.commands import Context
 from discord.ext.commands.converter import MessageConverter
-from discord.ext.commands.errors import CommandInvokeError
+from discord.ext.commands.errors import CheckFailure, CommandInvokeError
 from discord.guild import Guild
 from discord.user import User
 
 from bot import ZeusBot
 from bot.cog import Cog
-from bot.utils.exporters import Exporter, GitHubExporter, HackMDExporter
+from bot.config import MeetingNotesConfig
+from bot.utils.archive import Archive
+from bot.utils.checkpoint import Checkpoint
+from bot.utils.classifier import Classifier, suggestions_from_notes
+from bot.utils.exporters import Exporter
+from bot.utils.imports import import_string
+from bot.utils.notes import (CATEGORY, TITLE, MeetingDocument, RenderedNote,
+                             render_html, render_json, render_markdown)
+from bot.utils.outbox import ExportJob, Outbox
+from bot.utils.paginate import paginate
+from bot.utils.stats import SuggestionStats, Summary
+from bot.utils.suggestion import Suggestion, Type
+from bot.utils.suggestion_index import get_index
+from bot.utils.votes import Votes, message_id_from_url
 
 STEAM_URL_PATTERN = '(https://steamcommunity.com/' \
                     '.*/filedetails/\\?id=\\d+)'
 CATEGORY_OPTIONS = "1, c, co\n2, b, both\n3, s, staff\n4, e, edit"
+SORT_OPTIONS = ("Reply with `ok`, `show`, `move <number> after|before "
+                "<number>`, a list of numbers in the new order or the "
+                "corrected ordering.")
+BATCH_CATEGORY_OPTIONS = "c: co, b: both, s: staff, e: edit"
+# None marks the item for a follow-up prompt
+BATCH_CATEGORIES: dict[str, Optional[Type]] = {
+    'c': Type.CO,
+    'b': Type.BOTH,
+    's': Type.STAFF,
+    'e': None,
+}
 
-START = """CO & Staff meeting {month}
-===
 
-###### tags: `zeusops` `meeting`
-
-###### date : {date}
-
-[Previous notes](https://www.zeusops.com/meetings)
-
-## Present
-### COs
--
-### Staff
-- Capry
-- Gehock
-- Matt
-- Miller
-
-## Preface
-
-### Notes
-
-### TODO
-
-- Assignee
-    - [ ] Todo item 1
-
-"""
-
-CATEGORY = "## Suggestions - {}\n\n"
-TITLE = '### {}. {} ({})\n'
-VOTES = """
-#### Neutral
-- name
-#### Yes
-- name
-#### No
-- name
-
-#### Notes
-- A note
-
----
-
-"""
-
-FOOTER = """## Community votes
+class InvalidReply(Exception):
+    pass
 
-### Votes
 
-![CO](https://cdn.discordapp.com/attachments/582590015054544896/620340512905363466/a.png)
-![Mod votes](https://cdn.discordapp.com/attachments/582590015054544896/620340540604547092/a.png)
+class PromptCancelled(Exception):
+    pass
 
-### Mods
 
-**Terrains** in the default collection:
-```diff
-+ added
-kept
-- removed
-```
+class NoChanges(Exception):
+    pass
 
-Mod changes to the **default collection**:
-```diff
-+ added
-kept
-- removed
-```
 
-Mod changes to the **optional collection**:
-```diff
-+ added
-kept
-- removed
-```
+class ShowOrdering(Exception):
+    pass
 
-### COs
 
-**COs** this month:
-```
-MAJ{spc}
-CPT{spc}
-CPT{spc}
-1LT{spc}
-1LT{spc}
-```
-""".format(spc=" ")
+def month_from_name(month_name: str, locale: str) -> int:
+    """Number of a month from its name in the given locale"""
+    # different_locale is an undocumented function. Used the same way as
+    # seen in the calendar module's source code. See
+    # https://stackoverflow.com/a/50678960/3005969
+    with calendar.different_locale((locale, "UTF-8")):
+        return list(calendar.month_name).index(month_name)
 
 
-class InvalidReply(Exception):
-    pass
+def next_month_name(month_name: str, locale: str) -> str:
+    """Name of the month after the given one"""
+    month_number = month_from_name(month_name, locale) + 1
+    if month_number > 12:
+        month_number -= 12
+    with calendar.different_locale((locale, "UTF-8")):
+        return calendar.month_name[month_number]
 
 
-class PromptCancelled(Exception):
-    pass
+def divider_month(divider: Message, month_name: str, locale: str) -> str:
+    """Month of the suggestions after a divider message, as YYYY-MM"""
+    number = month_from_name(month_name, locale)
+    year = divider.created_at.year
+    if number < divider.created_at.month:
+        # Divider for January posted in December
+        year += 1
+    return f"{year}-{number:02d}"
 
 
-class NoChanges(Exception):
-    pass
+async def find_divider(channel: TextChannel, divider_regex: str
+                       ) -> tuple[Message, str]:
+    """Find the divider message between the suggestions of different months
 
+    Raises:
+        ValueError: No matching message found
 
-class Type(IntEnum):
-    CO = 1
-    BOTH = 2
-    STAFF = 3
-    UNKNOWN = 4
+    Returns:
+        Message: The divider message
+        str: Name of the current month
+    """
+    async for message in channel.history(limit=100):
+        match = re.fullmatch(divider_regex, message.clean_content)
+        if match:
+            month_name = match.group(1)
+            return message, month_name
+    raise ValueError("No divider message found")
 
 
-class Suggestion:
-    def __init__(self, author: str, title: str, url: str, category: Type,
-                 steam_url: Optional[str] = None):
-        self.author: str = author
-        self.title: str = title
-        self.url: str = url
-        self.steam_url: Optional[str] = steam_url
-        self.category: Type = category
-        self.number: Optional[int] = None
+def time_passed(times: Iterable[str], last: datetime.datetime,
+                now: datetime.datetime) -> bool:
+    """Whether any of the UTC times of day (HH:MM) was in (last, now]
 
-    def dump(self):
-        return vars(self)
+    Every day from last to now is checked, so a time just before midnight
+    isn't skipped when the check after it falls on the next day."""
+    days = (now.date() - last.date()).days
+    return any(last < datetime.datetime.combine(
+                   last.date() + datetime.timedelta(days=day),
+                   datetime.time.fromisoformat(time),
+                   datetime.timezone.utc) <= now
+               for day in range(days + 1) for time in times)
 
-    def __repr__(self):
-        return (f"<Suggestion author='{self.author}' title='{self.title}' "
-                f"category={self.category}>")
 
-# Suggestion = namedtuple('Suggestion', ['author', 'title', 'url', 'steam_url',
-#                                        'category'])
+def _load_legacy_notes() -> dict:
+    try:
+        with open("notes.json", "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
 
 
 def parse_code_block(text: str):
@@ -160,68 +145,132 @@ def parse_code_block(text: str):
     return text
 
 
-class MeetingNotes(Cog):
-    CATEGORY_NAMES = ("CO", "Staff & CO", "Staff", "Unknown")
-
-    DESTINATIONS: dict[str, typing.Type[Exporter]] = {
-        "hackmd": HackMDExporter,
-        "github_gist": GitHubExporter,
-    }
-
-    def __init__(self, bot: ZeusBot) -> None:
-        super().__init__(bot)
-        self.keyword: str = self.config['keyword']
-        self.divider: str = self.config['divider']
-        self.divider_regex: str = self.config['divider_regex']
-        self.date_locale: str = self.config['date_locale']
+class Draft:
+    """Suggestions of the current month of a guild, collected ahead of the
+    meeting
+
+    Drafts are built on a schedule and refreshed with the messages posted
+    since, so the meeting notes command starts with the display names
+    fetched and the suggestions categorised already.
+    """
+    def __init__(self, divider: Message, month: str, next_month: str):
+        self.channel_id: int = divider.channel.id
+        self.divider_id: int = divider.id
+        # Month of the suggestions as YYYY-MM, and the name of the next one
+        # for the divider sent at the end of the session
+        self.month = month
+        self.next_month = next_month
+        self.suggestions: List[Suggestion] = []
+        # Low-confidence predictions of the classifier, keyed by URL
+        self.predictions: dict[str, tuple[Type, float]] = {}
+        # Display names by user ID
+        self.names: dict[int, str] = {}
+        # Last message of the channel that has been read
+        self.last_message_id: int = divider.id
+        self.markdown = ""
+        self.updated: Optional[datetime.datetime] = None
+
+    def copy_suggestions(self) -> List[Suggestion]:
+        """Copies of the suggestions that a session can modify"""
+        return [Suggestion.load(s.dump()) for s in self.suggestions]
+
+    def update_suggestion(self, edited: Suggestion) -> bool:
+        """Apply an edit of a suggestion message, the classifier's guess is
+        left for the next refresh
 
-        self.exporters: dict[str, Exporter] = {}
-        self._init_exporters()
-        self.save_to_disk: bool = self.config["save_to_disk"]
+        Returns:
+            bool: Whether the suggestion is part of the draft
+        """
+        suggestion = next((s for s in self.suggestions
+                           if s.url == edited.url), None)
+        if suggestion is None:
+            return False
+        suggestion.title = edited.title
+        suggestion.steam_url = edited.steam_url
+        if suggestion.category == Type.UNKNOWN and \
+                edited.category != Type.UNKNOWN:
+            suggestion.category = edited.category
+            self.predictions.pop(suggestion.url, None)
+        return True
+
+    def remove_message(self, message_id: int):
+        self.suggestions = [s for s in self.suggestions
+                            if message_id_from_url(s.url) != message_id]
+
+
+class MeetingSession:
+    """State of one interactive meeting notes session
+
+    Sessions are keyed by the guild and the channel they were started from,
+    so notes for several communities can be prepared in parallel. A session
+    reads the suggestion channel of its guild and has its own prompts,
+    exporters and checkpoint. Shared state such as the archive, the outbox
+    and the classifier lives in the cog.
+    """
+    def __init__(self, cog: "MeetingNotes", ctx: Context,
+                 channel: TextChannel):
+        self.cog = cog
+        self.bot = cog.bot
+        self.log = cog.log
+        self.ctx = ctx
+        self.key = MeetingNotes.session_key(ctx)
+        # Suggestion channel of the guild
+        self.channel = channel
+        config: MeetingNotesConfig = cog.guild_config(self.key[0])
+        self.keyword: str = config.keyword
+        self.divider: str = config.divider
+        self.divider_regex: str = config.divider_regex
+        self.date_locale: str = config.date_locale
+        # Categorise all unknown suggestions with a single prompt
+        self.batch_categorize: bool = config.batch_categorize
+        self.save_to_disk: bool = config.save_to_disk
+        self.config = config
+        self._exporters: Optional[dict[str, Exporter]] = None
 
-        self.channel: TextChannel
         self.suggestions: List[Suggestion] = []
         self.officers: List[Suggestion] = []
         self.both: List[Suggestion] = []
         self.staff: List[Suggestion] = []
         self.unknown: List[Suggestion] = []
         self.categories: List[List[Suggestion]] = []
+        self.by_number: dict[int, Suggestion] = {}
+        # Low-confidence predictions of the classifier, keyed by URL
+        self.predictions: dict[str, tuple[Type, float]] = {}
+        # Step of the session, None once the session has finished
+        self.step: Optional[str] = None
+        self.next_month: Optional[str] = None
+        # Outbox jobs queued for the exports, kept until they are done
+        self.jobs: List[str] = []
+        # Month of the notes, YYYY-MM
+        self.month: Optional[str] = None
+        self.checkpoint_path = cog.checkpoint_path(self.key)
+        # Task running the session, None while the session is paused
+        self.task: Optional[asyncio.Task] = None
+        self.cancelled = False
         self.awaiting_reply = False
-
-    async def init(self):
-        await super().init()
-        self.channel = await self.bot.fetch_channel(
-            self.config['channels']['suggestions'])
-
-    def _init_exporters(self):
-        for name, handler in self.DESTINATIONS.items():
-            if self.config[name]["enable"]:
-                exporter = handler(self.config[name])
-                self.exporters[name] = exporter
-
-    # @bot.check
-    # async def await_reply(ctx: Context):
-    #     if self.bot.awaiting_reply:
-    #         await ctx.send("Please answer the previous prompt first.")
-    #         return False
-    #     return True
+        self.started = datetime.datetime.now()
+
+    @property
+    def status(self) -> str:
+        if self.task is None:
+            return "paused"
+        if self.awaiting_reply:
+            return "waiting for a reply"
+        return "running"
+
+    @property
+    def exporters(self) -> dict[str, Exporter]:
+        """Exporters of the session, built on the first export"""
+        if self._exporters is None:
+            self._exporters = self.cog.build_exporters(self.config)
+        return self._exporters
+
+    async def close(self):
+        for exporter in (self._exporters or {}).values():
+            await exporter.close()
 
     async def _find_divider_message(self) -> tuple[Message, str]:
-        """Find the divider message between the suggestions of different months
-
-        Raises:
-            ValueError: No matching message found
-
-        Returns:
-            Message: The divider message
-            str: Name of the current month
-        """
-        async for message in self.channel.history(limit=100):
-            match = re.fullmatch(self.divider_regex, message.clean_content)
-            if match:
-                month_name = match.group(1)
-                return message, month_name
-        raise ValueError("No divider message found")
+        return await find_divider(self.channel, self.divider_regex)
 
     async def _send_divider(self, next_month: str):
         """Send a divider message
@@ -240,131 +289,269 @@ class MeetingNotes(Cog):
         Returns:
             str: Name of the next month
         """
-        # different_locale is an undocumented function. Used the same way as
-        # seen in the calendar module's source code. See
-        # https://stackoverflow.com/a/50678960/3005969
-        with calendar.different_locale((self.date_locale, "UTF-8")):
-            month_number = list(calendar.month_name).index(month_name) + 1
-            if month_number > 12:
-                month_number -= 12
-            return calendar.month_name[month_number]
+        return next_month_name(month_name, self.date_locale)
 
-    @commands.command(aliases=["mn"])
-    async def meetingnotes(self, ctx: Context):
-        """Find suggestions from the current month and create a meeting notes
-        """
+    async def create_from_divider(self):
+        """Find suggestions from the current month and run the session"""
+        if self.config.drafts.enable:
+            draft, added = await self.cog.refresh_draft(self.key[0])
+            await self.create_from_draft(draft, added)
+            return
         start_message, month_name = await self._find_divider_message()
-        await self._create(ctx, start_message)
-        next_month = self._next_month(month_name)
-        await self._send_divider(next_month)
+        self.month = divider_month(start_message, month_name,
+                                   self.date_locale)
+        await self.create(start_message, self._next_month(month_name))
 
-    @commands.command()
-    async def create(self, ctx: Context, start_message: MessageConverter):
-        await self._create(ctx, cast(Message, start_message))
+    async def create_from_draft(self, draft: Draft, added: int = 0):
+        """Run the session on the suggestions of a draft
 
-    async def _create(self, ctx: Context, start_message: Message):
+        Args:
+            added (int): Suggestions added by the latest refresh
+        """
+        await self.ctx.send(f"Creating from the draft of {draft.month}, "
+                            f"{added} new suggestions")
+        self.suggestions = draft.copy_suggestions()
+        self.predictions = dict(draft.predictions)
+        self.month = draft.month
+        await self._start(sum(1 for s in self.suggestions
+                              if s.category == Type.UNKNOWN),
+                          draft.next_month)
+
+    async def create(self, start_message: Message,
+                     next_month: Optional[str] = None):
+        """Collect the suggestions after the start message and run the
+        interactive session
+
+        Args:
+            next_month (Optional[str]): Name of the month for the divider
+                message sent at the end, no divider is sent if None
+        """
+        ctx = self.ctx
         await ctx.send("Creating")
         count = await self._load_suggestions(start_message)
+        if count > 0 and self.cog.config.classifier.enable:
+            count = await self._auto_categorize()
+        await self._start(count, next_month)
+
+    async def _start(self, count: int, next_month: Optional[str]):
+        """Run the session on the collected suggestions
+
+        Args:
+            count (int): Number of suggestions without a category
+        """
+        ctx = self.ctx
         if count > 0:
             await ctx.send("Categories")
         else:
             await ctx.send("No unknowns")
-        await self._categorize(ctx)
-        await ctx.send("Sorting")
-        await self._sort(ctx)
-        markdown, data = await self._create_text()
-
-        await self._export(ctx, markdown, data)
+        self.categories = []
+        self.step = "categorize"
+        self.next_month = next_month
+        self.month = self._month()
+        await self.save_checkpoint()
+        await self.run()
+
+    def restore(self, checkpoint: Checkpoint):
+        self.suggestions = checkpoint.suggestions
+        if checkpoint.categories:
+            self.officers, self.both, self.staff, self.unknown = \
+                checkpoint.categories
+            self.categories = checkpoint.categories
+        self.step = checkpoint.step
+        self.next_month = checkpoint.next_month
+        self.jobs = checkpoint.jobs
+        self.month = checkpoint.month
+
+    async def run(self):
+        """Run the session from its current step to the end, saving a
+        checkpoint after every step"""
+        ctx = self.ctx
+        if self.step == "categorize":
+            await self.categorize()
+            self.step = "sort"
+            await self.save_checkpoint()
+        if self.step == "sort":
+            await ctx.send("Sorting")
+            await self.sort()
+            self.step = "export"
+            await self.save_checkpoint()
+        if self.step == "export":
+            document = await self.create_document()
+            await self._queue_exports(document)
+            await self.cog.index_suggestions(document)
+            self.step = "exporting"
+            await self.save_checkpoint()
+
+        await self._run_exports()
+        if self.cog.config.classifier.enable:
+            await self.cog.train_classifier(self.suggestions)
+        if self.next_month:
+            await self._send_divider(self.next_month)
+        self.step = None
+        await asyncio.to_thread(Checkpoint.remove, self.checkpoint_path)
         await ctx.send("Done")
 
-    async def _export(self, ctx: Context, markdown: str, data: dict):
-        if self.save_to_disk:
-            await ctx.send("Saving to disk")
-            await self._save_to_disk(markdown, data)
-        for name, exporter in self.exporters.items():
-            await ctx.send(f"Exporting to {name}")
-            output = exporter.export(markdown)
-            if output:
-                await ctx.send(output)
-            else:
-                await ctx.send("Export done")
+    async def save_checkpoint(self):
+        if self.step is None:
+            # The session hasn't started or has already finished
+            return
+        checkpoint = Checkpoint(self.step, self.suggestions, self.categories,
+                                self.next_month, self.jobs, self.month)
+        await asyncio.to_thread(checkpoint.save, self.checkpoint_path)
 
-    @commands.command(aliases=['c'])
-    async def categorize(self, ctx: Context):
-        await self._categorize(ctx)
-        await ctx.send("Categories done")
+    async def _auto_categorize(self) -> int:
+        """Assign a category to the unknown suggestions the classifier is
+        confident about
 
-    @commands.command()
-    async def sort(self, ctx: Context):
-        await self._sort(ctx)
-        await ctx.send("Sort done")
+        Returns:
+            int: Number of suggestions still unknown
+        """
+        self.predictions = {}
+        assigned = await self.cog.auto_categorize(self.suggestions,
+                                                  self.predictions)
+        if assigned:
+            await self.ctx.send(f"Automatically categorised {assigned} "
+                                "suggestions")
+        return sum(1 for s in self.suggestions if s.category == Type.UNKNOWN)
 
-    @commands.command(aliases=['s'])
-    async def save(self, ctx: Context):
-        await self._create_text()
-        await ctx.send("Save done")
+    async def update_suggestion(self, edited: Suggestion) -> bool:
+        """Apply an edit of a suggestion message to the session's copy
 
-    async def _load_suggestions(self, start_message: Message, limit=100) -> int:
+        The category is only derived again while the suggestions haven't
+        been categorised, later on it is the choice of whoever categorised
+        them.
+
+        Returns:
+            bool: Whether the suggestion is part of this session
+        """
+        suggestion = next((s for s in self.suggestions
+                           if s.url == edited.url), None)
+        if suggestion is None:
+            return False
+        suggestion.title = edited.title
+        suggestion.steam_url = edited.steam_url
+        if not self.categories and suggestion.category == Type.UNKNOWN:
+            self.predictions.pop(suggestion.url, None)
+            if edited.category != Type.UNKNOWN:
+                suggestion.category = edited.category
+            elif self.cog.config.classifier.enable:
+                await self.cog.auto_categorize([suggestion],
+                                               self.predictions)
+        if self.step:
+            await self.save_checkpoint()
+        return True
+
+    def _guess(self, suggestion: Suggestion) -> str:
+        """Describe the classifier's low-confidence guess for prompts"""
+        prediction = self.predictions.get(suggestion.url)
+        if not prediction:
+            return ""
+        category, confidence = prediction
+        return f" (guess: {category.name.lower()} {confidence:.0%})"
+
+    async def _queue_exports(self, document: MeetingDocument):
+        """Render the notes and queue an outbox job for every exporter
+
+        The jobs are recorded in the checkpoint of the export step, so a
+        resumed session continues them from their completed steps instead
+        of exporting again.
+        """
+        formats = {exporter.format for exporter in self.exporters.values()}
+        if self.save_to_disk:
+            formats |= {"markdown", "json"}
+        renders = self.cog.render(document, formats)
+
+        async def queue(name: str, render: "asyncio.Task[RenderedNote]"):
+            job = self.cog.outbox.add(name, await render, self.ctx.channel.id,
+                                      self.key[0])
+            self.jobs.append(job.id)
+
+        self.jobs = []
+        await asyncio.gather(
+            *(queue(name, renders[exporter.format])
+              for name, exporter in self.exporters.items()),
+            self._save_to_disk(renders) if self.save_to_disk
+            else asyncio.sleep(0),
+        )
+
+    async def _run_exports(self):
+        """Run the session's jobs that are still in the outbox"""
+        outbox = self.cog.outbox
+        jobs = [outbox.jobs[job_id] for job_id in self.jobs
+                if job_id in outbox.jobs and job_id not in outbox.running]
+        await asyncio.gather(*(self._export_to(job) for job in jobs))
+
+    async def _export_to(self, job: ExportJob):
+        ctx = self.ctx
+        outbox = self.cog.outbox
+        name, note = job.destination, job.note
+        exporter = self.exporters.get(name)
+        if exporter is None:
+            await ctx.send(f"Export to {name} is disabled, job `{job.id}` "
+                           "stays in the outbox")
+            return
+        await ctx.send(f"Exporting to {name}")
+        try:
+            output = await outbox.run(job, exporter)
+        except Exception as e:
+            self.log.exception("Export to %s failed", name)
+            await ctx.send(f"Export to {name} failed: {e}\n"
+                           f"Queued as job `{job.id}`, see "
+                           f"`{self.bot.command_prefix}outbox`")
+            return
+        if output:
+            await ctx.send(f"{name}: {output}")
+            await self.cog.archive.set_link(note.month, name, output)
+        else:
+            await ctx.send(f"Export to {name} done")
+
+    async def _save_to_disk(self,
+                            renders: dict[str, "asyncio.Task[RenderedNote]"]):
+        markdown = await renders["markdown"]
+        data = await renders["json"]
+        await self.ctx.send(f"Saving {markdown.month} to the archive")
+        await self.cog.archive.save(markdown.month, markdown.text, data.text)
+
+    async def _load_suggestions(self, start_message: Message,
+                                limit=100) -> int:
         self.suggestions = []
         if not start_message.guild:
             raise ValueError("Start message is not in a guild")
         guild: Guild = start_message.guild
-        print("guild", guild)
-        print("creating")
+        self.log.debug("Loading suggestions from guild %s", guild)
+        names: dict[int, str] = {}
         message: Message
         async for message in self.channel.history(after=start_message,
                                                   limit=limit):
-            text: str = message.clean_content
-            if text.startswith(self.keyword):
-                author = message.author
-                if isinstance(author, User):
-                    try:
-                        author = await guild.fetch_member(author.id)
-                    except NotFound:
-                        # User is not a member of the guild anymore, default
-                        # to the discord username instead of custom nickname
-                        pass
-                title = text.split('\n')[0].strip('*')
-                url = message.jump_url
-                if 'https://steamcommunity.com/' in text:
-                    match = re.search(STEAM_URL_PATTERN, text)
-                    if match:
-                        steam_url: Optional[str] = match.group(0)
-                    else:
-                        print(text)
-                        # raise ValueError(f"Didn't match steam URL: {url}")
-                else:
-                    steam_url = None
-                category = Type.CO if steam_url else Type.UNKNOWN
-                self.suggestions.append(Suggestion(
-                    author.display_name,
-                    title,
-                    url,
-                    category,
-                    steam_url,
-                ))
-        print("suggestions")
+            suggestion = await self.cog.parse_suggestion(message, self.keyword,
+                                                         names)
+            if suggestion:
+                self.suggestions.append(suggestion)
+        self.log.debug("Loaded %d suggestions", len(self.suggestions))
         count = sum(1 for s in self.suggestions
                     if s.category == Type.UNKNOWN)
         return count
 
-    async def _categorize(self, ctx: Context):
+    async def categorize(self):
+        ctx = self.ctx
         if not self.suggestions:
             await ctx.send(f"Suggestions not collected yet. "
                            f"Run `{self.bot.command_prefix}create` first")
             return
         unknowns = [s for s in self.suggestions
                     if s.category == Type.UNKNOWN]
+        if unknowns and self.batch_categorize:
+            unknowns = await self._categorize_batch(unknowns)
         if unknowns:
             await ctx.send(f"Replies:\n{CATEGORY_OPTIONS}")
             for unknown in unknowns:
                 categories = "|".join(CATEGORY_OPTIONS .split('\n'))
-                await ctx.send(f"{unknown.author}: {unknown.title}\n"
-                               f"{categories}")
-                if await self._prompt(ctx, self._parse_category, unknown) \
+                await ctx.send(f"{unknown.author}: {unknown.title}"
+                               f"{self._guess(unknown)}\n{categories}")
+                if await self._prompt(self._parse_category, unknown) \
                         == "edit":
                     await ctx.send("Post correction")
-                    await self._prompt(ctx, self._parse_correction, unknown)
+                    await self._prompt(self._parse_correction, unknown)
 
         self.officers = [s for s in self.suggestions if s.category == Type.CO]
         self.both = [s for s in self.suggestions if s.category == Type.BOTH]
@@ -373,101 +560,291 @@ class MeetingNotes(Cog):
                         if s.category == Type.UNKNOWN]
         self.categories = [self.officers, self.both, self.staff, self.unknown]
 
-        print("after categorize")
-        print(self.suggestions)
+        self.log.debug("Categorized suggestions: %s", self.suggestions)
         await ctx.send("Unknowns done")
 
-    async def _sort(self, ctx: Context):
+    async def sort(self):
+        ctx = self.ctx
         if not self.categories:
             raise ValueError("Categories not created yet.")
+        # Numbers stay fixed while sorting so that they keep identifying the
+        # same suggestions between replies
+        self._number_suggestions()
+        await self._send_ordering()
         while True:
-            msg = "Current ordering:\n```\n"
-            number = 1
-            for collection, name in zip(self.categories, self.CATEGORY_NAMES):
-                if collection:
-                    msg += CATEGORY.format(name)
-                    for entry in collection:
-                        msg += TITLE.format(number, entry.title, entry.author)
-                        entry.number = number
-                        number += 1
-                    msg += '\n'
-            msg += "```\nReply either with `ok` or send corrected order."
-            await ctx.send(msg)
+            before = self._positions()
             try:
-                await self._prompt(ctx, self._parse_sorting)
+                await self._prompt(self._parse_sorting)
             except NoChanges:
                 break
-
-    async def _prompt(self, ctx: Context, parser: Callable,
-                      data: Any = None, awaitable=False):
+            except ShowOrdering:
+                await self._send_ordering()
+                continue
+            diff = self._ordering_diff(before, self._positions())
+            for page in paginate(diff or ["No changes"], prefix="```diff\n",
+                                 suffix="\n```"):
+                await ctx.send(page)
+            await ctx.send(SORT_OPTIONS)
+        # Final numbering follows the final order
+        self._number_suggestions()
+
+    def _number_suggestions(self):
+        self.by_number = {}
+        number = 1
+        for collection in self.categories:
+            for entry in collection:
+                entry.number = number
+                self.by_number[number] = entry
+                number += 1
+
+    def _ordering_lines(self) -> List[str]:
+        lines = []
+        for collection, name in zip(self.categories,
+                                    MeetingNotes.CATEGORY_NAMES):
+            if collection:
+                lines.append(CATEGORY.format(name).rstrip('\n'))
+                lines.extend(TITLE.format(entry.number, entry.title,
+                                          entry.author).rstrip('\n')
+                             for entry in collection)
+                lines.append("")
+        return lines
+
+    async def _send_ordering(self):
+        await self.ctx.send("Current ordering:")
+        for page in paginate(self._ordering_lines(), prefix="```\n",
+                             suffix="\n```"):
+            await self.ctx.send(page)
+        await self.ctx.send(SORT_OPTIONS)
+
+    def _positions(self) -> dict[int, tuple[str, int, str, str]]:
+        """Category, position, title and author of each suggestion by
+        number"""
+        return {entry.number: (name, position, entry.title, entry.author)
+                for collection, name in zip(self.categories,
+                                            MeetingNotes.CATEGORY_NAMES)
+                for position, entry in enumerate(collection, start=1)}
+
+    @staticmethod
+    def _ordering_diff(before: dict, after: dict) -> List[str]:
+        lines = []
+        for number in sorted(before):
+            old, new = before[number], after.get(number)
+            if new is None:
+                lines.append(f"- {number}. {old[2]} ({old[3]}) removed")
+                continue
+            if old[:2] != new[:2]:
+                lines.append(f"- {number}. {old[0]} #{old[1]}")
+                lines.append(f"+ {number}. {new[0]} #{new[1]}")
+            if old[2:] != new[2:]:
+                lines.append(f"- {number}. {old[2]} ({old[3]})")
+                lines.append(f"+ {number}. {new[2]} ({new[3]})")
+        return lines
+
+    async def _prompt(self, parser: Callable, data: Any = None,
+                      awaitable=False):
+        ctx = self.ctx
         self.awaiting_reply = True
+        prefix = self.bot.command_prefix
 
         def pred(m: Message):
-            return m.author == ctx.message.author and m.channel == ctx.channel
+            # Commands such as `cancel` or `sessions` are not replies
+            return m.author == ctx.message.author and \
+                m.channel == ctx.channel and \
+                not (isinstance(prefix, str) and m.content.startswith(prefix))
 
-        # try:
-        while True:
-            response: Message = await self.bot.wait_for('message',
-                                                        check=pred)
-            reply = response.clean_content
-            try:
-                if awaitable:
-                    data = await parser(reply, data)
+        try:
+            while True:
+                response: Message = await self.bot.wait_for('message',
+                                                            check=pred)
+                reply = response.clean_content
+                try:
+                    if awaitable:
+                        data = await parser(reply, data)
+                    else:
+                        data = parser(reply, data)
+                except InvalidReply as e:
+                    if reply == "cancel":
+                        await ctx.send("Cancelled")
+                        raise PromptCancelled
+                    await ctx.send(str(e))
                 else:
-                    data = parser(reply, data)
-            except InvalidReply as e:
-                if reply == "cancel":
-                    await ctx.send("Cancelled")
-                    self.awaiting_reply = False
-                    raise PromptCancelled
-                await ctx.send(str(e))
-            except Exception:
-                # Parser returned something unexpected, exiting
-                self.awaiting_reply = False
-                raise
-            else:
-                # Parser exited successfully, we're done
-                return data
-        # except Exception:
-        #     await ctx.send(f'```py\n{traceback.format_exc()}\n```')
-        #     traceback.print_exc()
-        #     self.awaiting_reply = False
-
+                    # Parser exited successfully, we're done
+                    break
+        finally:
+            self.awaiting_reply = False
+        await self.save_checkpoint()
         return data
 
+    def _lookup(self, number: int) -> Suggestion:
+        try:
+            return self.by_number[number]
+        except KeyError:
+            raise InvalidReply(f"No suggestion number {number}") from None
+
+    def _collection_of(self, entry: Suggestion
+                       ) -> Optional[List[Suggestion]]:
+        return next((collection for collection in self.categories
+                     if any(item is entry for item in collection)), None)
+
     def _parse_sorting(self, reply: str, _):
-        collections = {
-            "CO": self.officers,
-            "Staff & CO": self.both,
-            "Staff": self.staff,
-            "Unknown": self.unknown,
-        }
-        if reply.lower() == "ok" or reply.lower() == "`ok`":
+        command = reply.strip().strip('`').strip().lower()
+        if command == "ok":
             raise NoChanges
+        if command == "show":
+            raise ShowOrdering
+        if command.startswith("move "):
+            self._parse_moves(command)
+        elif re.fullmatch(r'[\d,\s]+', command):
+            self._parse_number_order(command)
+        else:
+            self._parse_pasted_order(reply)
+
+    def _parse_moves(self, reply: str):
+        """Parse lines such as `move 7 after 3` or `move 2 before 1`"""
+        moves = []
+        for line in re.split(r'[;\n]', reply):
+            if not line.strip():
+                continue
+            match = re.fullmatch(r'\s*move (\d+) (after|before) (\d+)\s*',
+                                 line)
+            if not match:
+                raise InvalidReply(f"Invalid command `{line.strip()}`, use "
+                                   "`move <number> after|before <number>`")
+            entry = self._lookup(int(match.group(1)))
+            anchor = self._lookup(int(match.group(3)))
+            if entry is anchor:
+                raise InvalidReply(f"Can't move {entry.number} relative to "
+                                   "itself")
+            if self._collection_of(anchor) is None:
+                raise InvalidReply(f"Suggestion {anchor.number} has been "
+                                   "removed")
+            moves.append((entry, match.group(2) == "after", anchor))
+        # All numbers are validated before anything is moved
+        for entry, after, anchor in moves:
+            collection = self._collection_of(entry)
+            if collection is not None:
+                collection.remove(entry)
+            # else: the suggestion was left out of a pasted ordering earlier
+            collection = cast(List[Suggestion], self._collection_of(anchor))
+            index = next(index for index, item in enumerate(collection)
+                         if item is anchor)
+            collection.insert(index + 1 if after else index, entry)
+
+    def _parse_number_order(self, reply: str):
+        """Parse a list of numbers in their new order
+
+        The listed suggestions are reordered within their own categories,
+        taking the places of each other. Suggestions that aren't listed keep
+        their places."""
+        numbers = [int(number) for number in re.findall(r'\d+', reply)]
+        if len(set(numbers)) != len(numbers):
+            raise InvalidReply("Duplicate numbers in the list")
+        entries = [self._lookup(number) for number in numbers]
+        for collection in self.categories:
+            listed = [entry for entry in entries
+                      if any(item is entry for item in collection)]
+            slots = [index for index, item in enumerate(collection)
+                     if any(item is entry for entry in listed)]
+            for index, entry in zip(slots, listed):
+                collection[index] = entry
+
+    def _parse_pasted_order(self, reply: str):
+        collections = dict(zip(MeetingNotes.CATEGORY_NAMES, self.categories))
         reply = parse_code_block(reply)
         categories = reply.split('## Suggestions - ')
-        if categories[0]:
+        if categories[0].strip():
             raise InvalidReply("Invalid data at the beginning")
-        categories = categories[1:]
-        for category in categories:
+        new_order: dict[str, list[tuple[Suggestion, str, str]]] = {}
+        seen: set[int] = set()
+        for category in categories[1:]:
             name, *suggestions = list(
                 filter(len, category.strip().split('\n')))
-            collection = collections[name]
+            if name not in collections:
+                raise InvalidReply(f"Unknown category `{name}`")
             tmp = []
             for suggestion in suggestions:
                 match = re.match('### (\\d+)\\. (.+) \\((.+)\\)', suggestion)
-                if match:
-                    number = int(match.group(1))
-                    entry = [x for x in collection if x.number == number][0]
-                    entry.title = match.group(2)
-                    entry.author = match.group(3)
-                    tmp.append(entry)
-                else:
+                if not match:
                     raise InvalidReply("Did not match the format:\n"
                                        f"```\n{suggestion}\n```")
-            collection[:] = tmp
+                number = int(match.group(1))
+                if number in seen:
+                    raise InvalidReply(f"Number {number} listed twice")
+                seen.add(number)
+                tmp.append((self._lookup(number), match.group(2),
+                            match.group(3)))
+            new_order[name] = tmp
+        # The reply is valid, apply it
+        moved = {id(entry) for entries in new_order.values()
+                 for entry, _, _ in entries}
+        for name, collection in collections.items():
+            if name in new_order:
+                collection[:] = [entry for entry, _, _ in new_order[name]]
+            else:
+                # Suggestions moved into one of the pasted categories
+                collection[:] = [entry for entry in collection
+                                 if id(entry) not in moved]
+        for entries in new_order.values():
+            for entry, title, author in entries:
+                # Only touch the suggestions that were actually edited
+                if entry.title != title:
+                    entry.title = title
+                if entry.author != author:
+                    entry.author = author
+
+    async def _categorize_batch(self, unknowns: List[Suggestion]
+                                ) -> List[Suggestion]:
+        """Categorise all unknowns with a single prompt
 
-    def _parse_category(self, reply: str, suggestion: Suggestion):
+        Returns:
+            List[Suggestion]: Suggestions that were flagged for editing or
+                left out of the reply and need to be prompted one by one
+        """
+        lines = [f"{number}. {unknown.author}: {unknown.title}"
+                 f"{self._guess(unknown)}"
+                 for number, unknown in enumerate(unknowns, start=1)]
+        for page in paginate(lines, prefix="```\n", suffix="\n```"):
+            await self.ctx.send(page)
+        await self.ctx.send(f"Reply with `<number><category>` for each item, "
+                            f"e.g. `1c 2s 3b 4e`\n{BATCH_CATEGORY_OPTIONS}")
+        categories, edits = await self._prompt(self._parse_batch_categories,
+                                               len(unknowns))
+        for index, category in categories.items():
+            unknowns[index].category = category
+        # The prompt saved the checkpoint before the reply was applied
+        await self.save_checkpoint()
+        return [unknown for index, unknown in enumerate(unknowns)
+                if index in edits or index not in categories]
+
+    @staticmethod
+    def _parse_batch_categories(reply: str, count: int
+                                ) -> tuple[dict[int, Type], set[int]]:
+        """Parse a bulk categorisation reply such as `1c 2s 3b 4e`
+
+        Nothing is applied unless the whole reply is valid.
+
+        Returns:
+            dict[int, Type]: New category for each zero-based item index
+            set[int]: Indexes of items flagged for editing
+        """
+        categories: dict[int, Type] = {}
+        edits: set[int] = set()
+        for token in reply.lower().replace(',', ' ').split():
+            match = re.fullmatch(r'(\d+)([cbse])', token)
+            if not match:
+                raise InvalidReply(f"Invalid item `{token}`")
+            index = int(match.group(1)) - 1
+            if not 0 <= index < count:
+                raise InvalidReply(f"No item number {index + 1}")
+            category = BATCH_CATEGORIES[match.group(2)]
+            if category is None:
+                edits.add(index)
+            else:
+                categories[index] = category
+        return categories, edits
+
+    @staticmethod
+    def _parse_category(reply: str, suggestion: Suggestion):
         reply = reply.lower()
         if reply in ['1', 'c', 'co']:
             suggestion.category = Type.CO
@@ -481,48 +858,792 @@ class MeetingNotes(Cog):
             raise InvalidReply("Invalid reply.")
         return suggestion
 
-    def _parse_correction(self, reply: str, suggestion: Suggestion):
+    @staticmethod
+    def _parse_correction(reply: str, suggestion: Suggestion):
         if ':' not in reply:
             raise InvalidReply("Invalid reply, missing ':'.")
         author, title = reply.split(':', maxsplit=1)
         suggestion.author = author
         suggestion.title = title
 
-    async def _create_text(self) -> tuple[str, dict]:
-        markdown = io.StringIO()
-        data = {}
-        markdown.write(START)
-        for collection, name in zip(self.categories, self.CATEGORY_NAMES):
-            if collection:
-                data_ = []
-                markdown.write(CATEGORY.format(name))
-                for entry in collection:
-                    markdown.write(TITLE.format(entry.number, entry.title,
-                                            entry.author))
-                    markdown.write(f"- {entry.url}\n")
-                    if entry.steam_url:
-                        markdown.write(f"- {entry.steam_url}\n")
-                    markdown.write(VOTES)
-                    data_.append(entry.dump())
-                data[name] = data_
-        markdown.write(FOOTER)
-        return markdown.getvalue(), data
-
-    async def _save_to_disk(self, markdown: str, data: dict):
-        with open("notes.md", "w") as f:
-            f.write(markdown)
-        with open("notes.json", "w") as f:
-            json.dump(data, f, indent=4)
+    def _month(self) -> str:
+        """Month of the notes
+
+        Taken from the divider the suggestions were collected from, else
+        the month after the latest one in the archive, like the HackMD
+        index. Defaults to the current month. Nothing is fetched, so
+        exports get queued even while a destination is down.
+        """
+        if self.month:
+            return self.month
+        months = self.cog.archive.months()
+        if months:
+            latest = datetime.datetime.strptime(months[-1], "%Y-%m")
+            return (latest + datetime.timedelta(days=31)).strftime("%Y-%m")
+        return datetime.date.today().strftime("%Y-%m")
+
+    async def create_document(self) -> MeetingDocument:
+        return MeetingDocument.from_categories(
+            self.categories, MeetingNotes.CATEGORY_NAMES, self._month(),
+            votes=self.cog.votes(self.suggestions))
+
+
+class MeetingNotes(Cog):
+    CATEGORY_NAMES = ("CO", "Staff & CO", "Staff", "Unknown")
+
+    # Exporter of each destination, imported only when it is enabled
+    DESTINATIONS: dict[str, str] = {
+        "hackmd": "bot.utils.exporters.hackmd.HackMDExporter",
+        "github_gist": "bot.utils.exporters.github.GitHubExporter",
+    }
+
+    # Output formats of the meeting notes, exporters pick one by name
+    RENDERERS: dict[str, Callable[[MeetingDocument], str]] = {
+        "markdown": render_markdown,
+        "json": render_json,
+        "html": render_html,
+    }
+
+    def __init__(self, bot: ZeusBot) -> None:
+        super().__init__(bot)
+        self._classifier: Optional[Classifier] = None
+
+        self.archive = Archive(self.config.archive.path,
+                               self.config.archive.compress)
+        self.index = get_index(self.config.suggestion_index)
+        outbox_config = self.config.outbox
+        self.outbox = Outbox(
+            outbox_config.path,
+            retries=outbox_config.retries,
+            backoff=outbox_config.backoff,
+            max_backoff=outbox_config.max_backoff,
+        )
+        # Exporters for retrying jobs of the outbox, keyed by guild ID
+        self.retry_exporters: dict[Optional[int], dict[str, Exporter]] = {}
+
+        # Suggestion channel of each guild, keyed by guild ID
+        self.channels: dict[int, TextChannel] = {}
+        # Sessions keyed by the guild and channel they were started from
+        self.sessions: dict[tuple[Optional[int], int], MeetingSession] = {}
+        self.checkpoints: str = self.config.checkpoints
+        self.stats = SuggestionStats(self.config.stats)
+        # Drafts of the current month, keyed by guild ID
+        self.drafts: dict[Optional[int], Draft] = {}
+        self._draft_locks: defaultdict[Optional[int], asyncio.Lock] = \
+            defaultdict(asyncio.Lock)
+        self._drafts_checked = datetime.datetime.now(datetime.timezone.utc)
+        self.checks = {
+            'regenerate': self._is_staff,
+            'stats': self._is_staff,
+        }
+        self.retry_exports.start()  # pylint: disable=E1101
+        self.build_drafts.start()  # pylint: disable=E1101
+
+    async def init(self):
+        await super().init()
+        for config in self.guild_configs():
+            channel = await self.bot.fetch_channel(
+                config.channels.suggestions)
+            self.channels[channel.guild.id] = channel
+
+    def build_exporters(self, config: MeetingNotesConfig
+                        ) -> dict[str, Exporter]:
+        exporters = {}
+        for name, path in self.DESTINATIONS.items():
+            exporter_config = getattr(config, name)
+            if exporter_config.enable:
+                handler: typing.Type[Exporter] = import_string(path)
+                exporters[name] = handler(
+                    dataclasses.asdict(exporter_config))
+        return exporters
+
+    def cog_unload(self):
+        self.retry_exports.cancel()  # pylint: disable=E1101
+        self.build_drafts.cancel()  # pylint: disable=E1101
+        self.stats.close()
+        for session in self.sessions.values():
+            if session.task:
+                session.task.cancel()
+            self.bot.loop.create_task(session.close())
+        for exporters in self.retry_exporters.values():
+            for exporter in exporters.values():
+                self.bot.loop.create_task(exporter.close())
+
+    @staticmethod
+    def session_key(ctx: Context) -> tuple[Optional[int], int]:
+        return (ctx.guild.id if ctx.guild else None, ctx.channel.id)
+
+    def checkpoint_path(self, key: tuple[Optional[int], int]) -> str:
+        guild_id, channel_id = key
+        return os.path.join(self.checkpoints, f"{guild_id}-{channel_id}.ckpt")
+
+    def _new_session(self, ctx: Context) -> MeetingSession:
+        key = self.session_key(ctx)
+        session = self.sessions.get(key)
+        if session and session.task:
+            raise ValueError("A session is already running in this channel, "
+                             "answer its prompts or "
+                             f"`{self.bot.command_prefix}cancel` it")
+        if key[0] not in self.channels:
+            raise ValueError("No suggestion channel configured for this "
+                             "guild")
+        return MeetingSession(self, ctx, self.channels[key[0]])
+
+    def _paused_session(self, ctx: Context) -> MeetingSession:
+        session = self.sessions.get(self.session_key(ctx))
+        if session is None:
+            raise ValueError("No session in this channel, run "
+                             f"`{self.bot.command_prefix}create` first")
+        if session.task:
+            raise ValueError("The session of this channel is running")
+        return session
+
+    async def _run_session(self, session: MeetingSession,
+                           coro: typing.Awaitable):
+        """Run a session in the task of the current command
+
+        A finished or cancelled session is removed. A session that stopped
+        on an error or a cancelled prompt stays paused, so it can be
+        resumed or continued with the single step commands.
+        """
+        old = self.sessions.get(session.key)
+        if old is not None and old is not session:
+            await old.close()
+        self.sessions[session.key] = session
+        session.task = asyncio.current_task()
+        try:
+            await coro
+        except asyncio.CancelledError:
+            if not session.cancelled:
+                raise
+            await session.ctx.send("Session cancelled")
+        finally:
+            session.task = None
+            if session.step is None or session.cancelled:
+                if self.sessions.get(session.key) is session:
+                    del self.sessions[session.key]
+                await session.close()
+            if session.cancelled:
+                await asyncio.to_thread(Checkpoint.remove,
+                                        session.checkpoint_path)
+
+    @commands.command(aliases=["mn"])
+    async def meetingnotes(self, ctx: Context):
+        """Find suggestions from the current month and create a meeting notes
+        """
+        session = self._new_session(ctx)
+        await self._run_session(session, session.create_from_divider())
+
+    @commands.command()
+    async def create(self, ctx: Context, start_message: MessageConverter):
+        session = self._new_session(ctx)
+        await self._run_session(
+            session, session.create(cast(Message, start_message)))
+
+    @commands.command()
+    async def resume(self, ctx: Context):
+        """Continue an interrupted meeting notes session from its last
+        checkpoint"""
+        session = self.sessions.get(self.session_key(ctx))
+        if session is None or session.task:
+            session = self._new_session(ctx)
+            checkpoint = await asyncio.to_thread(Checkpoint.load,
+                                                 session.checkpoint_path)
+            if checkpoint is None:
+                await session.close()
+                await ctx.send("No session to resume")
+                return
+            session.restore(checkpoint)
+        else:
+            # Replies go to whoever resumes the paused session
+            session.ctx = ctx
+        await ctx.send(f"Resuming {len(session.suggestions)} suggestions at "
+                       f"step {session.step}")
+        await self._run_session(session, session.run())
+
+    @commands.command()
+    async def sessions(self, ctx: Context):
+        """List the meeting notes sessions of this guild and the checkpoints
+        that can be resumed"""
+        guild_id = ctx.guild.id if ctx.guild else None
+        lines = []
+        for (session_guild_id, channel_id), session in self.sessions.items():
+            if session_guild_id != guild_id:
+                continue
+            lines.append(f"<#{channel_id}>: {session.status}, step "
+                         f"{session.step}, started by "
+                         f"{session.ctx.author.display_name} at "
+                         f"{session.started:%Y-%m-%d %H:%M}")
+        try:
+            names = sorted(os.listdir(self.checkpoints))
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            match = re.fullmatch(f'{guild_id}-(\\d+)\\.ckpt', name)
+            if match and (guild_id, int(match.group(1))) not in self.sessions:
+                lines.append(f"<#{match.group(1)}>: checkpoint, see "
+                             f"`{self.bot.command_prefix}resume`")
+        await ctx.send("\n".join(lines) or "No sessions")
+
+    @commands.command()
+    async def cancel(self, ctx: Context, channel: Optional[TextChannel] = None
+                     ):
+        """Cancel the session of this or the given channel and discard its
+        checkpoint"""
+        key = (ctx.guild.id if ctx.guild else None,
+               (channel or ctx.channel).id)
+        session = self.sessions.get(key)
+        if session is not None and session.task:
+            # The session removes itself and its checkpoint once it stops
+            session.cancelled = True
+            session.task.cancel()
+            return
+        path = self.checkpoint_path(key)
+        if session is None and not os.path.exists(path):
+            await ctx.send("No session to cancel")
+            return
+        if session is not None:
+            del self.sessions[key]
+            await session.close()
+        await asyncio.to_thread(Checkpoint.remove, path)
+        await ctx.send("Session cancelled")
+
+    async def parse_suggestion(self, message: Message, keyword: str,
+                               names: dict[int, str]
+                               ) -> Optional[Suggestion]:
+        """Create a suggestion from a message, None if the message is not a
+        suggestion
+
+        Args:
+            names (dict[int, str]): Display names by user ID, filled in as
+                members are fetched so each author is fetched only once
+        """
+        text: str = message.clean_content
+        if not text.startswith(keyword):
+            return None
+        author = message.author
+        if author.id not in names:
+            guild = message.guild
+            if isinstance(author, User) and guild:
+                try:
+                    author = await guild.fetch_member(author.id)
+                except NotFound:
+                    # User is not a member of the guild anymore, default
+                    # to the discord username instead of custom nickname
+                    pass
+            names[author.id] = author.display_name
+        title = text.split('\n')[0].strip('*')
+        url = message.jump_url
+        steam_url: Optional[str] = None
+        if 'https://steamcommunity.com/' in text:
+            match = re.search(STEAM_URL_PATTERN, text)
+            if match:
+                steam_url = match.group(0)
+            else:
+                self.log.warning("Didn't match steam URL: %s", text)
+        category = Type.CO if steam_url else Type.UNKNOWN
+        return Suggestion(names[author.id], title, url, category, steam_url)
+
+    @commands.command()
+    async def regenerate(self, ctx: Context, force: bool = False):
+        """Archive every month of the suggestion channel's history
+
+        Each span between two divider messages is archived as one month,
+        without prompts or exports. Months that are in the archive already
+        are skipped unless `force` is set. The suggestions also seed the
+        duplicate index and the classifier."""
+        guild_id = ctx.guild.id if ctx.guild else None
+        if guild_id not in self.channels:
+            raise ValueError("No suggestion channel configured for this "
+                             "guild")
+        channel = self.channels[guild_id]
+        await ctx.send(f"Reading the history of {channel.mention}")
+        months = await self._regenerate(self.guild_config(guild_id), channel,
+                                        force)
+        archived = [month for month, _ in months]
+        suggestions = [s for _, month_suggestions in months
+                       for s in month_suggestions]
+        for month, month_suggestions in months:
+            votes = self.votes(month_suggestions)
+            for suggestion in month_suggestions:
+                self.index.add(suggestion, month, votes.get(suggestion.url))
+        await asyncio.to_thread(self.index.save)
+        if self.config.classifier.enable:
+            await self.train_classifier(suggestions)
+        await ctx.send(f"Archived {len(suggestions)} suggestions from "
+                       f"{len(archived)} months: "
+                       f"{', '.join(archived) or 'none'}")
+
+    async def _regenerate(self, config: MeetingNotesConfig,
+                          channel: TextChannel, force: bool
+                          ) -> list[tuple[str, list[Suggestion]]]:
+        """Walk the channel once, oldest first, and archive each month
+
+        Dividers can only be found by reading the history, so the channel
+        is read in a single pass. Each month is parsed and archived in its
+        own task as soon as its closing divider has been read, with at most
+        `regenerate_concurrency` months in progress.
+
+        Returns:
+            list[tuple[str, list[Suggestion]]]: Suggestions of each archived
+                month
+        """
+        semaphore = asyncio.Semaphore(config.regenerate_concurrency)
+        names: dict[int, str] = {}
+        tasks = []
+        start: Optional[tuple[Message, str]] = None
+        messages: list[Message] = []
+        async for message in channel.history(limit=None, oldest_first=True):
+            match = re.fullmatch(config.divider_regex, message.clean_content)
+            if match:
+                if start:
+                    tasks.append(asyncio.ensure_future(self._regenerate_month(
+                        config, semaphore, names, start, message, messages,
+                        force)))
+                start, messages = (message, match.group(1)), []
+            elif start and message.clean_content.startswith(config.keyword):
+                messages.append(message)
+        # Suggestions after the last divider belong to the ongoing month
+        months = await asyncio.gather(*tasks)
+        return [month for month in months if month]
+
+    async def _regenerate_month(self, config: MeetingNotesConfig,
+                                semaphore: asyncio.Semaphore,
+                                names: dict[int, str],
+                                start: tuple[Message, str], end: Message,
+                                messages: list[Message], force: bool
+                                ) -> Optional[tuple[str, list[Suggestion]]]:
+        divider, month_name = start
+        month = divider_month(divider, month_name, config.date_locale)
+        if self.archive.has_data(month) and not force:
+            return None
+        async with semaphore:
+            suggestions = []
+            for message in messages:
+                suggestion = await self.parse_suggestion(
+                    message, config.keyword, names)
+                if suggestion:
+                    suggestions.append(suggestion)
+            categories = [[s for s in suggestions if s.category == category]
+                          for category in Type]
+            document = MeetingDocument.from_categories(
+                categories, self.CATEGORY_NAMES, month,
+                end.created_at.date())
+            renders = self.render(document, {"markdown", "json"})
+            await self.archive.save(month, (await renders["markdown"]).text,
+                                    (await renders["json"]).text)
+        self.log.info("Archived %d suggestions of %s", len(suggestions),
+                      month)
+        return month, suggestions
+
+    async def get_classifier(self) -> Classifier:
+        """Load the classifier on first use
+
+        The model is cached on disk. Without a cached model, a new one is
+        trained from the archived notes and the legacy `notes.json`."""
+        if self._classifier is None:
+            path = self.config.classifier.path
+            classifier = await asyncio.to_thread(Classifier.from_file, path)
+            if classifier is None:
+                classifier = Classifier()
+                for month in self.archive.months():
+                    data = await self.archive.load(month)
+                    for suggestion in suggestions_from_notes(data or {}):
+                        classifier.learn(suggestion)
+                for suggestion in suggestions_from_notes(
+                        await asyncio.to_thread(_load_legacy_notes)):
+                    classifier.learn(suggestion)
+                await asyncio.to_thread(classifier.save, path)
+            self._classifier = classifier
+        return self._classifier
+
+    async def auto_categorize(self, suggestions: List[Suggestion],
+                              predictions: dict[str, tuple[Type, float]]
+                              ) -> int:
+        """Assign a category to the unknown suggestions the classifier is
+        confident about
+
+        Args:
+            predictions (dict[str, tuple[Type, float]]): Filled in with the
+                low-confidence guesses, keyed by URL
+
+        Returns:
+            int: Number of suggestions categorised
+        """
+        classifier = await self.get_classifier()
+        threshold = self.config.classifier.threshold
+        assigned = 0
+        for suggestion in suggestions:
+            if suggestion.category != Type.UNKNOWN:
+                continue
+            prediction = classifier.predict(suggestion)
+            if prediction is None:
+                break
+            category, confidence = prediction
+            if confidence >= threshold:
+                suggestion.category = category
+                suggestion.guessed = True
+                assigned += 1
+            else:
+                predictions[suggestion.url] = prediction
+        return assigned
+
+    async def train_classifier(self, suggestions: List[Suggestion]):
+        classifier = await self.get_classifier()
+        learned = [classifier.learn(s) for s in suggestions]
+        if any(learned):
+            await asyncio.to_thread(classifier.save,
+                                    self.config.classifier.path)
+
+    def votes(self, suggestions: List[Suggestion]) -> dict[str, Votes]:
+        """Community votes of the suggestions as tallied by the Suggestions
+        cog, keyed by suggestion URL"""
+        cog = self.bot.get_cog("Suggestions")
+        tally = getattr(cog, "votes", None)
+        if tally is None:
+            return {}
+        votes = {}
+        for suggestion in suggestions:
+            message_id = message_id_from_url(suggestion.url)
+            counts = tally.get(message_id) if message_id else None
+            if counts:
+                votes[suggestion.url] = counts
+        return votes
+
+    async def index_suggestions(self, document: MeetingDocument):
+        """Remember this month's suggestions for duplicate detection"""
+        for section in document.sections:
+            for suggestion in section.suggestions:
+                self.index.add(suggestion, document.month,
+                               document.votes.get(suggestion.url))
+        await asyncio.to_thread(self.index.save)
+
+    def render(self, document: MeetingDocument, formats: set[str]
+               ) -> dict[str, "asyncio.Task[RenderedNote]"]:
+        """Start rendering the document into all requested formats
+        concurrently
+
+        Returns:
+            dict[str, asyncio.Task[RenderedNote]]: Rendering task per format
+        """
+        async def render(name: str) -> RenderedNote:
+            text = await asyncio.to_thread(self.RENDERERS[name], document)
+            return RenderedNote(document.title, document.month, name, text)
+
+        return {name: asyncio.ensure_future(render(name))
+                for name in formats}
+
+    async def _retry_export(self, job: ExportJob) -> Optional[str]:
+        """Resume an export from the outbox and report the result to the
+        channel the export was started from"""
+        if job.guild_id not in self.retry_exporters:
+            self.retry_exporters[job.guild_id] = self.build_exporters(
+                self.guild_config(job.guild_id))
+        exporter = self.retry_exporters[job.guild_id].get(job.destination)
+        if not exporter:
+            # Destination has been disabled since, keep the job for later
+            return None
+        channel = self.bot.get_channel(job.channel_id) \
+            if job.channel_id else None
+        try:
+            output = await self.outbox.run(job, exporter)
+        except Exception:
+            self.log.exception("Retrying export job %s failed", job.id)
+            if job.attempts >= self.outbox.retries and channel:
+                await channel.send(f"Export job `{job.id}` to "
+                                   f"{job.destination} failed {job.attempts} "
+                                   f"times: {job.error}")
+            return None
+        if output:
+            await self.archive.set_link(job.note.month, job.destination,
+                                        output)
+        if channel:
+            await channel.send(f"Export job `{job.id}` to {job.destination} "
+                               f"done: {output or 'no output'}")
+        return output
+
+    def _session_jobs(self) -> set[str]:
+        """Jobs left to the running sessions that queued them"""
+        return {job_id for session in self.sessions.values() if session.task
+                for job_id in session.jobs}
+
+    @tasks.loop(seconds=30.0)
+    async def retry_exports(self):
+        for job in self.outbox.due():
+            if job.id not in self._session_jobs():
+                await self._retry_export(job)
+
+    @retry_exports.before_loop
+    async def _before_retry_exports(self):
+        await self.bot.wait_until_ready()
+
+    async def refresh_draft(self, guild_id: Optional[int]
+                            ) -> tuple[Draft, int]:
+        """Build the draft of a guild's current month, or add the
+        suggestions posted since the draft was last refreshed
+
+        Returns:
+            Draft: The refreshed draft
+            int: Number of suggestions added
+        """
+        if guild_id not in self.channels:
+            raise ValueError("No suggestion channel configured for this "
+                             "guild")
+        async with self._draft_locks[guild_id]:
+            config = self.guild_config(guild_id)
+            channel = self.channels[guild_id]
+            divider, month_name = await find_divider(channel,
+                                                     config.divider_regex)
+            draft = self.drafts.get(guild_id)
+            if draft is None or draft.divider_id != divider.id:
+                # First draft or a new month has started
+                draft = Draft(
+                    divider,
+                    divider_month(divider, month_name, config.date_locale),
+                    next_month_name(month_name, config.date_locale))
+            added = []
+            last_message_id = draft.last_message_id
+            async for message in channel.history(
+                    limit=None, after=Object(id=last_message_id),
+                    oldest_first=True):
+                last_message_id = message.id
+                suggestion = await self.parse_suggestion(
+                    message, config.keyword, draft.names)
+                if suggestion:
+                    added.append(suggestion)
+            if added and self.config.classifier.enable:
+                await self.auto_categorize(added, draft.predictions)
+            draft.suggestions.extend(added)
+            draft.last_message_id = last_message_id
+            document = MeetingDocument.from_categories(
+                [[s for s in draft.suggestions if s.category == category]
+                 for category in Type],
+                self.CATEGORY_NAMES, draft.month,
+                votes=self.votes(draft.suggestions))
+            markdown = await self.render(document, {"markdown"})["markdown"]
+            draft.markdown = markdown.text
+            draft.updated = datetime.datetime.now()
+            self.drafts[guild_id] = draft
+            return draft, len(added)
+
+    @tasks.loop(minutes=1.0)
+    async def build_drafts(self):
+        """Refresh the drafts of the guilds whose draft times have passed
+        since the previous check"""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        last, self._drafts_checked = self._drafts_checked, now
+        for guild_id in list(self.channels):
+            config = self.guild_config(guild_id).drafts
+            if not config.enable or not time_passed(config.times, last, now):
+                continue
+            try:
+                draft, added = await self.refresh_draft(guild_id)
+            except Exception:
+                self.log.exception("Building the draft of guild %s failed",
+                                   guild_id)
+                continue
+            self.log.info("Draft of %s for guild %s has %d suggestions, %d "
+                          "new", draft.month, guild_id,
+                          len(draft.suggestions), added)
+
+    @build_drafts.before_loop
+    async def _before_build_drafts(self):
+        await self.bot.wait_until_ready()
+
+    @commands.command()
+    async def draft(self, ctx: Context):
+        """Refresh the draft of the current month and show its notes"""
+        draft, added = await self.refresh_draft(
+            ctx.guild.id if ctx.guild else None)
+        unknown = sum(1 for s in draft.suggestions
+                      if s.category == Type.UNKNOWN)
+        file = File(io.BytesIO(draft.markdown.encode()),
+                    filename=f"draft-{draft.month}.md")
+        await ctx.send(f"Draft of {draft.month}: {len(draft.suggestions)} "
+                       f"suggestions, {added} new, {unknown} without a "
+                       "category", file=file)
+
+    @commands.group(name="outbox", invoke_without_command=True)
+    async def outbox_show(self, ctx: Context):
+        """Show exports that haven't completed yet"""
+        jobs = self.outbox.pending()
+        if not jobs:
+            await ctx.send("Outbox is empty")
+            return
+        lines = []
+        for job in jobs:
+            steps = ", ".join(job.steps) or "none"
+            lines.append(f"`{job.id}` {job.destination}: "
+                         f"{job.attempts} attempts, steps done: {steps}, "
+                         f"last error: {job.error}")
+        await ctx.send("\n".join(lines))
+
+    @outbox_show.command(name="flush")
+    async def outbox_flush(self, ctx: Context):
+        """Retry all pending exports immediately"""
+        jobs = [job for job in self.outbox.idle()
+                if job.id not in self._session_jobs()]
+        for job in jobs:
+            await self._retry_export(job)
+        await ctx.send(f"Flushed {len(jobs)} jobs, "
+                       f"{len(self.outbox.jobs)} still pending")
+
+    @outbox_show.command(name="drop")
+    async def outbox_drop(self, ctx: Context, job_id: str):
+        """Remove a pending export without running it"""
+        if job_id in self.outbox.running:
+            await ctx.send(f"Job `{job_id}` is being exported right now")
+        elif self.outbox.remove(job_id) is None:
+            await ctx.send(f"No job `{job_id}` in the outbox")
+        else:
+            await ctx.send(f"Dropped job `{job_id}`")
+
+    @commands.command(aliases=['c'])
+    async def categorize(self, ctx: Context):
+        session = self._paused_session(ctx)
+        session.ctx = ctx
+        await self._run_session(session, session.categorize())
+        await ctx.send("Categories done")
+
+    @commands.command()
+    async def sort(self, ctx: Context):
+        session = self._paused_session(ctx)
+        session.ctx = ctx
+        await self._run_session(session, session.sort())
+        await ctx.send("Sort done")
+
+    @commands.command(aliases=['s'])
+    async def save(self, ctx: Context):
+        """Save the notes of the paused session to the archive"""
+        session = self._paused_session(ctx)
+        session.ctx = ctx
+        document = await session.create_document()
+        await session._save_to_disk(self.render(document,
+                                                {"markdown", "json"}))
+        await ctx.send("Save done")
+
+    @commands.command(name="archive")
+    async def archive_list(self, ctx: Context):
+        """List archived meeting notes"""
+        months = self.archive.months()
+        if not months:
+            await ctx.send("Archive is empty")
+            return
+        lines = []
+        for month in months:
+            links = " ".join(f"[{name}] <{link}>" for name, link
+                             in self.archive.links(month).items())
+            lines.append(f"{month} {links}".rstrip())
+        await ctx.send("\n".join(lines))
+
+    @commands.group(name="stats", invoke_without_command=True)
+    async def stats_show(self, ctx: Context, first: Optional[str] = None,
+                         last: Optional[str] = None):
+        """Statistics of the archived suggestions
+
+        Covers all archived months, or the months from `first` to `last`
+        given as YYYY-MM."""
+        summary = await self._stats(first, last)
+        await ctx.send(embed=self._stats_embed(summary))
+
+    @stats_show.command(name="csv")
+    async def stats_csv(self, ctx: Context, first: Optional[str] = None,
+                        last: Optional[str] = None):
+        """Statistics with the numbers of each month as a CSV file"""
+        summary = await self._stats(first, last)
+        file = File(io.BytesIO(summary.csv().encode()),
+                    filename="suggestion-stats.csv")
+        await ctx.send(embed=self._stats_embed(summary), file=file)
+
+    async def _stats(self, first: Optional[str], last: Optional[str]
+                     ) -> Summary:
+        for month in (first, last):
+            if month and not re.fullmatch(r"\d{4}-\d{2}", month):
+                raise ValueError(f"Invalid month {month}, use YYYY-MM")
+        # Import the months archived or regenerated since the last time
+        imported = await asyncio.to_thread(self.stats.months)
+        for month in self.archive.months():
+            saved = self.archive.index[month].get("saved", 0.0)
+            if imported.get(month) == saved:
+                continue
+            data = await self.archive.load(month)
+            if data:
+                await asyncio.to_thread(self.stats.import_month, month,
+                                        saved, data)
+        summary = await asyncio.to_thread(self.stats.summary,
+                                          first or "0000-00",
+                                          last or "9999-99")
+        if not summary.months:
+            raise ValueError("No archived suggestions in these months")
+        return summary
+
+    def _stats_embed(self, summary: Summary, months: int = 12) -> Embed:
+        first, last = summary.months[0].month, summary.months[-1].month
+        embed = Embed(title="Suggestion statistics",
+                      description=f"{first} to {last}")
+        embed.add_field(
+            name="Suggestions",
+            value=f"{summary.total} total\n"
+                  f"{summary.steam} with a Steam link\n"
+                  f"{summary.total - summary.steam} other")
+        embed.add_field(
+            name="Categories",
+            value="\n".join(f"{self.CATEGORY_NAMES[category - 1]}: {count}"
+                            for category, count
+                            in summary.categories.items()))
+        embed.add_field(
+            name="Top authors", inline=False,
+            value="\n".join(f"{rank}. {author}: {count}" for rank,
+                            (author, count) in enumerate(summary.authors, 1)))
+        lines = []
+        for month in summary.months[-months:]:
+            line = f"{month.month}: {month.total} suggestions"
+            if month.acceptance is not None:
+                line += (f", {month.accepted}/{month.voted} voted up "
+                         f"({month.acceptance:.0%})")
+            lines.append(line)
+        name = "Months" if len(summary.months) <= months \
+            else f"Last {months} months"
+        embed.add_field(name=name, value="\n".join(lines), inline=False)
+        return embed
+
+    def _is_staff(self, ctx: Context):
+        if not self.bot.is_staff(ctx.author):
+            raise CheckFailure("Not staff")
+        return True
+
+    @commands.Cog.listener()
+    async def on_suggestion_edit(self, message: Message):
+        """Refresh the suggestion in the sessions and the draft that have
+        loaded it"""
+        sessions = [session for session in self.sessions.values()
+                    if session.channel.id == message.channel.id]
+        names: dict[int, str] = {}
+        for session in sessions:
+            edited = await self.parse_suggestion(message, session.keyword,
+                                                 names)
+            if edited and await session.update_suggestion(edited):
+                self.log.debug("Updated %s in session %s", edited,
+                               session.key)
+        guild_id = message.guild.id if message.guild else None
+        draft = self.drafts.get(guild_id)
+        if draft and draft.channel_id == message.channel.id:
+            edited = await self.parse_suggestion(
+                message, self.guild_config(guild_id).keyword, draft.names)
+            if edited and draft.update_suggestion(edited):
+                self.log.debug("Updated %s in the draft", edited)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent):
+        draft = self.drafts.get(payload.guild_id)
+        if draft and draft.channel_id == payload.channel_id:
+            draft.remove_message(payload.message_id)
 
     @commands.Cog.listener()
     async def on_command_error(self, ctx: Context, error: CommandInvokeError):
         await ctx.send(f"An error occured: {error}")
-        # print(''.join(traceback.format_exception(type(error),
-        #       error, error.__traceback__)))
-        try:
-            traceback.print_exception(error.original)
-        except Exception:
-            raise error.original
+        self.log.error("Error in command %s", ctx.command,
+                       exc_info=getattr(error, "original", error))
 
 
 def setup(bot: ZeusBot):
@@ -0,0 +1,159 @@
+import os
+from typing import Optional
+
+from discord.errors import HTTPException
+
+from bot import ZeusBot
+from bot.cog import Cog
+from bot.utils.metrics import REGISTRY, MetricsServer, Registry
+
+try:
+    _PAGE_SIZE: Optional[int] = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def _resident_memory() -> Optional[float]:
+    """Resident memory of the process in bytes, Linux only"""
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return None
+
+
+class Metrics(Cog):
+    """Serve Prometheus metrics of the bot on a local HTTP endpoint
+
+    Most values are read from the bot and the other cogs when the endpoint
+    is scraped, so nothing is computed between scrapes. REST calls are
+    counted by wrapping the HTTP client of the bot.
+    """
+    def __init__(self, bot: ZeusBot) -> None:
+        super().__init__(bot)
+        self.registry = Registry()
+        self.rest_requests = self.registry.counter(
+            "zeusbot_rest_requests_total",
+            "Discord REST API requests by route and status",
+            ["method", "route", "status"])
+        self.registry.callback(
+            "zeusbot_gateway_latency_seconds",
+            "Heartbeat latency of each shard", self._latencies, ["shard"])
+        self.registry.callback(
+            "zeusbot_gateway_events_total",
+            "Gateway events received by each shard",
+            self._gateway_events, ["shard", "event"], type="counter")
+        self.registry.callback(
+            "zeusbot_cog_events_total",
+            "Events dispatched to the listeners of each cog",
+            self._cog_events, ["cog", "event"], type="counter")
+        self.registry.callback(
+            "zeusbot_log_entries", "Cached audit log entries",
+            lambda: self._size("Log", "log_entries"))
+        self.registry.callback(
+            "zeusbot_log_deleted", "Deleted messages waiting for the audit "
+            "log", lambda: self._size("Log", "deleted"))
+        self.registry.callback(
+            "zeusbot_log_digest", "Deletions waiting to be posted to the "
+            "delete log", lambda: self._size("Log", "digest"))
+        self.registry.callback(
+            "zeusbot_message_buffer_bytes",
+            "Memory used by the message buffer of each watched channel",
+            self._buffer_bytes, ["channel"])
+        self.registry.callback(
+            "zeusbot_meeting_suggestions",
+            "Suggestions in each meeting notes session",
+            self._suggestions, ["guild", "channel"])
+        self.registry.callback(
+            "zeusbot_outbox_jobs", "Exports waiting in the outbox",
+            lambda: self._size("MeetingNotes", "outbox", "jobs"))
+        self.registry.callback(
+            "process_resident_memory_bytes", "Resident memory size in bytes",
+            _resident_memory)
+
+        self.server = MetricsServer([REGISTRY, self.registry],
+                                    self.config.host, self.config.port)
+        self._original_request = self.bot.http.request
+        self.bot.http.request = self._request  # type: ignore
+
+    async def init(self):
+        await super().init()
+        if self.server.runner is not None:
+            # Already serving, init is called again after a reload
+            return
+        try:
+            await self.server.start()
+        except OSError:
+            self.log.exception("Can't serve metrics on %s:%s",
+                               self.config.host, self.config.port)
+        else:
+            self.log.info("Serving metrics on http://%s:%s/metrics",
+                          self.config.host, self.config.port)
+
+    def cog_unload(self):
+        if self.bot.http.request == self._request:
+            del self.bot.http.request
+        # The next instance waits for this before serving on the same port
+        self.server.close()
+
+    async def _request(self, route, **kwargs):
+        try:
+            result = await self._original_request(route, **kwargs)
+        except HTTPException as e:
+            self.rest_requests.inc(method=route.method, route=route.path,
+                                   status=e.status)
+            raise
+        except Exception:
+            self.rest_requests.inc(method=route.method, route=route.path,
+                                   status="error")
+            raise
+        self.rest_requests.inc(method=route.method, route=route.path,
+                               status="ok")
+        return result
+
+    def _size(self, cog_name: str, *attributes: str) -> Optional[float]:
+        """Length of an attribute of a cog, None if the cog isn't loaded"""
+        value = self.bot.get_cog(cog_name)
+        if value is None:
+            return None
+        for attribute in attributes:
+            value = getattr(value, attribute)
+        return len(value)
+
+    def _latencies(self):
+        return {(str(shard),): latency for shard, latency
+                in self.bot.shard_latencies().items()}
+
+    def _gateway_events(self):
+        return {(str(shard), event): count
+                for shard, counts in self.bot.event_counts.items()
+                for event, count in counts.items()}
+
+    def _cog_events(self):
+        counts = self.bot.dispatch_counts
+        values = {}
+        for cog in self.bot.cogs.values():
+            for name, _ in cog.get_listeners():
+                event = name[3:] if name.startswith("on_") else name
+                values[(cog.qualified_name, event)] = counts[event]
+        return values
+
+    def _buffer_bytes(self):
+        cog = self.bot.get_cog("Log")
+        if cog is None:
+            return None
+        return {(str(channel_id),): buffer.used for channel_id, buffer
+                in cog.buffer.channels.items()}
+
+    def _suggestions(self):
+        cog = self.bot.get_cog("MeetingNotes")
+        if cog is None:
+            return None
+        return {(str(guild_id), str(channel_id)): len(session.suggestions)
+                for (guild_id, channel_id), session in cog.sessions.items()}
+
+
+def setup(bot: ZeusBot):
+    bot.add_cog(Metrics(bot))
@@ -1,28 +1,132 @@
-from typing import Optional
+import asyncio
+from collections import defaultdict
 
 from bot import ZeusBot
 from bot.cog import Cog
-from discord import Message
-from discord.channel import TextChannel
-from discord.ext import commands
+from bot.utils.pins import KeywordMatcher, PinQueue, PinStore
+from discord import (HTTPException, Message, NotFound, RawMessageDeleteEvent,
+                     RawMessageUpdateEvent)
+from discord.ext import commands, tasks
+
+# Error code of "Maximum number of pins reached (50)"
+MAX_PINS_REACHED = 30003
 
 
 class Pin(Cog):
     def __init__(self, bot: ZeusBot) -> None:
         super().__init__(bot)
-        self.keyword: str = self.config['keyword']
-        self.channel: Optional[TextChannel] = None
+        # Keywords of each watched channel, keyed by channel ID. Every guild
+        # can configure its own rules. A message is checked only against
+        # the keywords of its channel, all of them in one regex search.
+        keywords: dict[int, set[str]] = defaultdict(set)
+        for config in self.guild_configs():
+            for rule in config.rules:
+                keywords[rule.channel].update(rule.keywords)
+        self.matchers: dict[int, KeywordMatcher] = {
+            channel: KeywordMatcher(channel_keywords)
+            for channel, channel_keywords in keywords.items()
+        }
+        self.queue = PinQueue()
+        self.store = PinStore(self.config.path)
+        self.apply_pins.start()  # pylint: disable=E1101
 
-    async def init(self):
-        self.channel = await self.bot.fetch_channel(self.config['channel'])
+    def cog_unload(self):
+        self.apply_pins.cancel()  # pylint: disable=E1101
 
     @commands.Cog.listener()
     async def on_message(self, message: Message):
-        if message.channel != self.channel:
-            # we only care about messages in the suggestion channel
+        matcher = self.matchers.get(message.channel.id)
+        if matcher is None:
+            # we only care about messages in the suggestion channels
+            return
+        if matcher.search(message.content):
+            self.queue.put(message.channel.id, message.id, True)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: RawMessageUpdateEvent):
+        matcher = self.matchers.get(payload.channel_id)
+        content = payload.data.get('content')
+        if matcher is None or content is None:
+            return
+        pinned = payload.message_id in self.store
+        if matcher.search(content):
+            if not pinned:
+                self.queue.put(payload.channel_id, payload.message_id, True)
+        elif pinned:
+            # Only the bot's own pins are removed, never a user's
+            self.queue.put(payload.channel_id, payload.message_id, False)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent):
+        # Discord removes the pin of a deleted message by itself
+        if self.store.remove(payload.channel_id, payload.message_id):
+            await asyncio.to_thread(self.store.save, self.store.snapshot())
+
+    @tasks.loop(seconds=1.0)
+    async def apply_pins(self):
+        if not self.queue:
+            return
+        while self.queue:
+            channel_id, message_id, pin = self.queue.pop()
+            try:
+                if pin:
+                    await self._pin(channel_id, message_id)
+                else:
+                    await self._unpin(channel_id, message_id)
+            except HTTPException as e:
+                self.log.warning("Couldn't %s message %d in %d: %s",
+                                 "pin" if pin else "unpin", message_id,
+                                 channel_id, e)
+            except Exception:
+                # Keep the loop running for the other messages
+                self.log.exception("Couldn't %s message %d in %d",
+                                   "pin" if pin else "unpin", message_id,
+                                   channel_id)
+        await asyncio.to_thread(self.store.save, self.store.snapshot())
+
+    @apply_pins.before_loop
+    async def _before_apply_pins(self):
+        await self.bot.wait_until_ready()
+
+    async def _pin(self, channel_id: int, message_id: int):
+        """Pin a message, unpinning the bot's oldest pins of the channel
+        while it is full"""
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            self.log.warning("Channel %d not found, not pinning %d",
+                             channel_id, message_id)
             return
-        if self.keyword in message.content:
-            await message.pin(reason="Automatic suggestion pin")
+        message = channel.get_partial_message(message_id)
+        while True:
+            try:
+                await message.pin(reason="Automatic suggestion pin")
+                break
+            except HTTPException as e:
+                if e.code != MAX_PINS_REACHED:
+                    raise
+            oldest = self.store.oldest(channel_id)
+            if oldest is None:
+                self.log.warning("Pin limit reached in %d without pins by "
+                                 "the bot, not pinning %d", channel_id,
+                                 message_id)
+                return
+            self.log.info("Pin limit reached in %d, unpinning %d",
+                          channel_id, oldest)
+            await self._unpin(channel_id, oldest, "Pin limit reached")
+        self.store.add(channel_id, message_id)
+
+    async def _unpin(self, channel_id: int, message_id: int,
+                     reason: str = "Suggestion no longer matches"):
+        channel = self.bot.get_channel(channel_id)
+        try:
+            if channel is not None:
+                await channel.get_partial_message(message_id).unpin(
+                    reason=reason)
+        except NotFound:
+            # Deleted while we weren't watching
+            pass
+        # A channel that is gone took its pins with it
+        self.store.remove(channel_id, message_id)
 
 
 def setup(bot: ZeusBot):
@@ -10,14 +10,14 @@ from discord.ext.commands.errors import CheckFailure, CommandError
 class Reload(Cog):
     def __init__(self, bot: ZeusBot):
         super().__init__(bot)
-        self.extensions = self.bot.config['bot']['extensions']
+        self.extensions = self.bot.config.bot.extensions
         self.checks = {
             'reload': self._is_staff,
         }
 
     @commands.command()
     async def reload(self, ctx: Context):
-        print("Reloading extensions")
+        self.log.info("Reloading extensions")
         self.bot.reload_config()
 
         unloaded = []
@@ -49,7 +49,7 @@ class Reload(Cog):
     async def _unload_extension(self, ctx, extension):
         try:
             self.bot.unload_extension(extension)
-            print("unloaded", extension)
+            self.log.info("Unloaded %s", extension)
         except ExtensionNotLoaded:
             await ctx.send("Skipping unload for not loaded extension {}"
                            .format(extension))
@@ -60,11 +60,11 @@ class Reload(Cog):
     async def _load_extension(self, ctx, extension):
         try:
             self.bot.load_extension(extension)
-            print("loaded", extension)
+            self.log.info("Loaded %s", extension)
         except Exception:
             await ctx.send("An error occured while reloading: ```{}```"
                            .format(traceback.format_exc()))
-            print(traceback.format_exc())
+            self.log.exception("Failed to load %s", extension)
             return False
         else:
             return True
@@ -1,40 +1,207 @@
+import asyncio
 import re
+from collections import OrderedDict
 from typing import Optional
 
-from discord import Embed, Message
+from discord import (Embed, Message, Object, RawMessageDeleteEvent,
+                     RawMessageUpdateEvent, RawReactionActionEvent,
+                     RawReactionClearEmojiEvent, RawReactionClearEvent)
 from discord.channel import TextChannel
-from discord.errors import Forbidden
-from discord.ext import commands
+from discord.errors import Forbidden, HTTPException, NotFound
+from discord.ext import commands, tasks
 
 from bot import ZeusBot
 from bot.cog import Cog
+from bot.config import SuggestionChannels
+from bot.utils.cursors import ChannelCursors
+from bot.utils.debounce import Debouncer
+from bot.utils.suggestion_index import get_index, voted_down
+from bot.utils.votes import VoteTally
+
+# Message IDs remembered to not process a message twice
+SEEN_MESSAGES = 1000
 
 
 class Suggestions(Cog):
     def __init__(self, bot: ZeusBot) -> None:
         super().__init__(bot)
         self.channels: list[dict[str, TextChannel]] = []
-        self.reactions: list[str] = self.config['reactions']
-        self.keyword: str = self.config['keyword']
-        self.image_keyword: str = self.config['image_keyword']
-        self.message: str = self.config['message']
-        self.thread_message: str = self.config['thread_message']
-        self.discussion_channel: bool = self.config['discussion_channel']
-        self.use_threads: bool = self.config['use_threads']
-        self.divider_regex: str = self.config['divider_regex']
+        self.reactions: tuple[str, ...] = self.config.reactions
+        self.keyword: str = self.config.keyword
+        self.image_keyword: str = self.config.image_keyword
+        self.message: str = self.config.message
+        self.thread_message: str = self.config.thread_message
+        self.discussion_channel: bool = self.config.discussion_channel
+        self.use_threads: bool = self.config.use_threads
+        self.divider_regex: str = self.config.divider_regex
+        self.index = get_index(self.config.suggestion_index)
+        self.duplicate_reaction: str = self.config.duplicate_reaction
+        self.duplicate_message: str = self.config.duplicate_message
+        self.downvoted_reaction: Optional[str] = \
+            self.config.downvoted_reaction
+        self.channel_ids = {channels.suggestions
+                            for channels in self.config.channels}
+        # Community votes of the suggestions, read by the meeting notes
+        self.votes: Optional[VoteTally] = None
+        votes = self.config.votes
+        if votes.enable:
+            self.votes = VoteTally(votes.upvote, votes.downvote,
+                                   votes.neutral, votes.path)
+        # Last processed message of each channel, to catch up on messages
+        # sent while the bot was offline or reconnecting
+        self.cursors = ChannelCursors(self.config.cursors)
+        self._catching_up = asyncio.Lock()
+        # Messages whose processing has started. After a resume the gateway
+        # replays messages that the catch up finds in the history too.
+        self.seen: OrderedDict[int, None] = OrderedDict()
+        # Edits of each message, handled once a burst of edits is over
+        self.edits: Debouncer[int, RawMessageUpdateEvent] = Debouncer(
+            self.config.edit_delay, self._handle_edit)
+        self.save_state.start()  # pylint: disable=E1101
+
+    def cog_unload(self):
+        self.save_state.cancel()  # pylint: disable=E1101
+        self.edits.cancel()
+        for state in (self.votes, self.cursors):
+            if state and state.dirty:
+                state.save()
 
     async def init(self):
         await super().init()
+        self.channels = []
         await self._get_channels()
         self._check_channels()
+        if self.votes:
+            await self._reconcile_votes()
+        await self._catch_up()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # The first ready event initialises the cog instead, this is a new
+        # session after the old one couldn't be resumed
+        if self.channels:
+            await self._catch_up()
+
+    @commands.Cog.listener()
+    async def on_resumed(self):
+        await self._catch_up()
+
+    async def _catch_up(self):
+        """Process the messages sent after the last processed message of
+        each channel
+
+        Only the messages after the cursor are fetched, so this costs a
+        request per 100 missed messages however long the channel is."""
+        if self._catching_up.locked():
+            return
+        async with self._catching_up:
+            semaphore = asyncio.Semaphore(self.config.catch_up_concurrency)
+
+            async def process(message: Message):
+                async with semaphore:
+                    await self._process_once(message)
+
+            for channels in self.channels:
+                channel: TextChannel = channels['suggestions']
+                cursor = self.cursors.get(channel.id)
+                if cursor is None:
+                    # Nothing has been processed before, start from here
+                    if channel.last_message_id:
+                        self.cursors.advance(channel.id,
+                                             channel.last_message_id)
+                    continue
+                pending = []
+                async for message in channel.history(
+                        limit=None, after=Object(id=cursor),
+                        oldest_first=True):
+                    cursor = message.id
+                    if any(reaction.me for reaction in message.reactions):
+                        # Processed before the cursor was saved
+                        continue
+                    pending.append(asyncio.ensure_future(process(message)))
+                results = await asyncio.gather(*pending,
+                                               return_exceptions=True)
+                for result in results:
+                    if isinstance(result, Exception):
+                        self.log.error("Processing a missed message failed",
+                                       exc_info=result)
+                self.cursors.advance(channel.id, cursor)
+                if pending:
+                    self.log.info("Caught up on %d messages in %s",
+                                  len(pending), channel)
+
+    async def _reconcile_votes(self):
+        """Recount the votes of this month's suggestions
+
+        Reaction events missed while the bot was offline are caught up on
+        here. Messages from the history come with their reaction counts, so
+        this takes a request per 100 messages instead of one per message
+        and emoji."""
+        # Suggestions whose votes are on the link to their discussion
+        linked = set(self.votes.links.values())
+        for channels in self.channels:
+            channel = channels['suggestions']
+            count = 0
+            async for message in channel.history(limit=None):
+                if re.fullmatch(self.divider_regex, message.clean_content):
+                    # Start of this month's suggestions
+                    break
+                if message.id in linked:
+                    continue
+                if not message.content.startswith(self.keyword) \
+                        and message.id not in self.votes.links:
+                    continue
+                self.votes.set(message.id, {
+                    str(reaction.emoji): reaction.count - int(reaction.me)
+                    for reaction in message.reactions})
+                count += 1
+            self.log.info("Reconciled votes of %d suggestions in %s", count,
+                          channel)
+
+    @tasks.loop(seconds=60.0)
+    async def save_state(self):
+        for state in (self.votes, self.cursors):
+            if state and state.dirty:
+                await asyncio.to_thread(state.save)
+
+    def _is_vote(self, payload: RawReactionActionEvent) -> bool:
+        return (self.votes is not None
+                and payload.channel_id in self.channel_ids
+                and payload.user_id != self.bot.user.id)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: RawReactionActionEvent):
+        if self._is_vote(payload):
+            self.votes.add(payload.message_id, str(payload.emoji))
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: RawReactionActionEvent):
+        if self._is_vote(payload):
+            self.votes.remove(payload.message_id, str(payload.emoji))
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear(self, payload: RawReactionClearEvent):
+        if self.votes and payload.channel_id in self.channel_ids:
+            self.votes.clear(payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear_emoji(self,
+                                          payload: RawReactionClearEmojiEvent):
+        if self.votes and payload.channel_id in self.channel_ids:
+            self.votes.clear(payload.message_id, str(payload.emoji))
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent):
+        if self.votes and payload.channel_id in self.channel_ids:
+            self.votes.clear(payload.message_id)
 
     async def _get_channels(self):
         """Fetch all configured channels"""
-        channels: dict[str, Optional[int]]
-        for channels in self.config['channels']:
+        channels: SuggestionChannels
+        for channels in self.config.channels:
             channel_dict: dict[str, TextChannel] = {}
             for name in ['suggestions', 'discussion']:
-                channel_id = channels.get(name, None)
+                channel_id = getattr(channels, name)
                 if channel_id:
                     try:
                         channel = await self.bot.fetch_channel(channel_id)
@@ -81,6 +248,21 @@ class Suggestions(Cog):
 
     @commands.Cog.listener()
     async def on_message(self, message: Message):
+        if message.channel.id not in self.channel_ids or not self.channels:
+            return
+        await self._process_once(message)
+        self.cursors.advance(message.channel.id, message.id)
+
+    async def _process_once(self, message: Message):
+        """Process a new message unless it has been processed already"""
+        if message.id in self.seen:
+            return
+        self.seen[message.id] = None
+        if len(self.seen) > SEEN_MESSAGES:
+            self.seen.popitem(last=False)
+        await self._process(message)
+
+    async def _process(self, message: Message):
         # We only care about messages that are sent to the suggestion
         # channels, not sent by bots and are not commands
         if message.author.bot:
@@ -142,21 +324,24 @@ class Suggestions(Cog):
             await message.delete()
 
     async def _handle_suggestion(self, message: Message):
+        title = message.content.split('\n')[0].replace('**', '')
         if self.discussion_channel:
             channels = [ch for ch in self.channels
                         if message.channel == ch['suggestions']][0]
 
-            title = message.content.split('\n')[0].replace('**', '')
             embed = Embed(title=title, description="[Link to suggestion]({})"
                                                    .format(message.jump_url))
             embed.set_author(name=message.author.display_name)
-            discussion_message = await channels['discussions'] \
+            discussion_message = await channels['discussion'] \
                 .send(embed=embed)
 
             embed = Embed(description="[Link to discussion]({})"
                                       .format(discussion_message.jump_url))
             suggestion_message = await channels['suggestions'] \
                 .send(embed=embed)
+            if self.votes:
+                # People vote on the link, the votes are the suggestion's
+                self.votes.link(suggestion_message.id, message.id)
 
             reaction_target = suggestion_message
         else:
@@ -165,6 +350,89 @@ class Suggestions(Cog):
         for reaction in self.reactions:
             await reaction_target.add_reaction(reaction)
 
+        await self._check_duplicate(message, title)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: RawMessageUpdateEvent):
+        # Embeds being added to a message arrive as edits without content
+        if payload.channel_id in self.channel_ids \
+                and 'content' in payload.data:
+            self.edits.trigger(payload.message_id, payload)
+
+    async def _handle_edit(self, payload: RawMessageUpdateEvent):
+        """Update what was derived from a suggestion after the last edit of
+        a burst, the message is fetched once for the whole burst"""
+        channel = self.bot.get_channel(payload.channel_id)
+        if channel is None:
+            self.log.warning("Channel of edited message %d not found",
+                             payload.message_id)
+            return
+        try:
+            message = await channel.fetch_message(payload.message_id)
+        except NotFound:
+            # Deleted since
+            return
+        except HTTPException:
+            self.log.exception("Fetching edited message %d failed",
+                               payload.message_id)
+            return
+        if message.author.bot:
+            return
+        if not message.content.startswith(self.keyword):
+            # No longer a suggestion, or never was one, check it like a new
+            # post
+            try:
+                await self._process(message)
+            except Exception:
+                self.log.exception("Handling the edit of %d failed",
+                                   message.id)
+            return
+        title = message.content.split('\n')[0].replace('**', '')
+        try:
+            handled = any(reaction.me for reaction in message.reactions)
+            if not handled and not self.discussion_channel:
+                # E.g. an image caption that was edited into a suggestion
+                await self._handle_suggestion(message)
+            else:
+                await self._update_duplicate(message, title)
+        except Exception:
+            self.log.exception("Handling the edit of %d failed", message.id)
+        # Let other cogs refresh their copies of the suggestion
+        self.bot.dispatch('suggestion_edit', message)
+
+    async def _update_duplicate(self, message: Message, title: str):
+        """Check an edited suggestion for duplicates again"""
+        matches = self.index.find(title, message.content, message.jump_url)
+        marked = any(reaction.me
+                     and str(reaction.emoji) == self.duplicate_reaction
+                     for reaction in message.reactions)
+        if matches and not marked:
+            await self._check_duplicate(message, title)
+        elif marked and not matches:
+            for emoji in (self.duplicate_reaction, self.downvoted_reaction):
+                if emoji:
+                    await message.remove_reaction(emoji, self.bot.user)
+
+    async def _check_duplicate(self, message: Message, title: str):
+        """Point out earlier suggestions of the same mod or with the same
+        title, and whether one was voted down at the latest meeting"""
+        matches = self.index.find(title, message.content, message.jump_url)
+        if not matches:
+            return
+        await message.add_reaction(self.duplicate_reaction)
+        if self.downvoted_reaction and any(
+                entry["month"] == self.index.last_month and voted_down(entry)
+                for entry in matches):
+            await message.add_reaction(self.downvoted_reaction)
+        if self.duplicate_message:
+            earlier = "\n".join(
+                f"- {entry['month']}: {entry['title']} ({entry['author']}) "
+                f"<{entry['url']}>"
+                + (" (voted down)" if voted_down(entry) else "")
+                for entry in matches)
+            await message.reply(self.duplicate_message.format(earlier),
+                                mention_author=False)
+
 
 def setup(bot: ZeusBot):
     bot.add_cog(Suggestions(bot))
@@ -0,0 +1,363 @@
+"""Typed configuration
+
+The merged YAML config is compiled into frozen dataclasses when it is
+loaded. Missing keys, unknown keys and values of the wrong type are
+reported with their full path, e.g. `cogs.meetingnotes.outbox.retries`, so
+a broken config is rejected before the bot connects or before a reload
+replaces the running config. Code reading the config uses plain attribute
+lookups instead of nested dict lookups.
+"""
+import dataclasses
+import datetime
+import typing
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+
+class ConfigError(ValueError):
+    def __init__(self, path: str, message: str):
+        self.path = path
+        super().__init__(f"{path or 'config'}: {message}")
+
+
+def _join(path: str, key: Any) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+
+def _type_name(hint: Any) -> str:
+    return getattr(hint, "__name__", None) or str(hint).replace("typing.", "")
+
+
+def _convert(hint: Any, value: Any, path: str) -> Any:
+    if hint is Any:
+        return value
+    if dataclasses.is_dataclass(hint):
+        return compile_config(hint, value, path)
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+    if origin is Union:
+        if value is None and type(None) in args:
+            return None
+        options = [arg for arg in args if arg is not type(None)]
+        for option in options:
+            try:
+                return _convert(option, value, path)
+            except ConfigError:
+                if len(options) == 1:
+                    raise
+        raise ConfigError(path, f"expected {_type_name(hint)}, got "
+                                f"{type(value).__name__}")
+    if origin in (tuple, frozenset):
+        if not isinstance(value, list):
+            raise ConfigError(path, f"expected a list, got "
+                                    f"{type(value).__name__}")
+        return origin(_convert(args[0], item, f"{path}[{index}]")
+                      for index, item in enumerate(value))
+    if origin is dict or hint is dict:
+        if not isinstance(value, dict):
+            raise ConfigError(path, f"expected a mapping, got "
+                                    f"{type(value).__name__}")
+        if not args:
+            return value
+        return {_convert(args[0], key, _join(path, key)):
+                _convert(args[1], item, _join(path, key))
+                for key, item in value.items()}
+    if hint is float and isinstance(value, int) \
+            and not isinstance(value, bool):
+        return float(value)
+    if hint is int and isinstance(value, bool):
+        # bool is a subclass of int, but `True` is never a valid ID
+        raise ConfigError(path, "expected int, got bool")
+    if not isinstance(value, hint):
+        raise ConfigError(path, f"expected {_type_name(hint)}, got "
+                                f"{type(value).__name__}")
+    return value
+
+
+def compile_config(cls: typing.Type, data: Any, path: str = "") -> Any:
+    """Compile a config section into an instance of a config dataclass
+
+    Args:
+        cls (Type): Dataclass describing the section
+        data (Any): The section as loaded from YAML
+        path (str): Path of the section, used in error messages
+
+    Raises:
+        ConfigError: The section doesn't match the dataclass
+    """
+    if data is None:
+        # A section with only commented out keys
+        data = {}
+    if not isinstance(data, dict):
+        raise ConfigError(path, f"expected a mapping, got "
+                                f"{type(data).__name__}")
+    hints = typing.get_type_hints(cls)
+    fields = {f.name: f for f in dataclasses.fields(cls)}
+    for key in data:
+        if key not in fields:
+            raise ConfigError(_join(path, key), "unknown key")
+    values = {}
+    for name, f in fields.items():
+        if name in data:
+            values[name] = _convert(hints[name], data[name],
+                                    _join(path, name))
+        elif f.default is dataclasses.MISSING \
+                and f.default_factory is dataclasses.MISSING:
+            raise ConfigError(_join(path, name), "missing key")
+    try:
+        return cls(**values)
+    except ValueError as e:
+        # Checks in __post_init__ that involve several keys
+        raise ConfigError(path, str(e)) from e
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    interval: float
+    burst: int
+
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    level: str = "INFO"
+    json: bool = False
+    cogs: dict[str, str] = field(default_factory=dict)
+    rate_limit: Optional[RateLimitConfig] = None
+    debug_sample_rate: float = 1.0
+
+
+@dataclass(frozen=True)
+class ShardsConfig:
+    enable: bool = False
+    count: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class DiagnosticsConfig:
+    # Measure the cold import time of the extensions at startup
+    importtime: bool = False
+    importtime_top: int = 10
+
+
+@dataclass(frozen=True)
+class BotConfig:
+    token: str
+    prefix: str
+    extensions: tuple[str, ...] = ()
+    admins: frozenset[int] = frozenset()
+    shards: ShardsConfig = ShardsConfig()
+    logging: LoggingConfig = LoggingConfig()
+    diagnostics: DiagnosticsConfig = DiagnosticsConfig()
+
+
+@dataclass(frozen=True)
+class RolesConfig:
+    staff: Union[int, str]
+
+
+@dataclass(frozen=True)
+class GuildSection:
+    roles: RolesConfig
+
+
+@dataclass(frozen=True)
+class LogConfig:
+    channels: dict[str, int]
+    # Channels whose messages are kept in a compact buffer
+    watch: tuple[int, ...] = ()
+    buffer_bytes: int = 1 << 20
+    # Deletions are posted to the delete log in batches of up to
+    # `digest_size`, at least every `digest_interval` seconds
+    digest_size: int = 25
+    digest_interval: float = 10.0
+    # Deletions kept while the delete log is rate limited
+    digest_limit: int = 500
+
+
+@dataclass(frozen=True)
+class PinRule:
+    channel: int
+    keywords: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class PinConfig:
+    rules: tuple[PinRule, ...]
+    # Messages pinned by the bot, the oldest is unpinned when a channel
+    # reaches the pin limit
+    path: str = "data/pins.json"
+
+
+@dataclass(frozen=True)
+class SuggestionChannels:
+    suggestions: int
+    discussion: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class VotesConfig:
+    enable: bool = True
+    upvote: str = "\u2795"
+    downvote: str = "\u2796"
+    neutral: str = "\u3030"
+    # Keep the tallies on disk in addition to reconciling them at startup
+    path: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SuggestionsConfig:
+    channels: tuple[SuggestionChannels, ...]
+    reactions: tuple[str, ...]
+    keyword: str
+    image_keyword: str
+    message: str
+    thread_message: str
+    discussion_channel: bool
+    use_threads: bool
+    divider_regex: str
+    suggestion_index: str
+    duplicate_reaction: str
+    duplicate_message: Optional[str] = None
+    # Added as well when a match was voted down at the latest meeting
+    downvoted_reaction: Optional[str] = None
+    votes: VotesConfig = VotesConfig()
+    # Last processed message of each channel
+    cursors: str = "data/suggestion_cursors.json"
+    # Missed messages processed at the same time after a reconnect
+    catch_up_concurrency: int = 4
+    # Seconds without further edits before an edited suggestion is checked
+    # again
+    edit_delay: float = 5.0
+
+
+@dataclass(frozen=True)
+class ClassifierConfig:
+    enable: bool
+    path: str
+    threshold: float
+
+
+@dataclass(frozen=True)
+class MeetingChannels:
+    suggestions: int
+
+
+@dataclass(frozen=True)
+class ArchiveConfig:
+    path: str
+    compress: bool = False
+
+
+@dataclass(frozen=True)
+class OutboxConfig:
+    path: str
+    retries: int = 5
+    backoff: float = 30.0
+    max_backoff: float = 3600.0
+
+
+@dataclass(frozen=True)
+class HackMDConfig:
+    enable: bool
+    team_name: str
+    index_id: str
+    index_line: str
+    index_line_regex: str
+    token: str = ""
+    read_perm: str = "guest"
+    write_perm: str = "signed_in"
+    format: Optional[str] = None
+    api_url: str = "https://api.hackmd.io/v1"
+
+    def __post_init__(self):
+        if self.enable and not self.token:
+            raise ValueError("token is required when enabled")
+
+
+@dataclass(frozen=True)
+class GistConfig:
+    enable: bool
+    token: str = ""
+    gist_id: Optional[str] = None
+    filename: str = "notes.md"
+    description: str = ""
+    public: bool = False
+    api_url: str = "https://api.github.com"
+    format: Optional[str] = None
+
+    def __post_init__(self):
+        if self.enable and not self.token:
+            raise ValueError("token is required when enabled")
+
+
+@dataclass(frozen=True)
+class DraftsConfig:
+    enable: bool = False
+    # Times of day in UTC at which the drafts are built, as HH:MM. The
+    # meeting time isn't known to the bot, so a build shortly before the
+    # meeting is a fixed time too, e.g. an hour before its usual start.
+    times: tuple[str, ...] = ("03:00",)
+
+    def __post_init__(self):
+        for time in self.times:
+            try:
+                datetime.time.fromisoformat(time)
+            except ValueError:
+                raise ValueError(f"invalid time {time!r}, expected HH:MM"
+                                 ) from None
+
+
+@dataclass(frozen=True)
+class MeetingNotesConfig:
+    keyword: str
+    divider_regex: str
+    divider: str
+    date_locale: str
+    classifier: ClassifierConfig
+    channels: MeetingChannels
+    suggestion_index: str
+    checkpoints: str
+    archive: ArchiveConfig
+    outbox: OutboxConfig
+    hackmd: HackMDConfig
+    github_gist: GistConfig
+    batch_categorize: bool = True
+    save_to_disk: bool = False
+    # Months processed at the same time by the regenerate command
+    regenerate_concurrency: int = 4
+    # SQLite database of the archived suggestions for the stats command
+    stats: str = "data/stats.sqlite3"
+    drafts: DraftsConfig = DraftsConfig()
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    host: str = "127.0.0.1"
+    port: int = 9100
+
+
+@dataclass(frozen=True)
+class CogsConfig:
+    """Config of each cog, None for cogs that aren't configured"""
+    log: Optional[LogConfig] = None
+    pin: Optional[PinConfig] = None
+    suggestions: Optional[SuggestionsConfig] = None
+    meetingnotes: Optional[MeetingNotesConfig] = None
+    metrics: Optional[MetricsConfig] = None
+
+
+@dataclass(frozen=True)
+class GuildConfig:
+    """The `guild` and `cogs` sections as seen by a single guild"""
+    roles: RolesConfig
+    cogs: CogsConfig = CogsConfig()
+
+
+@dataclass(frozen=True)
+class Config:
+    bot: BotConfig
+    guild: GuildSection
+    cogs: CogsConfig = CogsConfig()
+    # Overrides of the `guild` and `cogs` sections keyed by guild ID,
+    # compiled into a GuildConfig per guild
+    guilds: dict[int, dict] = field(default_factory=dict)
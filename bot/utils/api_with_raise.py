@@ -1,18 +1,60 @@
+from typing import Optional
+
 import PyHackMD
+import requests
+
+API_URL = "https://api.hackmd.io/v1"
 
 
 class APIWithRaise(PyHackMD.API):
     """PyHackMD API that raises an exception on failure instead of returning None
+
+    The team note endpoints are implemented here against `api_url`, they
+    are missing from some PyHackMD releases and those that have them always
+    talk to api.hackmd.io.
     """
-    def create_team_note(self, team_path: str, title: str, *args, **kwargs):
-        data = super().create_team_note(team_path, title, *args, **kwargs)
-        if not data:
-            raise ValueError(f"Failed to create note {team_path} / {title}")
-        return data
-
-    def update_team_note(self, team_path: str, note_id: str, *args, **kwargs):
-        data = super().update_team_note(team_path, note_id, *args, **kwargs)
-        if not data:
-            raise ValueError(f"Failed to update note {team_path} / {note_id}")
-        return data
+    def __init__(self, token: str, api_url: str = API_URL,
+                 timeout: float = 30.0):
+        super().__init__(token)
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str,
+                 data: Optional[dict] = None) -> dict:
+        response = requests.request(method, f"{self.api_url}{path}",
+                                    headers=self.headers, json=data,
+                                    timeout=self.timeout)
+        if not response.ok:
+            raise ValueError(f"{method} {path} failed with "
+                             f"{response.status_code}: {response.text[:200]}")
+        return response.json() if response.content else {}
+
+    def get_team_note(self, note_id: str) -> dict:
+        try:
+            return self._request("GET", f"/notes/{note_id}")
+        except (ValueError, requests.RequestException) as e:
+            raise ValueError(f"Failed to get note {note_id}: {e}") from e
+
+    def create_team_note(self, team_path: str, title: str, content: str = "",
+                         read_perm: str = "guest",
+                         write_perm: str = "signed_in") -> dict:
+        try:
+            return self._request("POST", f"/teams/{team_path}/notes", {
+                "title": title,
+                "content": content,
+                "readPermission": read_perm,
+                "writePermission": write_perm,
+            })
+        except (ValueError, requests.RequestException) as e:
+            raise ValueError(
+                f"Failed to create note {team_path} / {title}: {e}") from e
 
+    def update_team_note(self, team_path: str, note_id: str,
+                         content: Optional[str] = None) -> dict:
+        try:
+            return self._request(
+                "PATCH", f"/teams/{team_path}/notes/{note_id}",
+                {"content": content})
+        except (ValueError, requests.RequestException) as e:
+            raise ValueError(
+                f"Failed to update note {team_path} / {note_id}: {e}") from e
@@ -0,0 +1,100 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+from typing import Optional
+
+from bot.utils.files import atomic_write
+
+
+class Archive:
+    """On-disk archive of exported meeting notes, one set of files per month
+
+    `index.json` maps each month to its files and the links of the exported
+    notes. All file access happens in worker threads and every write is
+    atomic, a crash can never leave a half-written file behind.
+    """
+    INDEX = "index.json"
+
+    def __init__(self, path: str, compress: bool = False):
+        self.path = path
+        self.compress = compress
+        self.index: dict[str, dict] = {}
+        self._lock = asyncio.Lock()
+        try:
+            with open(os.path.join(self.path, self.INDEX), "r") as f:
+                self.index = json.load(f)
+        except FileNotFoundError:
+            pass
+
+    def months(self) -> list[str]:
+        return sorted(self.index)
+
+    def _filename(self, month: str, extension: str) -> str:
+        suffix = ".gz" if self.compress else ""
+        return f"{month}.{extension}{suffix}"
+
+    def _write(self, filename: str, text: str):
+        data = text.encode()
+        if filename.endswith(".gz"):
+            data = gzip.compress(data)
+        atomic_write(os.path.join(self.path, filename), data)
+
+    def _read(self, filename: str) -> str:
+        with open(os.path.join(self.path, filename), "rb") as f:
+            data = f.read()
+        if filename.endswith(".gz"):
+            data = gzip.decompress(data)
+        return data.decode()
+
+    async def _save_index(self):
+        await asyncio.to_thread(self._write, self.INDEX,
+                                json.dumps(self.index, indent=4))
+
+    async def save(self, month: str, markdown: str, data: str):
+        """Store the notes of a month, replacing any earlier version
+
+        Args:
+            month (str): Month of the notes, `YYYY-MM`
+            markdown (str): Notes rendered as markdown
+            data (str): Notes rendered as JSON
+        """
+        files = {"markdown": self._filename(month, "md"),
+                 "data": self._filename(month, "json")}
+        await asyncio.gather(
+            asyncio.to_thread(self._write, files["markdown"], markdown),
+            asyncio.to_thread(self._write, files["data"], data),
+        )
+        async with self._lock:
+            entry = self.index.setdefault(month, {"links": {}})
+            entry.update(files, saved=time.time())
+            await self._save_index()
+
+    async def set_link(self, month: str, destination: str, link: str):
+        """Record where the notes of a month were exported to"""
+        async with self._lock:
+            entry = self.index.setdefault(month, {"links": {}})
+            entry["links"][destination] = link
+            await self._save_index()
+
+    def has_data(self, month: str) -> bool:
+        """Whether the notes of a month are on disk, a month can also have
+        just the links of exports that weren't saved"""
+        return "data" in self.index.get(month, {})
+
+    def links(self, month: str) -> dict[str, str]:
+        return self.index.get(month, {}).get("links", {})
+
+    async def load(self, month: str) -> Optional[dict]:
+        """Load the JSON data of a month, or None if it isn't archived"""
+        filename = self.index.get(month, {}).get("data")
+        if not filename:
+            return None
+        return json.loads(await asyncio.to_thread(self._read, filename))
+
+    async def load_markdown(self, month: str) -> Optional[str]:
+        filename = self.index.get(month, {}).get("markdown")
+        if not filename:
+            return None
+        return await asyncio.to_thread(self._read, filename)
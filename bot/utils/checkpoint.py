@@ -0,0 +1,148 @@
+import os
+import struct
+from typing import Optional
+
+from bot.utils.files import atomic_write
+from bot.utils.suggestion import Suggestion, Type
+
+MAGIC = b"ZMN"
+VERSION = 3
+
+# magic, version, number of suggestions, number of categories
+_HEADER = struct.Struct("<3sBHB")
+# category, number (0 for none), flags
+_SUGGESTION = struct.Struct("<BHB")
+_HAS_STEAM_URL = 1
+_GUESSED = 2
+_LENGTH = struct.Struct("<I")
+_INDEX = struct.Struct("<H")
+
+
+class CheckpointError(Exception):
+    pass
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        try:
+            values = fmt.unpack_from(self.data, self.offset)
+        except struct.error as e:
+            raise CheckpointError("Truncated checkpoint") from e
+        self.offset += fmt.size
+        return values
+
+    def string(self) -> str:
+        length, = self.unpack(_LENGTH)
+        end = self.offset + length
+        if end > len(self.data):
+            raise CheckpointError("Truncated checkpoint")
+        value = self.data[self.offset:end].decode()
+        self.offset = end
+        return value
+
+
+def _string(value: str) -> bytes:
+    data = value.encode()
+    return _LENGTH.pack(len(data)) + data
+
+
+class Checkpoint:
+    """Snapshot of an interactive meeting notes session
+
+    Stores the suggestions with their categories and numbers, the order
+    of the category lists, the step the session is at, the month of the
+    notes and the outbox jobs of its exports, in a compact binary format.
+    """
+    __slots__ = ("step", "next_month", "suggestions", "categories", "jobs",
+                 "month")
+
+    def __init__(self, step: str, suggestions: list[Suggestion],
+                 categories: list[list[Suggestion]],
+                 next_month: Optional[str] = None,
+                 jobs: Optional[list[str]] = None,
+                 month: Optional[str] = None):
+        self.step = step
+        self.next_month = next_month
+        self.suggestions = suggestions
+        self.categories = categories
+        # IDs of the outbox jobs queued by the export step
+        self.jobs = jobs or []
+        # Month of the notes, YYYY-MM
+        self.month = month
+
+    def encode(self) -> bytes:
+        positions = {id(s): index for index, s in enumerate(self.suggestions)}
+        parts = [
+            _HEADER.pack(MAGIC, VERSION, len(self.suggestions),
+                         len(self.categories)),
+            _string(self.step),
+            _string(self.next_month or ""),
+        ]
+        for s in self.suggestions:
+            flags = (_HAS_STEAM_URL if s.steam_url is not None else 0) | \
+                (_GUESSED if s.guessed else 0)
+            parts.append(_SUGGESTION.pack(int(s.category), s.number or 0,
+                                          flags))
+            parts.extend(_string(value) for value in (s.author, s.title,
+                                                      s.url))
+            if s.steam_url is not None:
+                parts.append(_string(s.steam_url))
+        for collection in self.categories:
+            parts.append(_INDEX.pack(len(collection)))
+            parts.extend(_INDEX.pack(positions[id(s)]) for s in collection)
+        parts.append(_INDEX.pack(len(self.jobs)))
+        parts.extend(_string(job) for job in self.jobs)
+        parts.append(_string(self.month or ""))
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "Checkpoint":
+        reader = _Reader(data)
+        magic, version, count, category_count = reader.unpack(_HEADER)
+        if magic != MAGIC or not 1 <= version <= VERSION:
+            raise CheckpointError("Not a meeting notes checkpoint")
+        step = reader.string()
+        next_month = reader.string() or None
+        suggestions = []
+        for _ in range(count):
+            category, number, flags = reader.unpack(_SUGGESTION)
+            author, title, url = (reader.string() for _ in range(3))
+            steam_url = reader.string() if flags & _HAS_STEAM_URL else None
+            suggestion = Suggestion(author, title, url, Type(category),
+                                    steam_url)
+            suggestion.number = number or None
+            suggestion.guessed = bool(flags & _GUESSED)
+            suggestions.append(suggestion)
+        categories = []
+        for _ in range(category_count):
+            length, = reader.unpack(_INDEX)
+            categories.append([suggestions[reader.unpack(_INDEX)[0]]
+                               for _ in range(length)])
+        jobs = []
+        if version >= 2:
+            count, = reader.unpack(_INDEX)
+            jobs = [reader.string() for _ in range(count)]
+        month = (reader.string() or None) if version >= 3 else None
+        return cls(step, suggestions, categories, next_month, jobs, month)
+
+    def save(self, path: str):
+        atomic_write(path, self.encode())
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Checkpoint"]:
+        try:
+            with open(path, "rb") as f:
+                return cls.decode(f.read())
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
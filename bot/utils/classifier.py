@@ -0,0 +1,124 @@
+import json
+import math
+import re
+from collections import Counter
+from typing import Iterable, Optional
+
+from bot.utils.files import atomic_write
+from bot.utils.suggestion import Suggestion, Type
+
+
+def tokens(suggestion: Suggestion) -> list[str]:
+    words = re.findall(r"\w+", suggestion.title.lower())
+    # The author is a strong signal on its own, keep it as a single token
+    return words + [f"author:{suggestion.author.lower()}"]
+
+
+def suggestions_from_notes(data: dict) -> Iterable[Suggestion]:
+    """Read the suggestions of an archived document or a legacy notes.json
+
+    Legacy files map category names directly to lists of suggestions,
+    archived documents keep the same mapping under `categories`.
+    """
+    categories = data.get("categories", data)
+    for entries in categories.values():
+        if not isinstance(entries, list):
+            continue
+        for entry in entries:
+            yield Suggestion.load(entry)
+
+
+class Classifier:
+    """Multinomial naive Bayes classifier for suggestion categories
+
+    Learns from the title and author of suggestions whose category has
+    been decided, but not from its own unconfirmed guesses. Training is
+    incremental and each suggestion is only learned once, so the same notes
+    can be fed to it again safely.
+    """
+    CATEGORIES = (Type.CO, Type.BOTH, Type.STAFF)
+
+    def __init__(self):
+        self.documents: Counter = Counter()
+        self.words: dict[int, Counter] = {int(category): Counter()
+                                          for category in self.CATEGORIES}
+        self.vocabulary: set[str] = set()
+        self.seen: set[str] = set()
+
+    def learn(self, suggestion: Suggestion) -> bool:
+        """Learn the category of a suggestion
+
+        Returns:
+            bool: False if the suggestion was not learned, either because it
+                has been learned earlier, it has no category or the category
+                was guessed by the classifier
+        """
+        if suggestion.category not in self.CATEGORIES or \
+                suggestion.guessed or suggestion.url in self.seen:
+            return False
+        category = int(suggestion.category)
+        words = tokens(suggestion)
+        self.documents[category] += 1
+        self.words[category].update(words)
+        self.vocabulary.update(words)
+        self.seen.add(suggestion.url)
+        return True
+
+    def predict(self, suggestion: Suggestion) -> Optional[tuple[Type, float]]:
+        """Predict the category of a suggestion
+
+        Returns:
+            Optional[tuple[Type, float]]: The most likely category and its
+                probability, or None if nothing has been learned yet
+        """
+        total = sum(self.documents.values())
+        if not total:
+            return None
+        words = tokens(suggestion)
+        vocabulary = len(self.vocabulary) + 1
+        scores = {}
+        for category, counts in self.words.items():
+            documents = self.documents[category]
+            if not documents:
+                continue
+            length = sum(counts.values())
+            score = math.log(documents / total)
+            for word in words:
+                # Laplace smoothing for words not seen in this category
+                score += math.log((counts[word] + 1) / (length + vocabulary))
+            scores[category] = score
+        best = max(scores, key=lambda category: scores[category])
+        normaliser = sum(math.exp(score - scores[best])
+                         for score in scores.values())
+        return Type(best), 1 / normaliser
+
+    def dump(self) -> dict:
+        return {
+            "documents": dict(self.documents),
+            "words": {category: dict(counts)
+                      for category, counts in self.words.items()},
+            "seen": sorted(self.seen),
+        }
+
+    @classmethod
+    def load(cls, data: dict) -> "Classifier":
+        classifier = cls()
+        classifier.documents = Counter(
+            {int(category): count
+             for category, count in data["documents"].items()})
+        for category, counts in data["words"].items():
+            classifier.words[int(category)] = Counter(counts)
+            classifier.vocabulary.update(counts)
+        classifier.seen = set(data["seen"])
+        return classifier
+
+    @classmethod
+    def from_file(cls, path: str) -> Optional["Classifier"]:
+        try:
+            with open(path, "r") as f:
+                return cls.load(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str):
+        atomic_write(path, json.dumps(self.dump()))
@@ -0,0 +1,39 @@
+import json
+import threading
+from typing import Optional
+
+from bot.utils.files import atomic_write
+
+
+class ChannelCursors:
+    """ID of the last processed message of each channel
+
+    Message IDs grow with time, so everything after the cursor is what was
+    missed while the bot was offline.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.cursors: dict[int, int] = {}
+        try:
+            with open(path, "r") as f:
+                self.cursors = {int(channel): message
+                                for channel, message in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+
+    def get(self, channel_id: int) -> Optional[int]:
+        return self.cursors.get(channel_id)
+
+    def advance(self, channel_id: int, message_id: int):
+        if message_id > self.cursors.get(channel_id, 0):
+            self.cursors[channel_id] = message_id
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            cursors = list(self.cursors.items())
+            self.dirty = False
+            atomic_write(self.path, json.dumps(
+                {str(channel): message for channel, message in cursors}))
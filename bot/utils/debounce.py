@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+log = logging.getLogger(__name__)
+
+
+class Debouncer(Generic[K, V]):
+    """Run a callback once per burst of events with the same key
+
+    Every event restarts the key's timer, the callback runs with the latest
+    value after no event has arrived for `delay` seconds. Nobody awaits the
+    runs, so exceptions of the callback are logged here.
+    """
+    def __init__(self, delay: float,
+                 callback: Callable[[V], Awaitable[None]]):
+        self.delay = delay
+        self.callback = callback
+        self.pending: dict[K, asyncio.Task] = {}
+
+    def trigger(self, key: K, value: V):
+        task = self.pending.pop(key, None)
+        if task:
+            task.cancel()
+        self.pending[key] = asyncio.ensure_future(self._run(key, value))
+
+    async def _run(self, key: K, value: V):
+        await asyncio.sleep(self.delay)
+        # Past this point a new event starts another run instead of
+        # cancelling this one
+        del self.pending[key]
+        try:
+            await self.callback(value)
+        except Exception:
+            log.exception("Debounced callback for %r failed", key)
+
+    def cancel(self):
+        for task in self.pending.values():
+            task.cancel()
+        self.pending.clear()
+
+    def __len__(self):
+        return len(self.pending)
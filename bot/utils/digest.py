@@ -0,0 +1,61 @@
+import time
+from collections import deque
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Digest(Generic[T]):
+    """Buffer of log entries that are posted in batches
+
+    A batch is due when `size` entries are waiting or the oldest entry has
+    waited for `interval` seconds. While the destination is rate limited,
+    entries keep accumulating up to `limit`, after which the oldest ones
+    are dropped and counted.
+    """
+    def __init__(self, size: int = 25, interval: float = 10.0,
+                 limit: int = 500,
+                 clock: Callable[[], float] = time.monotonic):
+        self.size = size
+        self.interval = interval
+        self.limit = limit
+        self.clock = clock
+        self.entries: deque[tuple[float, T]] = deque()
+        self.dropped = 0
+        self.paused_until = 0.0
+
+    def add(self, entry: T):
+        self.entries.append((self.clock(), entry))
+        while len(self.entries) > self.limit:
+            self.entries.popleft()
+            self.dropped += 1
+
+    def due(self) -> bool:
+        if not self.entries or self.clock() < self.paused_until:
+            return False
+        return len(self.entries) >= self.size or \
+            self.clock() - self.entries[0][0] >= self.interval
+
+    def take(self) -> tuple[list[T], int]:
+        """Oldest batch of entries and the number of entries dropped
+        before them"""
+        batch = [self.entries.popleft()
+                 for _ in range(min(self.size, len(self.entries)))]
+        dropped, self.dropped = self.dropped, 0
+        return [entry for _, entry in batch], dropped
+
+    def retry(self, delay: float, batch: Optional[list[T]] = None,
+              dropped: int = 0):
+        """Put a batch that couldn't be posted back in front and hold off
+        for `delay` seconds"""
+        now = self.clock()
+        for entry in reversed(batch or []):
+            self.entries.appendleft((now - self.interval, entry))
+        self.dropped += dropped
+        while len(self.entries) > self.limit:
+            self.entries.popleft()
+            self.dropped += 1
+        self.paused_until = now + delay
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,49 @@
+"""Destinations of the meeting notes
+
+Each exporter lives in its own submodule, which is only imported when the
+exporter is enabled, so that disabled exporters don't pull in their client
+libraries.
+"""
+from typing import Callable, Optional
+
+from bot.utils.notes import RenderedNote
+
+
+class Steps(dict):
+    """Results of the completed steps of an export
+
+    Exporters record the result of every step that has side effects, so
+    that a retried export continues after the last completed step instead
+    of repeating it. `on_change` is called after each completed step to
+    persist the progress.
+    """
+    def __init__(self, *args,
+                 on_change: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_change = on_change
+
+    def complete(self, name: str, result=True):
+        self[name] = result
+        if self.on_change:
+            self.on_change()
+        return result
+
+
+class Exporter:
+    # Name of the renderer whose output this exporter consumes
+    format = "markdown"
+
+    def __init__(self, config: dict):
+        self.format = config.get("format") or self.format
+
+    async def next_month(self) -> Optional[str]:
+        """Month of the notes to be exported, if the destination keeps track
+        of it"""
+        return None
+
+    async def export(self, note: RenderedNote,
+                     steps: Optional[Steps] = None) -> str:
+        raise NotImplementedError
+
+    async def close(self):
+        """Release any resources held by the exporter"""
@@ -0,0 +1,42 @@
+import logging
+from typing import Optional
+
+from bot.utils.exporters import Exporter, Steps
+from bot.utils.gist import GistClient
+from bot.utils.notes import RenderedNote
+
+log = logging.getLogger(__name__)
+
+
+class GitHubExporter(Exporter):
+    def __init__(self, config: dict):
+        super().__init__(config)
+        self.client = GistClient(
+            config["token"],
+            api_url=config.get("api_url", "https://api.github.com"),
+        )
+        # When set, the same gist is updated on every export instead of
+        # creating a new one
+        self.gist_id: Optional[str] = config.get("gist_id")
+        self.filename: str = config.get("filename", "notes.md")
+        self.description: str = config.get("description", "")
+        self.public: bool = config.get("public", False)
+
+    async def export(self, note: RenderedNote,
+                     steps: Optional[Steps] = None) -> str:
+        if steps is None:
+            steps = Steps()
+        if "gist" not in steps:
+            files = {self.filename: note.text}
+            if self.gist_id:
+                data = await self.client.update(self.gist_id, files)
+            else:
+                data = await self.client.create(files, self.description,
+                                                self.public)
+            steps.complete("gist", data["html_url"])
+            log.info("Exported gist %s in %.2f s", data["html_url"],
+                     self.client.latency or 0)
+        return steps["gist"]
+
+    async def close(self):
+        await self.client.close()
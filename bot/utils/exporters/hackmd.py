@@ -1,25 +1,25 @@
+import asyncio
 import datetime
-import os
 import re
-import subprocess
-import tempfile
+import threading
+from collections import defaultdict
+from typing import Optional
 
-from bot.utils.api_with_raise import APIWithRaise
+from bot.utils.api_with_raise import API_URL, APIWithRaise
+from bot.utils.exporters import Exporter, Steps
+from bot.utils.notes import RenderedNote
 
-
-class Exporter:
-    def __init__(self, config: dict):
-        pass
-
-    def export(self, text: str) -> str:
-        raise NotImplementedError
+# Updating the index is a read-modify-write of the whole note, concurrent
+# exports to the same index take turns so that no link gets lost
+_INDEX_LOCKS: dict[str, threading.Lock] = defaultdict(threading.Lock)
 
 
 class HackMDExporter(Exporter):
     def __init__(self, config: dict):
         super().__init__(config)
 
-        self.api = APIWithRaise(config["token"])
+        self.api = APIWithRaise(config["token"],
+                                config.get("api_url") or API_URL)
         self.index_id: str = config["index_id"]
         self.team_name: str = config["team_name"]
         self.index_line: str = config["index_line"]
@@ -33,36 +33,54 @@ class HackMDExporter(Exporter):
         # the content
         self.remove_title_after_export = False
 
-    def export(self, text: str) -> str:
-        data = self.api.get_team_note(self.index_id)
-        old_content = data["content"]
-
-        next_month = self._get_next_month(old_content)
-        self.text = text.format(month=next_month, date=datetime.datetime.now().date())
-        title = self._get_title(self.text)
-
-        # The `title` parameter is ignored by the API, title is taken from the
-        # h1 of the content. Tags are are taken from the `###### tags:` line in
-        # the content.
-        data = self.api.create_team_note(
-            team_path=self.team_name,
-            title=title,
-            content=self.text,
-            read_perm=self.read_perm,
-            write_perm=self.write_perm,
-        )
-        link = data["publishLink"]
-        self.created_note_id = data["id"]
-        if self.remove_title_after_export:
-            self.remove_title_and_tags()
+    async def next_month(self) -> Optional[str]:
+        data = await asyncio.to_thread(self.api.get_team_note, self.index_id)
+        return self._get_next_month(data["content"])
+
+    async def export(self, note: RenderedNote,
+                     steps: Optional[Steps] = None) -> str:
+        # PyHackMD is a blocking client, keep it off the event loop
+        return await asyncio.to_thread(self._export, note,
+                                       Steps() if steps is None else steps)
+
+    def _export(self, note: RenderedNote, steps: Steps) -> str:
+        self.text = note.text
+        if "note" not in steps:
+            # The `title` parameter is ignored by the API, title is taken
+            # from the h1 of the content. Tags are are taken from the
+            # `###### tags:` line in the content.
+            data = self.api.create_team_note(
+                team_path=self.team_name,
+                title=note.title,
+                content=self.text,
+                read_perm=self.read_perm,
+                write_perm=self.write_perm,
+            )
+            steps.complete("note", {"id": data["id"],
+                                    "link": data["publishLink"]})
+        link = steps["note"]["link"]
+        self.created_note_id = steps["note"]["id"]
 
-        new_index = self._get_new_index(old_content, next_month, link)
-        # Add link to the new note to the index
-        self.api.update_team_note(
-            self.team_name,
-            self.index_id,
-            content=new_index,
-        )
+        if self.remove_title_after_export and "remove_title" not in steps:
+            self.remove_title_and_tags()
+            steps.complete("remove_title")
+
+        if "index" not in steps:
+            with _INDEX_LOCKS[self.index_id]:
+                # Fetch the index again, it might have changed if this is a
+                # retried export
+                old_content = self.api.get_team_note(self.index_id)["content"]
+                # A retry after a lost response finds the link there already
+                if link not in old_content:
+                    new_index = self._get_new_index(old_content, note.month,
+                                                    link)
+                    # Add link to the new note to the index
+                    self.api.update_team_note(
+                        self.team_name,
+                        self.index_id,
+                        content=new_index,
+                    )
+            steps.complete("index")
         return link
 
     def _get_new_index(self, old_index, next_month, link):
@@ -149,19 +167,3 @@ class HackMDExporter(Exporter):
                 return re.sub(pattern, "", text)
         first_lines = "\n".join(text.split("\n")[:4])
         raise ValueError(f"No title and tags found in text:\n{first_lines}")
-
-
-class GitHubExporter(Exporter):
-    def __init__(self, config: dict):
-        super().__init__(config)
-        self.token: str = config["token"]
-
-    def export(self, text: str) -> str:
-        env = os.environ.copy()
-        env["GH_TOKEN"] = self.token
-        with tempfile.NamedTemporaryFile() as fp:
-            fp.write(text.encode())
-            output = subprocess.check_output(
-                ["gh", "gist", "create", fp.name], env=env
-            ).decode()
-        return output
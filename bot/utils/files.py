@@ -0,0 +1,30 @@
+import os
+import tempfile
+from typing import Union
+
+
+def atomic_write(path: str, data: Union[str, bytes]):
+    """Write data to a file so that readers never see a partial file
+
+    The data is written to a temporary file in the same directory, which is
+    then renamed over the target path.
+
+    Args:
+        path (str): Path of the file to write
+        data (Union[str, bytes]): Content of the file
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode()
+    fd, tmp_path = tempfile.mkstemp(dir=directory,
+                                    prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,104 @@
+import json
+import time
+from typing import Optional
+
+import aiohttp
+
+API_URL = "https://api.github.com"
+
+
+class GistError(Exception):
+    pass
+
+
+class GistClient:
+    """Minimal async client for the GitHub Gist API
+
+    A single `aiohttp.ClientSession` is created lazily and reused for all
+    requests, so consecutive exports share pooled connections.
+    """
+    def __init__(self, token: str, api_url: str = API_URL,
+                 timeout: float = 30.0):
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Duration of the latest request in seconds
+        self.latency: Optional[float] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                headers={
+                    "Authorization": f"token {self.token}",
+                    "Accept": "application/vnd.github+json",
+                },
+                timeout=self.timeout,
+            )
+        return self.session
+
+    async def _request(self, method: str, path: str, payload: dict) -> dict:
+        session = self._get_session()
+        start = time.perf_counter()
+        async with session.request(method, self.api_url + path,
+                                   json=payload) as response:
+            text = await response.text()
+            self.latency = time.perf_counter() - start
+        try:
+            data = json.loads(text)
+        except ValueError:
+            # E.g. the HTML error page of a proxy
+            data = None
+        if response.status >= 400:
+            message = data.get("message") if isinstance(data, dict) \
+                else text[:200]
+            raise GistError(
+                f"{method} {path} failed ({response.status}): {message}")
+        if data is None:
+            raise GistError(f"{method} {path} returned invalid JSON: "
+                            f"{text[:200]}")
+        return data
+
+    async def create(self, files: dict[str, str], description: str = "",
+                     public: bool = False) -> dict:
+        """Create a new gist
+
+        Args:
+            files (dict[str, str]): Mapping of filename to file content
+            description (str): Description of the gist
+            public (bool): Whether the gist should be public
+
+        Returns:
+            dict: The created gist as returned by the API
+        """
+        return await self._request("POST", "/gists", {
+            "description": description,
+            "public": public,
+            "files": {name: {"content": content}
+                      for name, content in files.items()},
+        })
+
+    async def update(self, gist_id: str, files: dict[str, str],
+                     description: Optional[str] = None) -> dict:
+        """Replace the content of files in an existing gist
+
+        Args:
+            gist_id (str): ID of the gist to update
+            files (dict[str, str]): Mapping of filename to file content
+            description (Optional[str]): New description, if any
+
+        Returns:
+            dict: The updated gist as returned by the API
+        """
+        payload: dict = {
+            "files": {name: {"content": content}
+                      for name, content in files.items()},
+        }
+        if description is not None:
+            payload["description"] = description
+        return await self._request("PATCH", f"/gists/{gist_id}", payload)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,68 @@
+import importlib
+import re
+import subprocess
+import sys
+from typing import Any, Iterable, NamedTuple
+
+# `import time:   self [us] | cumulative | imported package`
+_IMPORTTIME_LINE = re.compile(
+    r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def import_string(path: str) -> Any:
+    """Import an object by its dotted path, e.g.
+    `bot.utils.exporters.hackmd.HackMDExporter`"""
+    module_name, _, name = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), name)
+
+
+class ImportTime(NamedTuple):
+    module: str
+    # Microseconds spent importing the module itself
+    self_us: int
+    # Microseconds including the modules imported by it
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """Parse the stderr output of `python -X importtime`"""
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append(ImportTime(match.group(4), int(match.group(1)),
+                                      int(match.group(2)),
+                                      len(match.group(3)) // 2))
+    return entries
+
+
+def measure_imports(modules: Iterable[str]) -> list[ImportTime]:
+    """Import modules in a fresh interpreter with `-X importtime`
+
+    This measures the cold import cost of the modules, unaffected by
+    whatever the running process has imported already.
+    """
+    code = "; ".join(f"import {module}" for module in modules) or "pass"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+
+def importtime_summary(entries: list[ImportTime], modules: Iterable[str],
+                       top: int = 10) -> list[str]:
+    """Summarise the import times of the requested modules and the slowest
+    modules imported by them
+
+    Returns:
+        list[str]: Report lines
+    """
+    cumulative = {entry.module: entry.cumulative_us for entry in entries}
+    lines = [f"{module}: {cumulative.get(module, 0) / 1000:.1f} ms"
+             for module in modules]
+    slowest = sorted(entries, key=lambda entry: entry.self_us,
+                     reverse=True)[:top]
+    lines.extend(f"  {entry.self_us / 1000:.1f} ms self, "
+                 f"{entry.cumulative_us / 1000:.1f} ms total: {entry.module}"
+                 for entry in slowest)
+    return lines
@@ -0,0 +1,123 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Drop repeats of the same message beyond `burst` per `interval` seconds
+
+    Messages are considered the same when they come from the same logger and
+    use the same format string. The number of dropped messages is appended
+    to the first message of the next interval.
+    """
+    def __init__(self, interval: float, burst: int):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        # (logger, format string) -> [start of the window, message count]
+        self.windows: dict[tuple[str, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, str(record.msg))
+        window = self.windows.get(key)
+        if window is None or record.created - window[0] >= self.interval:
+            suppressed = window[1] - self.burst if window else 0
+            self.windows[key] = [record.created, 1]
+            if suppressed > 0:
+                record.msg = f"{record.msg} ({suppressed} similar " \
+                             "messages suppressed)"
+            return True
+        window[1] += 1
+        return window[1] <= self.burst
+
+
+class SamplingFilter(logging.Filter):
+    """Let through only every n-th occurrence of each debug message"""
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self.counts: dict[tuple[str, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        if not self.every:
+            return False
+        key = (record.name, str(record.msg))
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        return count % self.every == 0
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as JSON lines"""
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data)
+
+
+def setup_logging(config: dict):
+    """Route all logging of the bot through a queue
+
+    Log calls only put the record into a queue, the actual I/O happens in a
+    separate listener thread so that a slow log collector can't block the
+    event loop. Calling this again applies a changed configuration.
+
+    Args:
+        config (dict): The `bot.logging` section of the config
+    """
+    global _listener, _handler
+    if _listener:
+        _listener.stop()
+        logging.getLogger().removeHandler(_handler)
+
+    output = logging.StreamHandler(sys.stdout)
+    if config.get("json", False):
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    records: queue.Queue = queue.Queue()
+    _handler = logging.handlers.QueueHandler(records)
+    # Filters run in the calling thread, before the record is queued
+    sample_rate = config.get("debug_sample_rate", 1.0)
+    if sample_rate < 1.0:
+        _handler.addFilter(SamplingFilter(sample_rate))
+    rate_limit = config.get("rate_limit")
+    if rate_limit:
+        _handler.addFilter(RateLimitFilter(rate_limit["interval"],
+                                           rate_limit["burst"]))
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(config.get("level", "INFO"))
+    for name in logging.root.manager.loggerDict:
+        if name.startswith("bot.cogs."):
+            # Reset levels from a previous configuration
+            logging.getLogger(name).setLevel(logging.NOTSET)
+    for name, level in config.get("cogs", {}).items():
+        logging.getLogger(f"bot.cogs.{name}").setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+
+
+@atexit.register
+def _flush():
+    if _listener:
+        _listener.stop()
@@ -0,0 +1,102 @@
+import sys
+from collections import OrderedDict
+from typing import Optional
+
+from discord import Message
+
+
+class MessageRecord:
+    """The parts of a message needed to log its deletion"""
+    __slots__ = ('id', 'channel_id', 'author_id', 'timestamp', 'content')
+
+    def __init__(self, id: int, channel_id: int, author_id: int,
+                 timestamp: float, content: str):
+        self.id = id
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.timestamp = timestamp
+        self.content = content
+
+    @classmethod
+    def from_message(cls, message: Message) -> "MessageRecord":
+        return cls(message.id, message.channel.id, message.author.id,
+                   message.created_at.timestamp(), message.content)
+
+    @property
+    def size(self) -> int:
+        """Approximate memory used by the record and its content in bytes"""
+        return sys.getsizeof(self) + sys.getsizeof(self.content) + \
+            3 * sys.getsizeof(self.id) + sys.getsizeof(self.timestamp)
+
+    def __repr__(self):
+        return (f"<MessageRecord id={self.id} channel_id={self.channel_id} "
+                f"author_id={self.author_id}>")
+
+
+class ChannelBuffer:
+    """Ring buffer of the latest messages of a channel
+
+    The oldest records are evicted when the total size of the records
+    exceeds the byte budget.
+    """
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.used = 0
+        # Messages arrive in order, so the first item is always the oldest
+        self.records: OrderedDict[int, MessageRecord] = OrderedDict()
+
+    def add(self, record: MessageRecord):
+        old = self.records.pop(record.id, None)
+        if old:
+            self.used -= old.size
+        self.records[record.id] = record
+        self.used += record.size
+        self._evict()
+
+    def update(self, message_id: int, content: str) -> bool:
+        """Replace the content of an edited message, keeping its place in
+        the eviction order. False if the message isn't buffered."""
+        record = self.records.get(message_id)
+        if record is None:
+            return False
+        self.used -= record.size
+        record.content = content
+        self.used += record.size
+        self._evict()
+        return True
+
+    def _evict(self):
+        while self.used > self.budget and self.records:
+            _, evicted = self.records.popitem(last=False)
+            self.used -= evicted.size
+
+    def pop(self, message_id: int) -> Optional[MessageRecord]:
+        record = self.records.pop(message_id, None)
+        if record:
+            self.used -= record.size
+        return record
+
+    def __len__(self):
+        return len(self.records)
+
+
+class MessageBuffer:
+    """Compact message history of the watched channels"""
+    def __init__(self, channel_ids: list[int], budget: int):
+        self.channels = {channel_id: ChannelBuffer(budget)
+                         for channel_id in channel_ids}
+
+    def add(self, message: Message):
+        buffer = self.channels.get(message.channel.id)
+        if buffer is not None:
+            buffer.add(MessageRecord.from_message(message))
+
+    def update(self, channel_id: int, message_id: int, content: str):
+        buffer = self.channels.get(channel_id)
+        if buffer is not None:
+            buffer.update(message_id, content)
+
+    def pop(self, channel_id: int, message_id: int
+            ) -> Optional[MessageRecord]:
+        buffer = self.channels.get(channel_id)
+        return buffer.pop(message_id) if buffer is not None else None
@@ -0,0 +1,232 @@
+"""Prometheus metrics
+
+A minimal implementation of the Prometheus text format, so that the bot
+doesn't need the client library. Counters and histograms that are updated
+by the code live in the module level `REGISTRY`. Values that can be read
+from the bot at any time, such as buffer sizes, are gauges with a
+callback that runs when the metrics are scraped.
+"""
+import asyncio
+import bisect
+import math
+from typing import (Callable, Iterable, Optional, TypeVar, Union,
+                    TYPE_CHECKING)
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+LabelValues = tuple[str, ...]
+CallbackValues = Union[float, dict[LabelValues, float]]
+M = TypeVar("M", bound="Metric")
+
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n") \
+        .replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _sample(name: str, labels: dict[str, str], value: float) -> str:
+    if labels:
+        pairs = ",".join(f'{key}="{_escape(str(label))}"'
+                         for key, label in labels.items())
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {_format_value(value)}"
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def _label_values(self, labels: dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, "
+                             f"got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}",
+                 f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._label_values(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self.values.items():
+            yield _sample(self.name, dict(zip(self.labels, key)), value)
+
+
+class CallbackMetric(Metric):
+    """Metric whose value is read from a callback when scraped
+
+    The callback returns a single value, or a value for each combination
+    of label values. Returning None leaves the metric out of the output.
+    Usually a gauge, but counters kept elsewhere are exposed the same way.
+    """
+    def __init__(self, name: str, documentation: str,
+                 callback: Callable[[], Optional[CallbackValues]],
+                 labels: Iterable[str] = (), type: str = "gauge"):
+        super().__init__(name, documentation, labels)
+        self.callback = callback
+        self.type = type
+
+    def samples(self) -> Iterable[str]:
+        values = self.callback()
+        if values is None:
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in values.items():
+            yield _sample(self.name, dict(zip(self.labels, key)), value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: count of each bucket, sum and count
+        self.values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._label_values(labels)
+        if key not in self.values:
+            self.values[key] = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+        counts, totals = self.values[key]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, (total, count)) in self.values.items():
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket
+                yield _sample(f"{self.name}_bucket",
+                              dict(labels, le=_format_value(bound)),
+                              cumulative)
+            yield _sample(f"{self.name}_sum", labels, total)
+            yield _sample(f"{self.name}_count", labels, count)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str,
+                labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str,
+                  labels: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def callback(self, name: str, documentation: str,
+                 callback: Callable[[], Optional[CallbackValues]],
+                 labels: Iterable[str] = (),
+                 type: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, callback,
+                                            labels, type))
+
+    def render(self) -> str:
+        return "".join(metric.render() + "\n"
+                       for metric in self.metrics.values())
+
+
+REGISTRY = Registry()
+
+
+class MetricsServer:
+    """HTTP server that serves the metrics of the registries on /metrics
+
+    aiohttp.web is only imported when a server is started, modules that
+    just update metrics don't pay for it.
+    """
+    # Servers that are being closed by address, a new server on the same
+    # address waits for them before binding, e.g. when the cog is reloaded
+    _closing: dict[tuple[str, int], asyncio.Task] = {}
+
+    def __init__(self, registries: Iterable[Registry],
+                 host: str = "127.0.0.1", port: int = 9100):
+        self.registries = list(registries)
+        self.host = host
+        self.port = port
+        self.runner: Optional['web.AppRunner'] = None
+
+    async def _handle(self, request: 'web.Request') -> 'web.Response':
+        from aiohttp import web
+
+        body = "".join(registry.render() for registry in self.registries)
+        return web.Response(body=body.encode(),
+                            headers={"Content-Type": CONTENT_TYPE})
+
+    async def start(self):
+        from aiohttp import web
+
+        closing = self._closing.pop((self.host, self.port), None)
+        if closing is not None:
+            await closing
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+
+    @property
+    def addresses(self) -> list:
+        return self.runner.addresses if self.runner else []
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def close(self) -> asyncio.Task:
+        """Stop the server from synchronous code, such as cog_unload"""
+        task = asyncio.get_event_loop().create_task(self.stop())
+        self._closing[(self.host, self.port)] = task
+        return task
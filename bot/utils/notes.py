@@ -0,0 +1,244 @@
+import datetime
+import html
+import io
+import json
+from typing import Optional
+
+from bot.utils.suggestion import Suggestion
+from bot.utils.votes import Votes
+
+TITLE_FORMAT = "CO & Staff meeting {month}"
+
+START = """{title}
+===
+
+###### tags: `zeusops` `meeting`
+
+###### date : {date}
+
+[Previous notes](https://www.zeusops.com/meetings)
+
+## Present
+### COs
+-
+### Staff
+- Capry
+- Gehock
+- Matt
+- Miller
+
+## Preface
+
+### Notes
+
+### TODO
+
+- Assignee
+    - [ ] Todo item 1
+
+"""
+
+CATEGORY = "## Suggestions - {}\n\n"
+TITLE = '### {}. {} ({})\n'
+COMMUNITY_VOTES = "- Community votes: {}\n"
+RANKING = "## Community ranking\n\n"
+RANK = "{}. {}. {} ({}): {:+d} ({})\n"
+VOTES = """
+#### Neutral
+- name
+#### Yes
+- name
+#### No
+- name
+
+#### Notes
+- A note
+
+---
+
+"""
+
+_ATTACHMENTS = "https://cdn.discordapp.com/attachments/582590015054544896"
+
+FOOTER = """## Community votes
+
+### Votes
+
+![CO]({attachments}/620340512905363466/a.png)
+![Mod votes]({attachments}/620340540604547092/a.png)
+
+### Mods
+
+**Terrains** in the default collection:
+```diff
++ added
+kept
+- removed
+```
+
+Mod changes to the **default collection**:
+```diff
++ added
+kept
+- removed
+```
+
+Mod changes to the **optional collection**:
+```diff
++ added
+kept
+- removed
+```
+
+### COs
+
+**COs** this month:
+```
+MAJ{spc}
+CPT{spc}
+CPT{spc}
+1LT{spc}
+1LT{spc}
+```
+""".format(spc=" ", attachments=_ATTACHMENTS)
+
+
+class Section:
+    def __init__(self, name: str, suggestions: list[Suggestion]):
+        self.name = name
+        self.suggestions = suggestions
+
+
+class MeetingDocument:
+    """Meeting notes built once from the categorised and sorted suggestions
+
+    Every output format is rendered from this model, exporters never need to
+    parse the rendered text again.
+    """
+    def __init__(self, sections: list[Section], month: str,
+                 date: Optional[datetime.date] = None,
+                 votes: Optional[dict[str, Votes]] = None):
+        self.sections = sections
+        self.month = month
+        self.date = date or datetime.date.today()
+        # Community votes keyed by suggestion URL
+        self.votes: dict[str, Votes] = votes or {}
+
+    @property
+    def title(self) -> str:
+        return TITLE_FORMAT.format(month=self.month)
+
+    def ranking(self) -> list[tuple[Suggestion, Votes]]:
+        """Suggestions with votes, the highest score first"""
+        voted = [(suggestion, self.votes[suggestion.url])
+                 for section in self.sections
+                 for suggestion in section.suggestions
+                 if suggestion.url in self.votes]
+        return sorted(voted, key=lambda item: (-item[1].score, -item[1].up))
+
+    @classmethod
+    def from_categories(cls, categories: list[list[Suggestion]],
+                        names: tuple[str, ...], month: str,
+                        date: Optional[datetime.date] = None,
+                        votes: Optional[dict[str, Votes]] = None
+                        ) -> "MeetingDocument":
+        sections = [Section(name, list(collection))
+                    for collection, name in zip(categories, names)
+                    if collection]
+        return cls(sections, month, date, votes)
+
+    def dump(self) -> dict:
+        return {
+            "title": self.title,
+            "month": self.month,
+            "date": self.date.isoformat(),
+            "categories": {section.name: [s.dump()
+                                          for s in section.suggestions]
+                           for section in self.sections},
+            "votes": {url: votes._asdict()
+                      for url, votes in self.votes.items()},
+        }
+
+    @classmethod
+    def load(cls, data: dict) -> "MeetingDocument":
+        sections = [Section(name, [Suggestion.load(s) for s in suggestions])
+                    for name, suggestions in data["categories"].items()]
+        votes = {url: Votes(**counts)
+                 for url, counts in data.get("votes", {}).items()}
+        return cls(sections, data["month"],
+                   datetime.date.fromisoformat(data["date"]), votes)
+
+
+class RenderedNote:
+    """A meeting document rendered into a single output format"""
+    def __init__(self, title: str, month: str, format: str, text: str):
+        self.title = title
+        self.month = month
+        self.format = format
+        self.text = text
+
+    def dump(self) -> dict:
+        return vars(self).copy()
+
+    @classmethod
+    def load(cls, data: dict) -> "RenderedNote":
+        return cls(**data)
+
+
+def render_markdown(document: MeetingDocument) -> str:
+    markdown = io.StringIO()
+    markdown.write(START.format(title=document.title, date=document.date))
+    for section in document.sections:
+        markdown.write(CATEGORY.format(section.name))
+        for entry in section.suggestions:
+            markdown.write(TITLE.format(entry.number, entry.title,
+                                        entry.author))
+            markdown.write(f"- {entry.url}\n")
+            if entry.steam_url:
+                markdown.write(f"- {entry.steam_url}\n")
+            if entry.url in document.votes:
+                markdown.write(COMMUNITY_VOTES.format(
+                    document.votes[entry.url]))
+            markdown.write(VOTES)
+    ranking = document.ranking()
+    if ranking:
+        markdown.write(RANKING)
+        for rank, (entry, votes) in enumerate(ranking, 1):
+            markdown.write(RANK.format(rank, entry.number, entry.title,
+                                       entry.author, votes.score, votes))
+        markdown.write("\n")
+    markdown.write(FOOTER)
+    return markdown.getvalue()
+
+
+def render_json(document: MeetingDocument) -> str:
+    return json.dumps(document.dump(), indent=4)
+
+
+def render_html(document: MeetingDocument) -> str:
+    escape = html.escape
+    out = io.StringIO()
+    out.write(f"<h1>{escape(document.title)}</h1>\n")
+    out.write(f"<p>Date: {document.date}</p>\n")
+    for section in document.sections:
+        out.write(f"<h2>Suggestions - {escape(section.name)}</h2>\n")
+        for entry in section.suggestions:
+            out.write(f"<h3>{entry.number}. {escape(entry.title)} "
+                      f"({escape(entry.author)})</h3>\n<ul>\n")
+            for url in (entry.url, entry.steam_url):
+                if url:
+                    out.write(f'<li><a href="{escape(url)}">'
+                              f"{escape(url)}</a></li>\n")
+            if entry.url in document.votes:
+                out.write(f"<li>Community votes: "
+                          f"{document.votes[entry.url]}</li>\n")
+            out.write("</ul>\n")
+    ranking = document.ranking()
+    if ranking:
+        out.write("<h2>Community ranking</h2>\n<ol>\n")
+        for entry, votes in ranking:
+            out.write(f"<li>{entry.number}. {escape(entry.title)} "
+                      f"({escape(entry.author)}): {votes.score:+d} "
+                      f"({votes})</li>\n")
+        out.write("</ol>\n")
+    return out.getvalue()
@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+import uuid
+from typing import Optional
+
+from bot.utils.exporters import Exporter, Steps
+from bot.utils.files import atomic_write
+from bot.utils.metrics import REGISTRY
+from bot.utils.notes import RenderedNote
+
+EXPORT_DURATION = REGISTRY.histogram(
+    "zeusbot_export_duration_seconds",
+    "Duration of export attempts by destination and result",
+    ["destination", "result"])
+
+
+class ExportJob:
+    def __init__(self, id: str, destination: str, note: RenderedNote,
+                 channel_id: Optional[int] = None,
+                 steps: Optional[dict] = None, attempts: int = 0,
+                 next_attempt: float = 0.0, error: Optional[str] = None,
+                 created: Optional[float] = None,
+                 guild_id: Optional[int] = None):
+        self.id = id
+        self.destination = destination
+        self.note = note
+        # Channel where the result of a retried export gets reported
+        self.channel_id = channel_id
+        self.steps = Steps(steps or {})
+        self.attempts = attempts
+        self.next_attempt = next_attempt
+        self.error = error
+        self.created = created if created is not None else time.time()
+        # Guild whose exporter config is used for retries
+        self.guild_id = guild_id
+
+    def dump(self) -> dict:
+        data = vars(self).copy()
+        data["note"] = self.note.dump()
+        data["steps"] = dict(self.steps)
+        return data
+
+    @classmethod
+    def load(cls, data: dict) -> "ExportJob":
+        data = dict(data, note=RenderedNote.load(data["note"]))
+        return cls(**data)
+
+    def __repr__(self):
+        return (f"<ExportJob id='{self.id}' destination='{self.destination}' "
+                f"steps={list(self.steps)} attempts={self.attempts}>")
+
+
+class Outbox:
+    """Persistent queue of exports that have not completed yet
+
+    Every export is recorded as a job before it starts, and the job is
+    saved again after each completed step. A failed export stays in the
+    outbox and is retried with exponential backoff, resuming from the
+    first step that didn't complete.
+    """
+    def __init__(self, path: str, retries: int = 5, backoff: float = 30.0,
+                 max_backoff: float = 3600.0):
+        self.path = path
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jobs: dict[str, ExportJob] = {}
+        # IDs of the jobs whose export is in progress, they are left alone
+        # by retries until the running export has finished
+        self.running: set[str] = set()
+        # Steps of exports running in worker threads save the outbox too,
+        # so the jobs are only changed and serialised under this lock
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = []
+        self.jobs = {job["id"]: ExportJob.load(job) for job in data}
+        for job in self.jobs.values():
+            job.steps.on_change = self.save
+
+    def save(self):
+        with self._lock:
+            data = [job.dump() for job in self.jobs.values()]
+            atomic_write(self.path, json.dumps(data, indent=4))
+
+    def add(self, destination: str, note: RenderedNote,
+            channel_id: Optional[int] = None,
+            guild_id: Optional[int] = None) -> ExportJob:
+        job = ExportJob(uuid.uuid4().hex[:8], destination, note, channel_id,
+                        guild_id=guild_id)
+        job.steps.on_change = self.save
+        with self._lock:
+            self.jobs[job.id] = job
+        self.save()
+        return job
+
+    def remove(self, job_id: str) -> Optional[ExportJob]:
+        with self._lock:
+            job = self.jobs.pop(job_id, None)
+        self.save()
+        return job
+
+    def pending(self) -> list[ExportJob]:
+        return sorted(self.jobs.values(), key=lambda job: job.created)
+
+    def idle(self) -> list[ExportJob]:
+        """Pending jobs that aren't being exported right now"""
+        return [job for job in self.pending() if job.id not in self.running]
+
+    def due(self) -> list[ExportJob]:
+        """Idle jobs whose backoff has expired and that have retries left"""
+        now = time.time()
+        return [job for job in self.idle()
+                if job.next_attempt <= now and job.attempts < self.retries]
+
+    def _delay(self, attempts: int) -> float:
+        return min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+
+    async def run(self, job: ExportJob, exporter: Exporter) -> str:
+        """Run or resume an export job
+
+        The job is removed from the outbox when the export succeeds.
+        Otherwise the failure is recorded, the next attempt is scheduled and
+        the exception is raised again.
+
+        Raises:
+            ValueError: The job is being exported already
+
+        Returns:
+            str: Output of the exporter
+        """
+        if job.id in self.running:
+            raise ValueError(f"Job {job.id} is running already")
+        self.running.add(job.id)
+        start = time.perf_counter()
+        try:
+            output = await exporter.export(job.note, job.steps)
+        except Exception as e:
+            EXPORT_DURATION.observe(time.perf_counter() - start,
+                                    destination=job.destination,
+                                    result="error")
+            job.attempts += 1
+            job.error = f"{type(e).__name__}: {e}"
+            job.next_attempt = time.time() + self._delay(job.attempts)
+            self.save()
+            raise
+        finally:
+            self.running.discard(job.id)
+        EXPORT_DURATION.observe(time.perf_counter() - start,
+                                destination=job.destination, result="ok")
+        self.remove(job.id)
+        return output
@@ -0,0 +1,44 @@
+MESSAGE_LIMIT = 2000
+
+
+def paginate(lines: list[str], limit: int = MESSAGE_LIMIT, prefix: str = "",
+             suffix: str = "") -> list[str]:
+    """Join lines into as few messages as possible without exceeding the
+    message length limit
+
+    Args:
+        lines (list[str]): Lines to send, a line is never split unless it's
+            longer than a whole page
+        limit (int): Maximum length of a message
+        prefix (str): Text at the start of every page, e.g. an opening code
+            fence
+        suffix (str): Text at the end of every page
+
+    Returns:
+        list[str]: The pages
+    """
+    room = limit - len(prefix) - len(suffix)
+    if room <= 0:
+        raise ValueError("Prefix and suffix don't fit in a message")
+    pages: list[str] = []
+    current: list[str] = []
+    length = 0
+    for line in lines:
+        while len(line) > room:
+            # Too long for a page of its own, has to be split
+            if current:
+                pages.append("\n".join(current))
+                current, length = [], 0
+            pages.append(line[:room])
+            line = line[room:]
+        # +1 for the newline joining the line to the previous one
+        added = len(line) + (1 if current else 0)
+        if length + added > room:
+            pages.append("\n".join(current))
+            current, length = [], 0
+            added = len(line)
+        current.append(line)
+        length += added
+    if current:
+        pages.append("\n".join(current))
+    return [f"{prefix}{page}{suffix}" for page in pages]
@@ -0,0 +1,101 @@
+import json
+import re
+import threading
+from typing import Iterable, Optional
+
+from bot.utils.files import atomic_write
+
+
+class KeywordMatcher:
+    """Finds any of several keywords in a text with a single regex search"""
+    def __init__(self, keywords: Iterable[str]):
+        # Longest first, so that the reported keyword is the longest one
+        # starting at the match position
+        self.keywords = sorted(set(keywords), key=len, reverse=True)
+        self.pattern: Optional[re.Pattern] = re.compile(
+            "|".join(re.escape(keyword) for keyword in self.keywords)) \
+            if self.keywords else None
+
+    def search(self, text: str) -> Optional[str]:
+        """First keyword found in the text, None if there is none"""
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(text)
+        return match.group(0) if match else None
+
+
+class PinQueue:
+    """Pending pin and unpin operations, coalesced per message
+
+    Only the state a message should end up in is kept. An operation that
+    undoes a pending one cancels both, since the message is already in the
+    requested state.
+    """
+    def __init__(self):
+        # (channel ID, pin) keyed by message ID, in the order of arrival
+        self.pending: dict[int, tuple[int, bool]] = {}
+
+    def put(self, channel_id: int, message_id: int, pin: bool):
+        current = self.pending.get(message_id)
+        if current is None:
+            self.pending[message_id] = (channel_id, pin)
+        elif current[1] != pin:
+            del self.pending[message_id]
+
+    def pop(self) -> Optional[tuple[int, int, bool]]:
+        """Oldest pending operation as (channel ID, message ID, pin)"""
+        if not self.pending:
+            return None
+        message_id = next(iter(self.pending))
+        channel_id, pin = self.pending.pop(message_id)
+        return channel_id, message_id, pin
+
+    def __len__(self):
+        return len(self.pending)
+
+
+class PinStore:
+    """Messages pinned by the bot in each channel, oldest first
+
+    Pins made by users are never recorded, so rotating out the oldest pin
+    of a full channel only ever removes one of the bot's own pins.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pins: dict[int, list[int]] = {}
+        try:
+            with open(path, "r") as f:
+                self.pins = {int(channel): messages
+                             for channel, messages in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+
+    def add(self, channel_id: int, message_id: int):
+        messages = self.pins.setdefault(channel_id, [])
+        if message_id not in messages:
+            messages.append(message_id)
+
+    def remove(self, channel_id: int, message_id: int) -> bool:
+        messages = self.pins.get(channel_id, [])
+        if message_id not in messages:
+            return False
+        messages.remove(message_id)
+        return True
+
+    def oldest(self, channel_id: int) -> Optional[int]:
+        messages = self.pins.get(channel_id)
+        return messages[0] if messages else None
+
+    def __contains__(self, message_id: int) -> bool:
+        return any(message_id in messages for messages in self.pins.values())
+
+    def snapshot(self) -> dict[str, list[int]]:
+        """Copy of the pins for `save`, taken where the pins are changed"""
+        return {str(channel): list(messages)
+                for channel, messages in self.pins.items() if messages}
+
+    def save(self, snapshot: Optional[dict[str, list[int]]] = None):
+        data = self.snapshot() if snapshot is None else snapshot
+        with self.lock:
+            atomic_write(self.path, json.dumps(data, indent=4))
@@ -0,0 +1,138 @@
+import csv
+import io
+import os
+import sqlite3
+import threading
+from typing import NamedTuple, Optional
+
+from bot.utils.suggestion import Type
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS months (
+    month TEXT PRIMARY KEY,
+    saved REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS suggestions (
+    month TEXT NOT NULL,
+    author TEXT NOT NULL,
+    category INTEGER NOT NULL,
+    steam INTEGER NOT NULL,
+    voted INTEGER NOT NULL,
+    up INTEGER NOT NULL,
+    down INTEGER NOT NULL,
+    neutral INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS suggestions_month ON suggestions (month);
+"""
+
+# Suggestions of the selected months, `?` are the first and last month
+_RANGE = "FROM suggestions WHERE month BETWEEN ? AND ?"
+
+
+class MonthStats(NamedTuple):
+    month: str
+    total: int
+    steam: int
+    co: int
+    both: int
+    staff: int
+    unknown: int
+    # Suggestions with community votes, and those with more up than down
+    voted: int
+    accepted: int
+
+    @property
+    def acceptance(self) -> Optional[float]:
+        return self.accepted / self.voted if self.voted else None
+
+
+class Summary(NamedTuple):
+    months: list[MonthStats]
+    # (author, suggestions), most suggestions first
+    authors: list[tuple[str, int]]
+
+    @property
+    def total(self) -> int:
+        return sum(month.total for month in self.months)
+
+    @property
+    def steam(self) -> int:
+        return sum(month.steam for month in self.months)
+
+    @property
+    def categories(self) -> dict[Type, int]:
+        return {category: sum(month[index] for month in self.months)
+                for index, category in enumerate(Type, 3)}
+
+    def csv(self) -> str:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(MonthStats._fields + ("acceptance",))
+        for month in self.months:
+            acceptance = month.acceptance
+            writer.writerow(month + ("" if acceptance is None
+                                     else f"{acceptance:.3f}",))
+        return out.getvalue()
+
+
+class SuggestionStats:
+    """Archived suggestions in an SQLite table, aggregated with SQL
+
+    Each month is imported from its archived JSON document and imported
+    again when the archive has a newer version of it.
+    """
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.db:
+            self.db.executescript(SCHEMA)
+
+    def months(self) -> dict[str, float]:
+        """Time each imported month was saved to the archive"""
+        with self.lock:
+            return dict(self.db.execute("SELECT month, saved FROM months"))
+
+    def import_month(self, month: str, saved: float, data: dict):
+        """Replace the suggestions of a month with those of an archived
+        document"""
+        votes = data.get("votes", {})
+        rows = []
+        for suggestions in data.get("categories", {}).values():
+            for s in suggestions:
+                counts = votes.get(s["url"])
+                up, down, neutral = (counts["up"], counts["down"],
+                                     counts["neutral"]) if counts \
+                    else (0, 0, 0)
+                rows.append((month, s["author"], s["category"],
+                             bool(s.get("steam_url")), counts is not None,
+                             up, down, neutral))
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM suggestions WHERE month = ?",
+                            (month,))
+            self.db.executemany(
+                "INSERT INTO suggestions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows)
+            self.db.execute("INSERT OR REPLACE INTO months VALUES (?, ?)",
+                            (month, saved))
+
+    def summary(self, first: str = "0000-00", last: str = "9999-99",
+                authors: int = 10) -> Summary:
+        """Statistics of the months from `first` to `last`, inclusive"""
+        with self.lock:
+            months = [MonthStats(*row) for row in self.db.execute(
+                f"SELECT month, COUNT(*), SUM(steam), "
+                f"SUM(category = {Type.CO:d}), SUM(category = {Type.BOTH:d}),"
+                f" SUM(category = {Type.STAFF:d}), "
+                f"SUM(category = {Type.UNKNOWN:d}), SUM(voted), "
+                f"SUM(voted AND up > down) {_RANGE} "
+                f"GROUP BY month ORDER BY month", (first, last))]
+            top = self.db.execute(
+                f"SELECT author, COUNT(*) AS count {_RANGE} "
+                f"GROUP BY author ORDER BY count DESC, author LIMIT ?",
+                (first, last, authors)).fetchall()
+        return Summary(months, top)
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,40 @@
+from enum import IntEnum
+from typing import Optional
+
+
+class Type(IntEnum):
+    CO = 1
+    BOTH = 2
+    STAFF = 3
+    UNKNOWN = 4
+
+
+class Suggestion:
+    __slots__ = ('author', 'title', 'url', 'steam_url', 'category', 'number',
+                 'guessed')
+
+    def __init__(self, author: str, title: str, url: str, category: Type,
+                 steam_url: Optional[str] = None):
+        self.author: str = author
+        self.title: str = title
+        self.url: str = url
+        self.steam_url: Optional[str] = steam_url
+        self.category: Type = category
+        self.number: Optional[int] = None
+        # Category was assigned by the classifier, not confirmed by a person
+        self.guessed = False
+
+    def dump(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def load(cls, data: dict) -> "Suggestion":
+        suggestion = cls(data["author"], data["title"], data["url"],
+                         Type(data["category"]), data.get("steam_url"))
+        suggestion.number = data.get("number")
+        suggestion.guessed = data.get("guessed", False)
+        return suggestion
+
+    def __repr__(self):
+        return (f"<Suggestion author='{self.author}' title='{self.title}' "
+                f"category={self.category}>")
@@ -0,0 +1,123 @@
+import json
+import re
+from typing import Optional
+
+from bot.utils.files import atomic_write
+from bot.utils.suggestion import Suggestion
+from bot.utils.votes import Votes
+
+WORKSHOP_ID_PATTERN = re.compile(
+    r'https://steamcommunity\.com/.*/filedetails/\?id=(\d+)')
+
+# Indexes are shared between all cogs that use the same file
+_indexes: dict[str, "SuggestionIndex"] = {}
+
+
+def workshop_id(text: str) -> Optional[str]:
+    """Return the Steam workshop ID of the first workshop link in the text"""
+    match = WORKSHOP_ID_PATTERN.search(text)
+    return match.group(1) if match else None
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase the title and strip everything but letters and digits, so
+    that formatting and punctuation differences don't hide duplicates"""
+    return " ".join(re.sub(r"[\W_]+", " ", title.lower()).split())
+
+
+def voted_down(entry: dict) -> bool:
+    """Whether the community voted against an indexed suggestion"""
+    votes = entry.get("votes")
+    return bool(votes) and Votes(*votes).score < 0
+
+
+def get_index(path: str) -> "SuggestionIndex":
+    if path not in _indexes:
+        _indexes[path] = SuggestionIndex(path)
+    return _indexes[path]
+
+
+class SuggestionIndex:
+    """Suggestions of past meetings, indexed by Steam workshop ID and by
+    normalised title
+
+    Titles that normalise to nothing, e.g. only emoji, are left out of the
+    title index so they don't all match each other.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        # Most recent month in the index
+        self.last_month: Optional[str] = None
+        self.entries: dict[str, dict] = {}
+        self.by_workshop_id: dict[str, list[dict]] = {}
+        self.by_title: dict[str, list[dict]] = {}
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            self._add_entry(entry)
+
+    def _add_entry(self, entry: dict):
+        old = self.entries.get(entry["url"])
+        if old:
+            # Suggestion was re-archived, replace the old entry
+            self._remove_from(self.by_workshop_id, old["workshop_id"], old)
+            self._remove_from(self.by_title, old["key"], old)
+        self.entries[entry["url"]] = entry
+        if entry["workshop_id"]:
+            self.by_workshop_id.setdefault(
+                entry["workshop_id"], []).append(entry)
+        if entry["key"]:
+            self.by_title.setdefault(entry["key"], []).append(entry)
+        if self.last_month is None or entry["month"] > self.last_month:
+            self.last_month = entry["month"]
+
+    @staticmethod
+    def _remove_from(index: dict[str, list[dict]], key: Optional[str],
+                     entry: dict):
+        if key in index:
+            index[key] = [e for e in index[key] if e is not entry]
+
+    def add(self, suggestion: Suggestion, month: str,
+            votes: Optional[Votes] = None):
+        steam_url = suggestion.steam_url or ""
+        self._add_entry({
+            "month": month,
+            "title": suggestion.title,
+            "author": suggestion.author,
+            "url": suggestion.url,
+            "category": int(suggestion.category),
+            "workshop_id": workshop_id(steam_url),
+            "key": normalize_title(suggestion.title),
+            "votes": list(votes) if votes else None,
+        })
+
+    def find(self, title: str, text: str = "",
+             exclude_url: Optional[str] = None) -> list[dict]:
+        """Find earlier suggestions with the same workshop item or title
+
+        Args:
+            title (str): Title of the new suggestion
+            text (str): Full text of the new suggestion, searched for a
+                workshop link
+            exclude_url (Optional[str]): Jump URL of the new suggestion
+                itself
+
+        Returns:
+            list[dict]: Matching entries, oldest month first
+        """
+        matches: dict[str, dict] = {}
+        item = workshop_id(text)
+        if item:
+            for entry in self.by_workshop_id.get(item, []):
+                matches[entry["url"]] = entry
+        key = normalize_title(title)
+        for entry in self.by_title.get(key, []) if key else []:
+            matches[entry["url"]] = entry
+        matches.pop(exclude_url, None)
+        return sorted(matches.values(), key=lambda entry: entry["month"])
+
+    def save(self):
+        atomic_write(self.path, json.dumps(list(self.entries.values())))
@@ -0,0 +1,112 @@
+import json
+import threading
+from typing import NamedTuple, Optional
+
+from bot.utils.files import atomic_write
+
+
+class Votes(NamedTuple):
+    up: int = 0
+    down: int = 0
+    neutral: int = 0
+
+    @property
+    def score(self) -> int:
+        return self.up - self.down
+
+    def __str__(self):
+        return f"+{self.up} -{self.down} ~{self.neutral}"
+
+
+class VoteTally:
+    """Vote counts of each suggestion message, kept up to date from
+    reaction events
+
+    Only the three vote emoji are counted, reactions by the bot itself are
+    left out by the caller. Votes on a linked message, such as the link to
+    the discussion of a suggestion, are counted for the message it links.
+    """
+    def __init__(self, upvote: str, downvote: str, neutral: str,
+                 path: Optional[str] = None):
+        self.emoji = (upvote, downvote, neutral)
+        self.path = path
+        self.lock = threading.Lock()
+        self.dirty = False
+        # Counts in the order of `emoji`, keyed by message ID
+        self.counts: dict[int, list[int]] = {}
+        # Message whose votes are counted for each linked message
+        self.links: dict[int, int] = {}
+        if path:
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = {}
+            if "counts" not in data:
+                # Saved before the links, only the counts
+                data = {"counts": data}
+            self.counts = {int(message): counts for message, counts
+                           in data["counts"].items()}
+            self.links = {int(message): target for message, target
+                          in data.get("links", {}).items()}
+
+    def link(self, message_id: int, target_id: int):
+        """Count the votes on a message for another message"""
+        self.links[message_id] = target_id
+        self.dirty = True
+
+    def target(self, message_id: int) -> int:
+        """Message that the votes on a message are counted for"""
+        return self.links.get(message_id, message_id)
+
+    def add(self, message_id: int, emoji: str, amount: int = 1):
+        if emoji not in self.emoji:
+            return
+        message_id = self.target(message_id)
+        counts = self.counts.setdefault(message_id, [0, 0, 0])
+        index = self.emoji.index(emoji)
+        counts[index] = max(0, counts[index] + amount)
+        self.dirty = True
+
+    def remove(self, message_id: int, emoji: str):
+        self.add(message_id, emoji, -1)
+
+    def set(self, message_id: int, counts: dict[str, int]):
+        """Replace the counts of a message, e.g. from a fetched message"""
+        self.counts[self.target(message_id)] = [
+            counts.get(emoji, 0) for emoji in self.emoji]
+        self.dirty = True
+
+    def clear(self, message_id: int, emoji: Optional[str] = None):
+        message_id = self.target(message_id)
+        if emoji is None:
+            self.dirty |= self.counts.pop(message_id, None) is not None
+        elif emoji in self.emoji and message_id in self.counts:
+            self.counts[message_id][self.emoji.index(emoji)] = 0
+            self.dirty = True
+
+    def get(self, message_id: int) -> Optional[Votes]:
+        counts = self.counts.get(message_id)
+        return Votes(*counts) if counts else None
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            # Copying is atomic, events may change the counts meanwhile
+            counts = list(self.counts.items())
+            links = list(self.links.items())
+            self.dirty = False
+            atomic_write(self.path, json.dumps({
+                "counts": {str(message): list(votes)
+                           for message, votes in counts},
+                "links": {str(message): target for message, target in links},
+            }))
+
+
+def message_id_from_url(url: str) -> Optional[int]:
+    """ID of the message a jump URL points to"""
+    try:
+        return int(url.rstrip("/").rsplit("/", 1)[1])
+    except (IndexError, ValueError):
+        return None
@@ -0,0 +1,74 @@
+"""End-to-end HackMD export benchmark against the local API stand-in
+
+Run with `python -m tests.benchmark_hackmd --help`. Exports are retried
+with their steps like the outbox does, and the index is checked for a
+single link per exported month at the end.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from tests.hackmd_server import FakeHackMD
+from tests.test_hackmd import (INDEX, INDEX_ID, create_exporter,
+                               export_until_done, index_months, note)
+
+
+async def benchmark(args: argparse.Namespace):
+    server = FakeHackMD(latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate,
+                        lost_response_rate=args.lost_response_rate,
+                        seed=args.seed)
+    server.add_note(INDEX, INDEX_ID)
+    await server.start()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    durations: list[float] = []
+
+    async def export(number: int):
+        month = f"{3000 + number // 12}-{number % 12 + 1:02d}"
+        exporter = create_exporter(server)
+        async with semaphore:
+            start = time.perf_counter()
+            await export_until_done(exporter, note(month, args.size))
+            durations.append(time.perf_counter() - start)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(export(number)
+                               for number in range(args.exports)))
+        total = time.perf_counter() - start
+    finally:
+        await server.stop()
+
+    months = index_months(server)
+    assert len(months) == len(set(months)) == args.exports + 1, \
+        "Index lost or duplicated links"
+    failed = sum(1 for _, _, status, _ in server.requests if status >= 400)
+    sent = sum(size for _, _, _, size in server.requests)
+    durations.sort()
+    print(f"{args.exports} exports in {total:.2f} s "
+          f"({args.exports / total:.1f}/s)")
+    print(f"export: mean {statistics.mean(durations) * 1000:.1f} ms, "
+          f"p95 {durations[int(len(durations) * 0.95)] * 1000:.1f} ms, "
+          f"max {durations[-1] * 1000:.1f} ms")
+    print(f"{len(server.requests)} requests, {failed} failed, "
+          f"{sent / 1024:.0f} KiB sent")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--exports", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--lost-response-rate", type=float, default=0.0)
+    parser.add_argument("--size", type=int, default=20000,
+                        help="bytes of content per note")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Local stand-in for the team note endpoints of the HackMD API
+
+Used by the HackMD export tests and benchmarks. Latency, failures and the
+maximum payload size can be configured to see how exports behave against a
+slow or unreliable API.
+"""
+import asyncio
+import random
+import string
+from typing import Optional
+
+from aiohttp import web
+
+
+class FakeHackMD:
+    def __init__(self, team: str = "zeusops", token: str = "token",
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, lost_response_rate: float = 0.0,
+                 max_payload: Optional[int] = None, seed: int = 0):
+        """
+        Args:
+            latency (float): Seconds added to every response
+            jitter (float): Random extra latency of up to this many seconds
+            error_rate (float): Share of requests that fail with 500 before
+                changing anything
+            lost_response_rate (float): Share of writes that fail with 500
+                after the change has been made, as if the response was lost
+            max_payload (Optional[int]): Requests with a larger body are
+                rejected with 413
+            seed (int): Seed of the failures and the jitter
+        """
+        self.team = team
+        self.token = token
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.lost_response_rate = lost_response_rate
+        self.max_payload = max_payload
+        self.random = random.Random(seed)
+        self.notes: dict[str, dict] = {}
+        # (method, path, status, request body size) of every request
+        self.requests: list[tuple[str, str, int, int]] = []
+        self.app = web.Application(middlewares=[self.middleware],
+                                   client_max_size=1 << 26)
+        self.app.router.add_get("/v1/notes/{note_id}", self.get_note)
+        self.app.router.add_post("/v1/teams/{team}/notes", self.create_note)
+        self.app.router.add_patch("/v1/teams/{team}/notes/{note_id}",
+                                  self.update_note)
+        self.runner = web.AppRunner(self.app, access_log=None)
+        self.url = ""
+
+    async def start(self):
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}/v1"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def add_note(self, content: str, note_id: Optional[str] = None) -> str:
+        note_id = note_id or self._new_id()
+        self.notes[note_id] = {
+            "id": note_id,
+            "title": content.split("\n")[0].lstrip("# "),
+            "content": content,
+            "teamPath": self.team,
+            "publishLink": f"https://hackmd.io/@{self.team}/{note_id}",
+        }
+        return note_id
+
+    def _new_id(self) -> str:
+        alphabet = string.ascii_letters + string.digits
+        return "".join(self.random.choice(alphabet) for _ in range(22))
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        body = await request.read()
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if request.headers.get("Authorization") != f"Bearer {self.token}":
+            response = web.json_response({"error": "Unauthorized"},
+                                         status=401)
+        elif self.max_payload is not None and len(body) > self.max_payload:
+            response = web.json_response({"error": "Payload Too Large"},
+                                         status=413)
+        elif self.random.random() < self.error_rate:
+            response = web.json_response({"error": "Internal Server Error"},
+                                         status=500)
+        else:
+            response = await handler(request)
+            if request.method != "GET" \
+                    and self.random.random() < self.lost_response_rate:
+                response = web.json_response(
+                    {"error": "Internal Server Error"}, status=500)
+        self.requests.append((request.method, request.path, response.status,
+                              len(body)))
+        return response
+
+    async def get_note(self, request: web.Request):
+        note = self.notes.get(request.match_info["note_id"])
+        if note is None:
+            return web.json_response({"error": "Not Found"}, status=404)
+        return web.json_response(note)
+
+    async def create_note(self, request: web.Request):
+        if request.match_info["team"] != self.team:
+            return web.json_response({"error": "Not Found"}, status=404)
+        data = await request.json()
+        # Like HackMD, the title comes from the content, not the parameter
+        note_id = self.add_note(data.get("content", ""))
+        return web.json_response(self.notes[note_id], status=201)
+
+    async def update_note(self, request: web.Request):
+        note = self.notes.get(request.match_info["note_id"])
+        if request.match_info["team"] != self.team or note is None:
+            return web.json_response({"error": "Not Found"}, status=404)
+        data = await request.json()
+        if data.get("content") is not None:
+            note["content"] = data["content"]
+        return web.Response(status=202)
@@ -0,0 +1,39 @@
+import asyncio
+import os
+
+from bot.utils.archive import Archive
+
+
+def test_save_and_load(tmp_path):
+    async def test():
+        archive = Archive(str(tmp_path), compress=True)
+        await archive.save("2023-07", "# July", '{"month": "2023-07"}')
+        await archive.save("2023-08", "# August", '{"month": "2023-08"}')
+        await archive.set_link("2023-08", "hackmd", "https://hackmd/x")
+        return archive
+
+    archive = asyncio.run(test())
+    assert sorted(os.listdir(tmp_path)) == [
+        "2023-07.json.gz", "2023-07.md.gz", "2023-08.json.gz",
+        "2023-08.md.gz", "index.json"]
+
+    # A fresh instance finds everything through the index
+    archive = Archive(str(tmp_path))
+    assert archive.months() == ["2023-07", "2023-08"]
+    assert archive.links("2023-08") == {"hackmd": "https://hackmd/x"}
+    assert asyncio.run(archive.load("2023-07")) == {"month": "2023-07"}
+    assert asyncio.run(archive.load_markdown("2023-08")) == "# August"
+    assert asyncio.run(archive.load("2023-09")) is None
+    assert archive.has_data("2023-08")
+
+
+def test_links_without_data(tmp_path):
+    async def test():
+        archive = Archive(str(tmp_path))
+        await archive.set_link("2023-09", "hackmd", "https://hackmd/y")
+        return archive
+
+    archive = asyncio.run(test())
+    assert archive.links("2023-09") == {"hackmd": "https://hackmd/y"}
+    assert not archive.has_data("2023-09")
+    assert asyncio.run(archive.load("2023-09")) is None
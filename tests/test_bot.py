@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from bot.bot import ZeusBot, _merge, _override
+from bot.config import ConfigError, PinConfig, PinRule
+
+CONFIG = {
+    'bot': {'admins': [1], 'prefix': '~', 'token': 'token'},
+    'guild': {'roles': {'staff': 10}},
+    'guilds': {
+        2 << 22: {'roles': {'staff': 20},
+                  'cogs': {'pin': {'path': 'pins.json'}}},
+    },
+    'cogs': {'pin': {'rules': [{'channel': 100, 'keywords': ['PIN']}]}},
+}
+
+
+def create_bot(config=CONFIG, **kwargs) -> ZeusBot:
+    async def create():
+        return ZeusBot(command_prefix='~', config=config, **kwargs)
+    return asyncio.run(create())
+
+
+def test_override():
+    base = {'a': {'b': 1, 'c': [1, 2]}, 'd': 1}
+    assert _override(base, {'a': {'c': [3]}}) == \
+        {'a': {'b': 1, 'c': [3]}, 'd': 1}
+    # The base isn't modified
+    assert base['a']['c'] == [1, 2]
+
+
+def test_guild_config():
+    bot = create_bot()
+    override = bot.guild_config(2 << 22)
+    assert override.roles.staff == 20
+    assert override.cogs.pin == PinConfig((PinRule(100, ('PIN',)),),
+                                          'pins.json')
+    assert bot.guild_config(3 << 22).roles.staff == 10
+
+
+def test_count_events():
+    bot = create_bot(shard_count=2)
+    bot.dispatch('socket_response', {'op': 0, 't': 'MESSAGE_CREATE',
+                                     'd': {'guild_id': str(3 << 22)}})
+    bot.dispatch('socket_response', {'op': 0, 't': 'MESSAGE_CREATE',
+                                     'd': {'guild_id': str(2 << 22)}})
+    bot.dispatch('socket_response', {'op': 0, 't': 'READY', 'd': {}})
+    bot.dispatch('socket_response', {'op': 11, 'd': None})
+    assert bot.event_counts[1] == {'MESSAGE_CREATE': 1}
+    assert bot.event_counts[0] == {'MESSAGE_CREATE': 1, 'READY': 1}
+
+
+def test_merge_lists():
+    base = {'a': [1, {'b': 1, 'c': 2}], 'd': {'e': 1}}
+    assert _merge(base, {'a': [3, {'b': 2}, 4], 'd': {'e': 2}}) == \
+        {'a': [3, {'b': 2, 'c': 2}, 4], 'd': {'e': 2}}
+    with pytest.raises(Exception, match="Conflict at d.e"):
+        _merge({'d': {'e': 1}}, {'d': {'e': 2}}, update=False)
+
+
+def test_invalid_guild_override():
+    config = dict(CONFIG, guilds={5: {'cogs': {'pin': {'pth': 1}}}})
+    with pytest.raises(ConfigError, match=r"^guilds\.5\.cogs\.pin\.pth:"):
+        create_bot(config)
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from bot.utils.checkpoint import Checkpoint, CheckpointError
+from bot.utils.suggestion import Suggestion, Type
+
+
+def test_roundtrip(tmp_path):
+    co = Suggestion("Miller", "Mod ✓", "https://discord/1", Type.CO,
+                    "https://steamcommunity.com/x/filedetails/?id=1")
+    staff = Suggestion("Matt", "Rules", "https://discord/2", Type.STAFF)
+    unknown = Suggestion("Capry", "Other", "https://discord/3", Type.UNKNOWN)
+    co.number, staff.number = 2, 1
+    staff.guessed = True
+    path = os.path.join(tmp_path, "session.ckpt")
+    Checkpoint("sort", [co, staff, unknown], [[co], [], [staff], [unknown]],
+               "September", ["job1", "job2"], "2023-08").save(path)
+
+    checkpoint = Checkpoint.load(path)
+    assert checkpoint is not None
+    assert checkpoint.step == "sort"
+    assert checkpoint.next_month == "September"
+    assert checkpoint.jobs == ["job1", "job2"]
+    assert checkpoint.month == "2023-08"
+    assert [s.dump() for s in checkpoint.suggestions] == \
+        [s.dump() for s in (co, staff, unknown)]
+    # Category lists refer to the same objects as the suggestion list
+    assert checkpoint.categories[0][0] is checkpoint.suggestions[0]
+    assert [len(c) for c in checkpoint.categories] == [1, 0, 1, 1]
+
+    Checkpoint.remove(path)
+    assert Checkpoint.load(path) is None
+
+
+def test_invalid_data():
+    data = Checkpoint("categorize", [], []).encode()
+    assert Checkpoint.decode(data).next_month is None
+    with pytest.raises(CheckpointError):
+        Checkpoint.decode(b"XYZ" + data[3:])
+    with pytest.raises(CheckpointError):
+        Checkpoint.decode(data[:-1])
+
+
+def test_older_versions():
+    data = Checkpoint("sort", [], [], "May", ["job1"]).encode()
+    # Version 2 had no month after the jobs
+    checkpoint = Checkpoint.decode(data[:3] + b"\x02" + data[4:-4])
+    assert (checkpoint.jobs, checkpoint.month) == (["job1"], None)
+    # Version 1 had no jobs after the category lists either
+    data = Checkpoint("sort", [], [], "May").encode()
+    checkpoint = Checkpoint.decode(data[:3] + b"\x01" + data[4:-6])
+    assert (checkpoint.step, checkpoint.jobs) == ("sort", [])
@@ -0,0 +1,72 @@
+import os
+
+from bot.utils.classifier import Classifier, suggestions_from_notes
+from bot.utils.suggestion import Suggestion, Type
+
+
+def suggestion(title: str, author: str, category=Type.UNKNOWN,
+               url: str = ""):
+    return Suggestion(author, title, url or f"https://discord/{title}",
+                      category)
+
+
+def trained() -> Classifier:
+    classifier = Classifier()
+    for number in range(5):
+        classifier.learn(suggestion(f"Rename staff role {number}", "Matt",
+                                    Type.STAFF))
+        classifier.learn(suggestion(f"Mission framework change {number}",
+                                    "Miller", Type.CO))
+    return classifier
+
+
+def test_predict():
+    category, confidence = trained().predict(
+        suggestion("New staff role", "Matt"))
+    assert category == Type.STAFF
+    assert confidence > 0.9
+    category, _ = trained().predict(suggestion("Framework", "Miller"))
+    assert category == Type.CO
+
+
+def test_predict_untrained():
+    assert Classifier().predict(suggestion("Anything", "Someone")) is None
+
+
+def test_learn_once():
+    classifier = Classifier()
+    entry = suggestion("Title", "Author", Type.BOTH)
+    assert classifier.learn(entry)
+    assert not classifier.learn(entry)
+    assert not classifier.learn(suggestion("Other", "Author"))
+    assert classifier.documents[Type.BOTH] == 1
+
+
+def test_save_and_load(tmp_path):
+    path = os.path.join(tmp_path, "classifier.json")
+    classifier = trained()
+    classifier.save(path)
+    loaded = Classifier.from_file(path)
+    assert loaded is not None
+    entry = suggestion("Staff role rename", "Matt")
+    assert loaded.predict(entry) == classifier.predict(entry)
+
+
+def test_suggestions_from_legacy_notes():
+    entry = suggestion("Title", "Author", Type.STAFF).dump()
+    legacy = {"Staff": [entry]}
+    document = {"month": "2023-08", "categories": {"Staff": [entry]}}
+    assert [s.title for s in suggestions_from_notes(legacy)] == ["Title"]
+    assert [s.title for s in suggestions_from_notes(document)] == ["Title"]
+
+
+def test_guesses_are_not_learned():
+    classifier = Classifier()
+    guess = suggestion("Rename staff role", "Matt", Type.STAFF)
+    guess.guessed = True
+    assert not classifier.learn(guess)
+    # The flag survives archiving
+    archived = next(iter(suggestions_from_notes({"Staff": [guess.dump()]})))
+    assert not classifier.learn(archived)
+    guess.guessed = False
+    assert classifier.learn(guess)
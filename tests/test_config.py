@@ -0,0 +1,69 @@
+from typing import Optional
+
+import pytest
+import yaml
+
+from bot.config import (Config, ConfigError, DraftsConfig, HackMDConfig,
+                        OutboxConfig, compile_config)
+
+
+def test_compile_repo_config():
+    with open("config.yaml") as f:
+        data = yaml.safe_load(f)
+    data["bot"]["token"] = "token"
+    data["cogs"]["meetingnotes"]["hackmd"]["token"] = "token"
+    config = compile_config(Config, data)
+    assert config.bot.prefix == "~"
+    assert isinstance(config.bot.admins, frozenset)
+    assert config.cogs.meetingnotes.outbox.backoff == 30.0
+    assert config.cogs.pin is None
+
+
+def test_defaults_and_conversion():
+    outbox = compile_config(OutboxConfig, {"path": "outbox.json",
+                                           "max_backoff": 60})
+    assert outbox == OutboxConfig("outbox.json", 5, 30.0, 60.0)
+    with pytest.raises(AttributeError):
+        outbox.retries = 1  # type: ignore
+
+
+@pytest.mark.parametrize("data, error", [
+    ({}, "outbox.path: missing key"),
+    ({"path": "x", "retry": 1}, "outbox.retry: unknown key"),
+    ({"path": "x", "retries": "5"}, "outbox.retries: expected int, got str"),
+    ({"path": "x", "retries": True}, "outbox.retries: expected int, got bool"),
+    ([], "outbox: expected a mapping, got list"),
+])
+def test_errors_point_to_path(data, error):
+    with pytest.raises(ConfigError) as info:
+        compile_config(OutboxConfig, data, "outbox")
+    assert str(info.value) == error
+
+
+def test_nested_paths():
+    data = {"bot": {"token": "t", "prefix": "~", "admins": [1, "two"]},
+            "guild": {"roles": {"staff": "Staff"}}}
+    with pytest.raises(ConfigError, match=r"^bot\.admins\[1\]: expected int"):
+        compile_config(Config, data)
+    data["bot"]["admins"] = [1]
+    assert compile_config(Config, data).guild.roles.staff == "Staff"
+
+
+def test_cross_field_checks():
+    data = {"enable": True, "team_name": "t", "index_id": "i",
+            "index_line": "l", "index_line_regex": "r"}
+    with pytest.raises(ConfigError, match="^hackmd: token is required"):
+        compile_config(HackMDConfig, data, "hackmd")
+    hackmd: Optional[HackMDConfig] = compile_config(
+        HackMDConfig, dict(data, enable=False), "hackmd")
+    assert hackmd is not None and hackmd.read_perm == "guest"
+
+
+def test_draft_times():
+    drafts = compile_config(DraftsConfig, {"times": ["03:00", "17:30"]})
+    assert drafts == DraftsConfig(False, ("03:00", "17:30"))
+    with pytest.raises(ConfigError, match=r"^drafts: invalid time '3am'"):
+        compile_config(DraftsConfig, {"times": ["3am"]}, "drafts")
+    # Unquoted times are read as numbers by YAML
+    with pytest.raises(ConfigError, match=r"^drafts\.times\[0\]: expected"):
+        compile_config(DraftsConfig, {"times": [180]}, "drafts")
@@ -0,0 +1,22 @@
+import os
+
+from bot.utils.cursors import ChannelCursors
+
+
+def test_cursors(tmp_path):
+    path = os.path.join(tmp_path, "cursors.json")
+    cursors = ChannelCursors(path)
+    assert cursors.get(1) is None
+    cursors.advance(1, 100)
+    # Messages processed out of order never move the cursor back
+    cursors.advance(1, 90)
+    cursors.advance(2, 5)
+    assert cursors.get(1) == 100
+    assert cursors.dirty
+    cursors.save()
+    assert not cursors.dirty
+
+    cursors = ChannelCursors(path)
+    assert cursors.cursors == {1: 100, 2: 5}
+    cursors.advance(2, 5)
+    assert not cursors.dirty
@@ -0,0 +1,41 @@
+import asyncio
+
+from bot.utils.debounce import Debouncer
+
+
+def test_debounce():
+    calls = []
+
+    async def callback(value):
+        calls.append(value)
+
+    async def test():
+        debouncer = Debouncer(0.05, callback)
+        for value in range(3):
+            debouncer.trigger("a", value)
+            await asyncio.sleep(0.01)
+        debouncer.trigger("b", 10)
+        assert len(debouncer) == 2
+        await asyncio.sleep(0.1)
+        # One call per key with the latest value
+        assert sorted(calls) == [2, 10]
+        assert len(debouncer) == 0
+
+        debouncer.trigger("a", 3)
+        debouncer.cancel()
+        await asyncio.sleep(0.1)
+        assert sorted(calls) == [2, 10]
+    asyncio.run(test())
+
+
+def test_callback_errors_are_logged(caplog):
+    async def callback(value):
+        raise RuntimeError(value)
+
+    async def test():
+        debouncer = Debouncer(0.01, callback)
+        debouncer.trigger("a", 1)
+        await asyncio.sleep(0.05)
+        assert len(debouncer) == 0
+    asyncio.run(test())
+    assert "Debounced callback for 'a' failed" in caplog.text
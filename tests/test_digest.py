@@ -0,0 +1,45 @@
+from bot.utils.digest import Digest
+
+
+class Clock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+def test_due_by_size_and_interval():
+    clock = Clock()
+    digest = Digest(size=3, interval=10, clock=clock)
+    assert not digest.due()
+    digest.add(1)
+    digest.add(2)
+    assert not digest.due()
+    digest.add(3)
+    digest.add(4)
+    assert digest.due()
+    assert digest.take() == ([1, 2, 3], 0)
+    assert not digest.due()
+    clock.time = 10
+    assert digest.due()
+    assert digest.take() == ([4], 0)
+
+
+def test_back_pressure():
+    clock = Clock()
+    digest = Digest(size=2, interval=10, limit=3, clock=clock)
+    for entry in range(4):
+        digest.add(entry)
+    # The oldest entry didn't fit
+    assert len(digest) == 3
+    batch, dropped = digest.take()
+    assert (batch, dropped) == ([1, 2], 1)
+
+    digest.retry(5, batch, dropped)
+    digest.add(4)
+    assert not digest.due()
+    clock.time = 5
+    assert digest.due()
+    assert digest.take() == ([2, 3], 2)
+    assert digest.take() == ([4], 0)
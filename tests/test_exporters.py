@@ -1,7 +1,7 @@
 import yaml
 
 from bot.bot import _merge
-from bot.utils.exporters import HackMDExporter
+from bot.utils.exporters.hackmd import HackMDExporter
 
 NOTES_TEMPLATE = """CO & Staff meeting {month}
 ===
@@ -118,8 +118,3 @@ def test_get_new_index():
         )
         == new_index
     )
-
-
-# def test_export():
-#     exporter = HackMDExporter(config["cogs"]["meetingnotes"]["hackmd"])
-#     exporter.export(NOTES_TEMPLATE)
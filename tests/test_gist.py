@@ -0,0 +1,123 @@
+import asyncio
+
+from aiohttp import web
+
+from bot.utils.exporters.github import GitHubExporter
+from bot.utils.gist import GistClient, GistError
+from bot.utils.notes import RenderedNote
+
+
+def note(text: str) -> RenderedNote:
+    return RenderedNote("Title", "2023-08", "markdown", text)
+
+
+class FakeGitHub:
+    """Local stand-in for the gist endpoints of the GitHub API"""
+    def __init__(self):
+        self.gists: dict[str, dict] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.app = web.Application()
+        self.app.router.add_post("/gists", self.create)
+        self.app.router.add_patch("/gists/{gist_id}", self.update)
+        self.runner = web.AppRunner(self.app)
+        self.url = ""
+
+    async def start(self):
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def create(self, request: web.Request):
+        self.requests.append(("POST", request.headers["Authorization"]))
+        data = await request.json()
+        gist_id = str(len(self.gists) + 1)
+        self.gists[gist_id] = data
+        return web.json_response(
+            {"id": gist_id, "html_url": f"{self.url}/gist/{gist_id}"},
+            status=201)
+
+    async def update(self, request: web.Request):
+        self.requests.append(("PATCH", request.headers["Authorization"]))
+        gist_id = request.match_info["gist_id"]
+        if gist_id == "502":
+            return web.Response(text="<html>Bad Gateway</html>", status=502,
+                                content_type="text/html")
+        if gist_id not in self.gists:
+            return web.json_response({"message": "Not Found"}, status=404)
+        data = await request.json()
+        self.gists[gist_id]["files"].update(data["files"])
+        return web.json_response(
+            {"id": gist_id, "html_url": f"{self.url}/gist/{gist_id}"})
+
+
+def run_with_server(test):
+    async def runner():
+        server = FakeGitHub()
+        await server.start()
+        try:
+            await test(server)
+        finally:
+            await server.stop()
+    asyncio.run(runner())
+
+
+def test_create_gist():
+    async def test(server: FakeGitHub):
+        exporter = GitHubExporter({"token": "abc", "api_url": server.url})
+        output = await exporter.export(note("notes"))
+        await exporter.close()
+        assert output == f"{server.url}/gist/1"
+        assert server.gists["1"]["files"] == {
+            "notes.md": {"content": "notes"}}
+        assert server.requests == [("POST", "token abc")]
+        assert exporter.client.latency is not None
+    run_with_server(test)
+
+
+def test_update_existing_gist():
+    async def test(server: FakeGitHub):
+        server.gists["1"] = {"files": {"notes.md": {"content": "old"}}}
+        exporter = GitHubExporter({"token": "abc", "api_url": server.url,
+                                   "gist_id": "1"})
+        await exporter.export(note("first"))
+        await exporter.export(note("second"))
+        # Both requests went through the same pooled session
+        session = exporter.client.session
+        assert session is not None and not session.closed
+        await exporter.close()
+        assert server.gists["1"]["files"]["notes.md"]["content"] == "second"
+        assert [method for method, _ in server.requests] == ["PATCH"] * 2
+    run_with_server(test)
+
+
+def test_update_missing_gist():
+    async def test(server: FakeGitHub):
+        client = GistClient("abc", api_url=server.url)
+        try:
+            await client.update("404", {"notes.md": "text"})
+        except GistError as e:
+            assert "Not Found" in str(e)
+        else:
+            raise AssertionError("GistError not raised")
+        finally:
+            await client.close()
+    run_with_server(test)
+
+
+def test_error_page_that_is_not_json():
+    async def test(server: FakeGitHub):
+        client = GistClient("abc", api_url=server.url)
+        try:
+            await client.update("502", {"notes.md": "text"})
+        except GistError as e:
+            assert "(502): <html>Bad Gateway</html>" in str(e)
+        else:
+            raise AssertionError("GistError not raised")
+        finally:
+            await client.close()
+    run_with_server(test)
@@ -0,0 +1,129 @@
+import asyncio
+import re
+
+import pytest
+
+from bot.utils.exporters import Steps
+from bot.utils.exporters.hackmd import HackMDExporter
+from bot.utils.notes import RenderedNote
+from tests.hackmd_server import FakeHackMD
+
+INDEX_ID = "MNNjYnckQgSESY5jsf7pFQ"
+INDEX = """# Zeusops CO & Staff meeting notes
+
+###### tags: `zeusops` `meeting`
+
+- [2023-07](https://hackmd.io/@zeusops/rysL2QNo2)
+"""
+
+
+def create_exporter(server: FakeHackMD) -> HackMDExporter:
+    return HackMDExporter({
+        "token": server.token,
+        "api_url": server.url,
+        "team_name": server.team,
+        "index_id": INDEX_ID,
+        "index_line": "- [{date}]({link})",
+        "index_line_regex": r"^- \[(?P<date>\d{4}-\d{2})\]\(.+\)$",
+    })
+
+
+def note(month: str, size: int = 0) -> RenderedNote:
+    text = f"# CO & Staff meeting {month}\n\n" + "x" * size
+    return RenderedNote(f"CO & Staff meeting {month}", month, "markdown",
+                        text)
+
+
+def run_with_server(test, **options):
+    async def runner():
+        server = FakeHackMD(**options)
+        server.add_note(INDEX, INDEX_ID)
+        await server.start()
+        try:
+            await test(server)
+        finally:
+            await server.stop()
+    asyncio.run(runner())
+
+
+def index_months(server: FakeHackMD) -> list[str]:
+    return re.findall(r"^- \[(\d{4}-\d{2})\]", server.notes[INDEX_ID]
+                      ["content"], flags=re.MULTILINE)
+
+
+async def export_until_done(exporter: HackMDExporter, note: RenderedNote,
+                            attempts: int = 50) -> str:
+    """Retry an export the way the outbox does, resuming its steps"""
+    steps = Steps()
+    for _ in range(attempts - 1):
+        try:
+            return await exporter.export(note, steps)
+        except ValueError:
+            pass
+    return await exporter.export(note, steps)
+
+
+def test_export():
+    async def test(server: FakeHackMD):
+        exporter = create_exporter(server)
+        assert await exporter.next_month() == "2023-08"
+        link = await exporter.export(note("2023-08"))
+        created = [n for n in server.notes.values() if n["id"] != INDEX_ID]
+        assert len(created) == 1
+        assert link == created[0]["publishLink"]
+        assert created[0]["title"] == "CO & Staff meeting 2023-08"
+        assert server.notes[INDEX_ID]["content"].splitlines()[4] == \
+            f"- [2023-08]({link})"
+        assert [(method, status) for method, _, status, _
+                in server.requests] == \
+            [("GET", 200), ("POST", 201), ("GET", 200), ("PATCH", 202)]
+    run_with_server(test)
+
+
+def test_export_rejected():
+    async def test(server: FakeHackMD):
+        exporter = create_exporter(server)
+        with pytest.raises(ValueError, match="413"):
+            await exporter.export(note("2023-08", size=2000))
+        assert list(server.notes) == [INDEX_ID]
+    run_with_server(test, max_payload=1000)
+
+
+def test_index_integrity_under_failures():
+    months = [f"2023-{month:02d}" for month in range(8, 13)]
+
+    async def test(server: FakeHackMD):
+        exporter = create_exporter(server)
+        for month in months:
+            await export_until_done(exporter, note(month))
+        # Every month is linked once, even when a response was lost after
+        # the index had been updated
+        assert index_months(server) == months[::-1] + ["2023-07"]
+        assert any(status == 500 for _, _, status, _ in server.requests)
+    run_with_server(test, error_rate=0.2, lost_response_rate=0.2, seed=1)
+
+
+def test_concurrent_exports():
+    months = [f"2024-{month:02d}" for month in range(1, 11)]
+
+    async def test(server: FakeHackMD):
+        exporters = [create_exporter(server) for _ in months]
+        links = await asyncio.gather(*(
+            export_until_done(exporter, note(month))
+            for exporter, month in zip(exporters, months)))
+        assert sorted(index_months(server)) == sorted(months + ["2023-07"])
+        for link in links:
+            assert server.notes[INDEX_ID]["content"].count(link) == 1
+    run_with_server(test, latency=0.01, jitter=0.01, error_rate=0.1)
+
+
+def test_errors_are_wrapped():
+    async def test(server: FakeHackMD):
+        api = create_exporter(server).api
+        with pytest.raises(ValueError, match="Failed to get note missing"):
+            await asyncio.to_thread(api.get_team_note, "missing")
+        # Nothing listens on the port anymore
+        await server.stop()
+        with pytest.raises(ValueError, match=f"Failed to get note {INDEX_ID}"):
+            await asyncio.to_thread(api.get_team_note, INDEX_ID)
+    run_with_server(test)
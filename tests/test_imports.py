@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+from bot.utils.exporters import Exporter
+from bot.utils.imports import (ImportTime, import_string, importtime_summary,
+                               parse_importtime)
+
+OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       150 |        150 |     PyHackMD.utils
+import time:      2000 |       2200 |   PyHackMD
+import time:       300 |       2500 | bot.utils.exporters.hackmd
+"""
+
+
+def test_import_string():
+    assert import_string("bot.utils.exporters.Exporter") is Exporter
+
+
+def test_parse_importtime():
+    entries = parse_importtime(OUTPUT)
+    assert entries[0] == ImportTime("PyHackMD.utils", 150, 150, 2)
+    assert [entry.depth for entry in entries] == [2, 1, 0]
+    lines = importtime_summary(entries, ["bot.utils.exporters.hackmd"], 1)
+    assert lines == ["bot.utils.exporters.hackmd: 2.5 ms",
+                     "  2.0 ms self, 2.2 ms total: PyHackMD"]
+
+
+def test_disabled_exporters_are_not_imported():
+    code = ("import sys, bot.cogs.meeting_notes; "
+            "print('PyHackMD' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], check=True,
+                            capture_output=True, text=True)
+    assert result.stdout.strip() == "False"
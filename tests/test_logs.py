@@ -0,0 +1,39 @@
+import json
+import logging
+
+from bot.utils.logs import JSONFormatter, RateLimitFilter, SamplingFilter
+
+
+def record(msg: str, created: float = 0.0, level=logging.INFO):
+    record = logging.LogRecord("bot.cogs.log", level, __file__, 1, msg,
+                               None, None)
+    record.created = created
+    return record
+
+
+def test_rate_limit():
+    limit = RateLimitFilter(interval=10, burst=2)
+    passed = [limit.filter(record("task", t)) for t in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert limit.filter(record("other", 1))
+
+    # The next window reports the dropped messages
+    next_window = record("task", 10)
+    assert limit.filter(next_window)
+    assert next_window.getMessage() == "task (3 similar messages suppressed)"
+
+
+def test_sampling():
+    sampling = SamplingFilter(0.25)
+    passed = [sampling.filter(record("task", level=logging.DEBUG))
+              for _ in range(8)]
+    assert passed.count(True) == 2
+    # Only debug messages are sampled
+    assert all(sampling.filter(record("task")) for _ in range(8))
+
+
+def test_json_formatter():
+    data = json.loads(JSONFormatter().format(record("hello %s")))
+    assert data["logger"] == "bot.cogs.log"
+    assert data["level"] == "INFO"
+    assert data["message"] == "hello %s"
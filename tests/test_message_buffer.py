@@ -0,0 +1,41 @@
+from bot.utils.message_buffer import ChannelBuffer, MessageRecord
+
+
+def record(id: int, content: str = "hello") -> MessageRecord:
+    return MessageRecord(id, 1, 2, 0.0, content)
+
+
+def test_evicts_oldest():
+    size = record(0).size
+    buffer = ChannelBuffer(budget=3 * size)
+    for id in range(5):
+        buffer.add(record(id))
+    assert list(buffer.records) == [2, 3, 4]
+    assert buffer.used == 3 * size
+
+
+def test_pop_and_replace():
+    buffer = ChannelBuffer(budget=10_000)
+    buffer.add(record(1))
+    buffer.add(record(1, "edited " * 10))
+    assert len(buffer) == 1
+    assert buffer.used == record(1, "edited " * 10).size
+
+    popped = buffer.pop(1)
+    assert popped is not None and popped.content.startswith("edited")
+    assert buffer.pop(1) is None
+    assert buffer.used == 0
+
+
+def test_update_keeps_order():
+    size = record(0).size
+    buffer = ChannelBuffer(budget=3 * size)
+    for id in range(3):
+        buffer.add(record(id))
+    assert buffer.update(0, "hi")
+    assert not buffer.update(5, "edited")
+    assert list(buffer.records) == [0, 1, 2]
+    assert buffer.used == 2 * size + record(0, "hi").size
+
+    buffer.add(record(3))
+    assert list(buffer.records) == [1, 2, 3]
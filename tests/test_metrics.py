@@ -0,0 +1,98 @@
+import asyncio
+import subprocess
+import sys
+
+import aiohttp
+
+from bot.utils.metrics import MetricsServer, Registry
+
+
+def test_counter_and_callback():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ["route"])
+    requests.inc(route="/a")
+    requests.inc(2, route='/"b"')
+    registry.callback("latency_seconds", "Latency", lambda: 0.25)
+    registry.callback("missing", "Not loaded", lambda: None)
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/a"} 1\n'
+        'requests_total{route="/\\"b\\""} 2\n'
+        "# HELP latency_seconds Latency\n"
+        "# TYPE latency_seconds gauge\n"
+        "latency_seconds 0.25\n"
+        "# HELP missing Not loaded\n"
+        "# TYPE missing gauge\n")
+
+
+def test_histogram():
+    registry = Registry()
+    durations = registry.histogram("duration_seconds", "Durations",
+                                   ["result"], buckets=[1, 5])
+    for value in (0.5, 1, 3, 10):
+        durations.observe(value, result="ok")
+    lines = registry.render().splitlines()[2:]
+    assert lines == ['duration_seconds_bucket{result="ok",le="1"} 2',
+                     'duration_seconds_bucket{result="ok",le="5"} 3',
+                     'duration_seconds_bucket{result="ok",le="+Inf"} 4',
+                     'duration_seconds_sum{result="ok"} 14.5',
+                     'duration_seconds_count{result="ok"} 4']
+
+
+def test_labels_are_checked():
+    registry = Registry()
+    counter = registry.counter("events_total", "Events", ["cog"])
+    try:
+        counter.inc(event="message")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Wrong labels accepted")
+
+
+def test_server():
+    registry = Registry()
+    registry.callback("up", "Up", lambda: 1)
+
+    async def scrape():
+        server = MetricsServer([registry], port=0)
+        await server.start()
+        host, port = server.addresses[0][:2]
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(
+                        f"http://{host}:{port}/metrics") as response:
+                    return response.headers["Content-Type"], \
+                        await response.text()
+        finally:
+            await server.stop()
+
+    content_type, text = asyncio.run(scrape())
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert text.endswith("up 1\n")
+
+
+def test_server_waits_for_closing_server():
+    async def restart():
+        server = MetricsServer([], port=0)
+        await server.start()
+        host, port = server.addresses[0][:2]
+        await server.stop()
+        server = MetricsServer([], host, port)
+        await server.start()
+        server.close()
+        # Binds only once the closing server has released the port
+        server = MetricsServer([], host, port)
+        await server.start()
+        await server.stop()
+
+    asyncio.run(restart())
+
+
+def test_web_is_imported_lazily():
+    code = ("import sys, bot.utils.outbox; "
+            "print('aiohttp.web' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], check=True,
+                            capture_output=True, text=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,57 @@
+import datetime
+import json
+
+from bot.utils.notes import (MeetingDocument, render_html, render_json,
+                             render_markdown)
+from bot.utils.suggestion import Suggestion, Type
+from bot.utils.votes import Votes
+
+
+def get_document() -> MeetingDocument:
+    co = Suggestion("Miller", "New mod", "https://discord/1", Type.CO,
+                    "https://steamcommunity.com/sharedfiles/"
+                    "filedetails/?id=123")
+    staff = Suggestion("Matt", "<Rules>", "https://discord/2", Type.STAFF)
+    co.number, staff.number = 1, 2
+    return MeetingDocument.from_categories(
+        [[co], [], [staff], []], ("CO", "Staff & CO", "Staff", "Unknown"),
+        "2023-08", datetime.date(2023, 8, 5))
+
+
+def test_render_markdown():
+    markdown = render_markdown(get_document())
+    assert markdown.startswith("CO & Staff meeting 2023-08\n===\n")
+    assert "###### date : 2023-08-05\n" in markdown
+    assert "## Suggestions - CO\n\n### 1. New mod (Miller)\n" \
+           "- https://discord/1\n- https://steamcommunity.com/" in markdown
+    assert "## Suggestions - Staff\n\n### 2. <Rules> (Matt)\n" in markdown
+    assert "Staff & CO" not in markdown
+
+
+def test_render_json():
+    data = json.loads(render_json(get_document()))
+    assert data["month"] == "2023-08"
+    assert list(data["categories"]) == ["CO", "Staff"]
+    assert data["categories"]["Staff"][0]["title"] == "<Rules>"
+
+
+def test_render_html():
+    text = render_html(get_document())
+    assert "<h1>CO &amp; Staff meeting 2023-08</h1>" in text
+    assert "<h3>2. &lt;Rules&gt; (Matt)</h3>" in text
+
+
+def test_votes():
+    document = get_document()
+    document.votes = {"https://discord/1": Votes(1, 3, 0),
+                      "https://discord/2": Votes(4, 1, 2)}
+    assert [s.title for s, _ in document.ranking()] == ["<Rules>", "New mod"]
+    markdown = render_markdown(document)
+    assert "- https://discord/2\n- Community votes: +4 -1 ~2\n" in markdown
+    assert "## Community ranking\n\n1. 2. <Rules> (Matt): +3 (+4 -1 ~2)\n" \
+           "2. 1. New mod (Miller): -2 (+1 -3 ~0)\n" in markdown
+    assert "<li>Community votes: +4 -1 ~2</li>" in render_html(document)
+    loaded = MeetingDocument.load(json.loads(render_json(document)))
+    assert loaded.votes == document.votes
+    # Archives from before votes were tallied
+    assert "Community ranking" not in render_markdown(get_document())
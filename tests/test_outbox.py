@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from bot.utils.exporters import Exporter
+from bot.utils.notes import RenderedNote
+from bot.utils.outbox import Outbox
+
+
+class FlakyExporter(Exporter):
+    """Exporter with two steps that fails after the first one once"""
+    def __init__(self):
+        super().__init__({})
+        self.calls: list[str] = []
+        self.fail = True
+
+    async def export(self, note, steps=None):
+        if "create" not in steps:
+            self.calls.append("create")
+            steps.complete("create", f"link/{note.text}")
+        if self.fail:
+            self.fail = False
+            raise ValueError("index update failed")
+        if "index" not in steps:
+            self.calls.append("index")
+            steps.complete("index")
+        return steps["create"]
+
+
+def test_resume_failed_export(tmp_path):
+    path = os.path.join(tmp_path, "outbox.json")
+    exporter = FlakyExporter()
+    outbox = Outbox(path, backoff=10)
+    job = outbox.add("flaky", RenderedNote("Title", "2023-08", "markdown",
+                                           "notes"))
+
+    try:
+        asyncio.run(outbox.run(job, exporter))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Export didn't fail")
+    assert job.attempts == 1
+    assert job.next_attempt > time.time() + 5
+    assert outbox.due() == []
+
+    # The progress survives a restart
+    outbox = Outbox(path)
+    job = outbox.pending()[0]
+    assert dict(job.steps) == {"create": "link/notes"}
+    assert asyncio.run(outbox.run(job, exporter)) == "link/notes"
+    assert exporter.calls == ["create", "index"]
+    assert outbox.pending() == []
+    assert Outbox(path).pending() == []
+
+
+def test_backoff_is_capped(tmp_path):
+    outbox = Outbox(os.path.join(tmp_path, "outbox.json"), backoff=30,
+                    max_backoff=100)
+    assert [outbox._delay(n) for n in range(1, 5)] == [30, 60, 100, 100]
+
+
+def test_job_keeps_guild(tmp_path):
+    path = os.path.join(tmp_path, "outbox.json")
+    note = RenderedNote("Title", "2023-08", "markdown", "notes")
+    Outbox(path).add("hackmd", note, channel_id=1, guild_id=2)
+    job = Outbox(path).pending()[0]
+    assert (job.channel_id, job.guild_id) == (1, 2)
+
+
+class BlockedExporter(Exporter):
+    """Exporter that waits for a future before it returns"""
+    def __init__(self):
+        super().__init__({})
+        self.calls = 0
+        self.release: "asyncio.Future[str]"
+
+    async def export(self, note, steps=None):
+        self.calls += 1
+        return await self.release
+
+
+def test_running_job_is_not_retried(tmp_path):
+    async def run():
+        outbox = Outbox(os.path.join(tmp_path, "outbox.json"))
+        exporter = BlockedExporter()
+        exporter.release = asyncio.get_running_loop().create_future()
+        job = outbox.add("blocked", RenderedNote("Title", "2023-08",
+                                                 "markdown", "notes"))
+        export = asyncio.ensure_future(outbox.run(job, exporter))
+        await asyncio.sleep(0)
+        assert outbox.due() == [] and outbox.idle() == []
+        assert outbox.pending() == [job]
+        with pytest.raises(ValueError, match="running already"):
+            await outbox.run(job, exporter)
+        exporter.release.set_result("link")
+        assert await export == "link"
+        assert exporter.calls == 1
+        assert outbox.pending() == [] and outbox.running == set()
+        # Removing a job that is gone already is a no-op
+        assert outbox.remove(job.id) is None
+
+    asyncio.run(run())
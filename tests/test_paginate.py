@@ -0,0 +1,21 @@
+from bot.utils.paginate import paginate
+
+
+def test_paginate_joins_lines():
+    assert paginate(["a", "b", "c"]) == ["a\nb\nc"]
+
+
+def test_paginate_limit():
+    lines = [f"{number}. {'x' * 5}" for number in range(1, 10)]
+    pages = paginate(lines, limit=30, prefix="```\n", suffix="\n```")
+    assert all(len(page) <= 30 for page in pages)
+    assert all(page.startswith("```\n") and page.endswith("\n```")
+               for page in pages)
+    # Lines are kept whole and in order
+    content = "\n".join(page[4:-4] for page in pages)
+    assert content == "\n".join(lines)
+
+
+def test_paginate_long_line():
+    pages = paginate(["short", "y" * 25], limit=10)
+    assert pages == ["short", "y" * 10, "y" * 10, "y" * 5]
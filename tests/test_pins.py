@@ -0,0 +1,54 @@
+import os
+
+from bot.utils.pins import KeywordMatcher, PinQueue, PinStore
+
+
+def test_keyword_matcher():
+    matcher = KeywordMatcher(["PIN", "PIN ME", "a.b"])
+    assert matcher.search("please PIN ME now") == "PIN ME"
+    assert matcher.search("xPINx") == "PIN"
+    # Keywords are matched literally
+    assert matcher.search("axb") is None
+    assert matcher.search("a.b") == "a.b"
+    assert KeywordMatcher([]).search("PIN") is None
+
+
+def test_queue_coalesces():
+    queue = PinQueue()
+    queue.put(1, 10, True)
+    queue.put(1, 10, True)
+    queue.put(1, 11, True)
+    # Unpinning a message whose pin is still pending cancels both
+    queue.put(1, 10, False)
+    queue.put(2, 20, False)
+    assert len(queue) == 2
+    assert queue.pop() == (1, 11, True)
+    assert queue.pop() == (2, 20, False)
+    assert queue.pop() is None
+
+
+def test_store(tmp_path):
+    path = os.path.join(tmp_path, "pins.json")
+    store = PinStore(path)
+    store.add(1, 10)
+    store.add(1, 11)
+    store.add(1, 10)
+    store.add(2, 20)
+    assert store.remove(2, 20)
+    assert not store.remove(2, 20)
+    store.save()
+
+    store = PinStore(path)
+    assert store.pins == {1: [10, 11]}
+    assert store.oldest(1) == 10
+    assert store.oldest(2) is None
+    assert 11 in store and 20 not in store
+
+
+def test_snapshot_is_a_copy(tmp_path):
+    store = PinStore(os.path.join(tmp_path, "pins.json"))
+    store.add(1, 10)
+    snapshot = store.snapshot()
+    store.add(1, 11)
+    store.save(snapshot)
+    assert PinStore(store.path).pins == {1: [10]}
@@ -0,0 +1,64 @@
+import csv
+import datetime
+import io
+import json
+
+from bot.utils.notes import MeetingDocument, render_json
+from bot.utils.stats import SuggestionStats
+from bot.utils.suggestion import Suggestion, Type
+from bot.utils.votes import Votes
+
+NAMES = ("CO", "Staff & CO", "Staff", "Unknown")
+
+
+def document(month: str, suggestions: list[Suggestion],
+             votes: dict[str, Votes]) -> dict:
+    categories = [[s for s in suggestions if s.category == category]
+                  for category in Type]
+    return json.loads(render_json(MeetingDocument.from_categories(
+        categories, NAMES, month, datetime.date(2023, 1, 1), votes)))
+
+
+def get_stats() -> SuggestionStats:
+    stats = SuggestionStats()
+    mod = Suggestion("Miller", "Mod", "u1", Type.CO, "https://steam/1")
+    rules = Suggestion("Matt", "Rules", "u2", Type.STAFF)
+    other = Suggestion("Miller", "Other", "u3", Type.UNKNOWN)
+    stats.import_month("2023-07", 1.0, document(
+        "2023-07", [mod, rules], {"u1": Votes(5, 1, 0)}))
+    stats.import_month("2023-08", 1.0, document(
+        "2023-08", [other], {"u3": Votes(1, 2, 0)}))
+    return stats
+
+
+def test_summary():
+    stats = get_stats()
+    summary = stats.summary()
+    assert summary.total == 3
+    assert summary.steam == 1
+    assert summary.categories == {Type.CO: 1, Type.BOTH: 0, Type.STAFF: 1,
+                                  Type.UNKNOWN: 1}
+    assert summary.authors == [("Miller", 2), ("Matt", 1)]
+    july, august = summary.months
+    assert (july.month, july.total, july.voted, july.accepted) == \
+        ("2023-07", 2, 1, 1)
+    assert july.acceptance == 1.0
+    assert august.acceptance == 0.0
+
+    assert [m.month for m in stats.summary("2023-08").months] == ["2023-08"]
+    assert stats.summary("2024-01").months == []
+
+
+def test_reimport_month():
+    stats = get_stats()
+    stats.import_month("2023-08", 2.0, document("2023-08", [], {}))
+    assert stats.months() == {"2023-07": 1.0, "2023-08": 2.0}
+    assert [m.month for m in stats.summary().months] == ["2023-07"]
+
+
+def test_csv():
+    rows = list(csv.reader(io.StringIO(get_stats().summary().csv())))
+    assert rows[0][:3] == ["month", "total", "steam"]
+    assert rows[0][-1] == "acceptance"
+    assert rows[1][0] == "2023-07" and rows[1][-1] == "1.000"
+    assert len(rows) == 3
@@ -0,0 +1,77 @@
+import os
+
+from bot.utils.suggestion import Suggestion, Type
+from bot.utils.suggestion_index import (SuggestionIndex, normalize_title,
+                                        voted_down, workshop_id)
+from bot.utils.votes import Votes
+
+STEAM_URL = "https://steamcommunity.com/sharedfiles/filedetails/?id=123"
+
+
+def test_workshop_id():
+    assert workshop_id(f"**Mod**\n{STEAM_URL} is great") == "123"
+    assert workshop_id("**Mod** without a link") is None
+
+
+def test_normalize_title():
+    assert normalize_title(" ACE3: Medical -- Rework! ") == \
+        "ace3 medical rework"
+
+
+def test_find_duplicates(tmp_path):
+    path = os.path.join(tmp_path, "index.json")
+    index = SuggestionIndex(path)
+    index.add(Suggestion("Miller", "Cool mod", "https://discord/1", Type.CO,
+                         STEAM_URL), "2023-07")
+    index.add(Suggestion("Matt", "More ranks", "https://discord/2",
+                         Type.STAFF), "2023-08")
+    index.save()
+
+    index = SuggestionIndex(path)
+    # Same workshop item under a different title
+    matches = index.find("Another name", f"**Another name**\n{STEAM_URL}")
+    assert [entry["url"] for entry in matches] == ["https://discord/1"]
+    # Same title with different formatting
+    matches = index.find("more ranks!")
+    assert [entry["month"] for entry in matches] == ["2023-08"]
+    # The suggestion itself isn't a duplicate
+    assert index.find("More ranks", exclude_url="https://discord/2") == []
+    assert index.find("Something new") == []
+
+
+def test_readd_replaces_entry(tmp_path):
+    index = SuggestionIndex(os.path.join(tmp_path, "index.json"))
+    suggestion = Suggestion("Matt", "Old title", "https://discord/1",
+                            Type.STAFF)
+    index.add(suggestion, "2023-07")
+    suggestion.title = "New title"
+    index.add(suggestion, "2023-07")
+    assert index.find("Old title") == []
+    assert len(index.find("New title")) == 1
+
+
+def test_empty_titles_dont_match(tmp_path):
+    index = SuggestionIndex(os.path.join(tmp_path, "index.json"))
+    index.add(Suggestion("Matt", "\N{FIRE}", "https://discord/1",
+                         Type.UNKNOWN), "2023-07")
+    assert index.find("!!") == []
+    assert index.find("\N{FIRE}\N{FIRE}") == []
+
+
+def test_votes_of_last_month(tmp_path):
+    path = os.path.join(tmp_path, "index.json")
+    index = SuggestionIndex(path)
+    index.add(Suggestion("Miller", "Cool mod", "https://discord/1", Type.CO,
+                         STEAM_URL), "2023-07", Votes(1, 5, 0))
+    index.add(Suggestion("Matt", "Cool mod", "https://discord/2", Type.CO),
+              "2023-08", Votes(4, 1, 2))
+    index.save()
+
+    index = SuggestionIndex(path)
+    assert index.last_month == "2023-08"
+    votes = {entry["month"]: voted_down(entry)
+             for entry in index.find("Cool mod")}
+    assert votes == {"2023-07": True, "2023-08": False}
+    index.add(Suggestion("Matt", "Unvoted", "https://discord/3", Type.CO),
+              "2023-08")
+    assert not voted_down(index.find("Unvoted")[0])
@@ -0,0 +1,64 @@
+import os
+
+from bot.utils.votes import Votes, VoteTally, message_id_from_url
+
+
+def test_tally(tmp_path):
+    path = os.path.join(tmp_path, "votes.json")
+    tally = VoteTally("+", "-", "~", path)
+    tally.add(1, "+")
+    tally.add(1, "+")
+    tally.add(1, "-")
+    tally.add(1, "?")
+    tally.remove(1, "-")
+    tally.remove(1, "-")
+    tally.set(2, {"~": 3, "+": 1, "?": 5})
+    assert tally.get(1) == Votes(2, 0, 0)
+    assert tally.get(2) == Votes(1, 0, 3)
+    assert tally.get(3) is None
+    assert tally.dirty
+    tally.save()
+    assert not tally.dirty
+
+    tally = VoteTally("+", "-", "~", path)
+    assert tally.get(2) == Votes(1, 0, 3)
+    tally.clear(2, "~")
+    assert tally.get(2) == Votes(1, 0, 0)
+    tally.clear(2)
+    assert tally.get(2) is None
+
+
+def test_votes():
+    votes = Votes(up=5, down=2, neutral=1)
+    assert votes.score == 3
+    assert str(votes) == "+5 -2 ~1"
+
+
+def test_message_id_from_url():
+    assert message_id_from_url(
+        "https://discord.com/channels/1/2/345") == 345
+    assert message_id_from_url("https://discord/x") is None
+
+
+def test_linked_votes(tmp_path):
+    path = os.path.join(tmp_path, "votes.json")
+    tally = VoteTally("+", "-", "~", path)
+    tally.link(10, 1)
+    tally.add(10, "+")
+    tally.set(10, {"-": 2})
+    assert tally.get(1) == Votes(0, 2, 0)
+    assert tally.get(10) is None
+    tally.save()
+
+    tally = VoteTally("+", "-", "~", path)
+    tally.remove(10, "-")
+    assert tally.get(1) == Votes(0, 1, 0)
+    tally.clear(10)
+    assert tally.get(1) is None
+
+
+def test_counts_saved_without_links(tmp_path):
+    path = os.path.join(tmp_path, "votes.json")
+    with open(path, "w") as f:
+        f.write('{"1": [2, 0, 1]}')
+    assert VoteTally("+", "-", "~", path).get(1) == Votes(2, 0, 1)